@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+import random
+
+
+def format_time(time: datetime) -> str:
+    return time.isoformat(timespec='milliseconds') + 'Z'
+
+
+def generate_symbols(symbol_count: int) -> List[str]:
+    return list(map(lambda i: f'SYMBOL{i}', range(symbol_count)))
+
+
+def generate_position(i: int, symbols: List[str], time: datetime) -> Dict:
+    return {'id': str(i), 'symbol': symbols[i % len(symbols)], 'type': 'POSITION_TYPE_BUY', 'openPrice': 1.0,
+            'currentPrice': 1.1, 'currentTickValue': 1, 'volume': 0.1, 'profit': 0, 'swap': 0, 'commission': 0,
+            'time': format_time(time), 'updateTime': format_time(time)}
+
+
+def generate_order(i: int, symbols: List[str], time: datetime, state: str = 'ORDER_STATE_PLACED') -> Dict:
+    return {'id': str(i), 'symbol': symbols[i % len(symbols)], 'type': 'ORDER_TYPE_BUY_LIMIT', 'state': state,
+            'openPrice': 1.0, 'currentPrice': 1.1, 'volume': 0.1, 'currentVolume': 0.1, 'positionId': str(i),
+            'time': format_time(time), 'doneTime': format_time(time)}
+
+
+def generate_deal(i: int, symbols: List[str], time: datetime) -> Dict:
+    return {'id': str(i), 'symbol': symbols[i % len(symbols)], 'type': 'DEAL_TYPE_BUY', 'entryType': 'DEAL_ENTRY_IN',
+            'volume': 0.1, 'price': 1.1, 'profit': 0, 'commission': 0, 'swap': 0, 'orderId': str(i),
+            'positionId': str(i), 'time': format_time(time)}
+
+
+def generate_bootstrap_stream(account_id: str = 'accountId', symbol_count: int = 50, position_count: int = 2000,
+                              order_count: int = 500, history_order_count: int = 5000, deal_count: int = 5000,
+                              batch_size: int = 1000, synchronization_id: str = 'synchronizationId') -> List[Dict]:
+    """Generates the packets a server sends when an account instance synchronizes, from synchronizationStarted to
+    dealSynchronizationFinished, in the wire format.
+
+    Args:
+        account_id: Account id.
+        symbol_count: Amount of symbols.
+        position_count: Amount of open positions.
+        order_count: Amount of open orders.
+        history_order_count: Amount of history orders.
+        deal_count: Amount of deals.
+        batch_size: Maximum amount of history orders or deals in a packet.
+        synchronization_id: Synchronization id.
+
+    Returns:
+        List of packets.
+    """
+    symbols = generate_symbols(symbol_count)
+    start_time = datetime(2020, 4, 15, 2, 45, 6)
+    stream = [
+        {'type': 'synchronizationStarted', 'accountId': account_id, 'instanceIndex': 0,
+         'synchronizationId': synchronization_id},
+        {'type': 'accountInformation', 'accountId': account_id, 'instanceIndex': 0,
+         'accountInformation': {'balance': 1000, 'equity': 1000, 'margin': 10, 'freeMargin': 990,
+                                'marginLevel': 10000, 'currency': 'USD', 'leverage': 100}},
+        {'type': 'specifications', 'accountId': account_id, 'instanceIndex': 0,
+         'specifications': list(map(lambda symbol: {'symbol': symbol, 'tickSize': 0.00001, 'digits': 5}, symbols))},
+        {'type': 'positions', 'accountId': account_id, 'instanceIndex': 0,
+         'positions': list(map(lambda i: generate_position(i, symbols, start_time), range(position_count)))},
+        {'type': 'orders', 'accountId': account_id, 'instanceIndex': 0,
+         'orders': list(map(lambda i: generate_order(i, symbols, start_time), range(order_count)))}
+    ]
+    for offset in range(0, history_order_count, batch_size):
+        stream.append({'type': 'historyOrders', 'accountId': account_id, 'instanceIndex': 0,
+                       'historyOrders': list(map(
+                           lambda i: generate_order(i, symbols, start_time + timedelta(seconds=i),
+                                                    'ORDER_STATE_FILLED'),
+                           range(offset, min(offset + batch_size, history_order_count))))})
+    stream.append({'type': 'orderSynchronizationFinished', 'accountId': account_id, 'instanceIndex': 0,
+                   'synchronizationId': synchronization_id})
+    for offset in range(0, deal_count, batch_size):
+        stream.append({'type': 'deals', 'accountId': account_id, 'instanceIndex': 0,
+                       'deals': list(map(lambda i: generate_deal(i, symbols, start_time + timedelta(seconds=i)),
+                                         range(offset, min(offset + batch_size, deal_count))))})
+    stream.append({'type': 'dealSynchronizationFinished', 'accountId': account_id, 'instanceIndex': 0,
+                   'synchronizationId': synchronization_id})
+    return stream
+
+
+def generate_update_stream(account_id: str = 'accountId', packet_count: int = 200, symbol_count: int = 50,
+                           position_count: int = 2000, deal_count: int = 5000, positions_per_update: int = 1000,
+                           deals_per_update: int = 100) -> List[Dict]:
+    """Generates update packets which update positions of a synchronized account and add deals, in the wire format.
+
+    Args:
+        account_id: Account id.
+        packet_count: Amount of packets.
+        symbol_count: Amount of symbols.
+        position_count: Amount of open positions the account has.
+        deal_count: Amount of deals the account has, the new deals get ids after them.
+        positions_per_update: Amount of updated positions in a packet.
+        deals_per_update: Amount of deals in a packet.
+
+    Returns:
+        List of packets.
+    """
+    symbols = generate_symbols(symbol_count)
+    start_time = datetime(2020, 4, 16)
+    stream = []
+    for i in range(packet_count):
+        time = start_time + timedelta(seconds=i)
+        stream.append({
+            'type': 'update', 'accountId': account_id, 'instanceIndex': 0,
+            'accountInformation': {'balance': 1000 + i, 'equity': 1000 + i, 'margin': 10, 'freeMargin': 990 + i,
+                                   'marginLevel': 10000, 'currency': 'USD', 'leverage': 100},
+            'updatedPositions': list(map(lambda k: generate_position((i * positions_per_update + k) % position_count,
+                                                                     symbols, time), range(positions_per_update))),
+            'deals': list(map(lambda k: generate_deal(deal_count + i * deals_per_update + k, symbols, time),
+                              range(deals_per_update)))
+        })
+    return stream
+
+
+def generate_price_stream(account_id: str = 'accountId', packet_count: int = 20000, symbol_count: int = 50,
+                          prices_per_packet: int = 5, seed: int = 0) -> List[Dict]:
+    """Generates prices packets of a synchronized account, in the wire format.
+
+    Args:
+        account_id: Account id.
+        packet_count: Amount of packets.
+        symbol_count: Amount of symbols.
+        prices_per_packet: Amount of symbol prices in a packet.
+        seed: Random seed.
+
+    Returns:
+        List of packets.
+    """
+    rand = random.Random(seed)
+    symbols = generate_symbols(symbol_count)
+    start_time = datetime(2020, 4, 17)
+    stream = []
+    for i in range(packet_count):
+        time = start_time + timedelta(milliseconds=10 * i)
+        stream.append({
+            'type': 'prices', 'accountId': account_id, 'instanceIndex': 0,
+            'prices': list(map(lambda k: {'symbol': symbols[(i * prices_per_packet + k) % symbol_count],
+                                          'bid': 1.1 + rand.random() / 100, 'ask': 1.1002, 'profitTickValue': 1,
+                                          'lossTickValue': 1, 'time': format_time(time),
+                                          'brokerTime': '2020-04-17 03:00:00.000'}, range(prices_per_packet))),
+            'equity': 1000, 'margin': 10, 'freeMargin': 990, 'marginLevel': 10000
+        })
+    return stream
+
+
+def generate_synchronization_stream(account_id: str = 'accountId', packet_count: int = 20000,
+                                    symbol_count: int = 5, position_count: int = 20, update_interval: int = 20,
+                                    seed: int = 0) -> List[Dict]:
+    """Generates a synchronization packet stream in the wire format, i.e. with ISO time strings.
+
+    The stream starts with specifications, account information and positions packets and continues with prices
+    packets, every update_interval-th of them being replaced with an update packet carrying deals and an updated
+    position.
+
+    Args:
+        account_id: Account id.
+        packet_count: Amount of packets to generate after the initial state packets.
+        symbol_count: Amount of symbols.
+        position_count: Amount of open positions.
+        update_interval: Interval between update packets.
+        seed: Random seed.
+
+    Returns:
+        List of packets.
+    """
+    rand = random.Random(seed)
+    symbols = list(map(lambda i: f'SYMBOL{i}', range(symbol_count)))
+    start_time = datetime(2020, 4, 15, 2, 45, 6)
+
+    def position(i, time):
+        return {'id': str(i), 'symbol': symbols[i % symbol_count], 'type': 'POSITION_TYPE_BUY', 'openPrice': 1.0,
+                'currentPrice': 1.1, 'currentTickValue': 1, 'volume': 0.1, 'profit': 0, 'swap': 0,
+                'commission': 0, 'time': format_time(start_time), 'updateTime': format_time(time)}
+
+    stream = [
+        {'type': 'specifications', 'accountId': account_id, 'instanceIndex': 0,
+         'specifications': list(map(lambda symbol: {'symbol': symbol, 'tickSize': 0.00001, 'digits': 5}, symbols))},
+        {'type': 'accountInformation', 'accountId': account_id, 'instanceIndex': 0,
+         'accountInformation': {'balance': 1000, 'equity': 1000, 'margin': 10, 'freeMargin': 990,
+                                'marginLevel': 10000, 'currency': 'USD', 'leverage': 100}},
+        {'type': 'positions', 'accountId': account_id, 'instanceIndex': 0,
+         'positions': list(map(lambda i: position(i, start_time), range(position_count)))}
+    ]
+    for i in range(packet_count):
+        time = start_time + timedelta(milliseconds=100 * i)
+        if i % update_interval == 0:
+            stream.append({
+                'type': 'update', 'accountId': account_id, 'instanceIndex': 0,
+                'updatedPositions': [position(i % position_count, time)],
+                'deals': list(map(lambda k: {'id': str(i * 10 + k), 'type': 'DEAL_TYPE_BUY', 'volume': 0.1,
+                                             'time': format_time(time)}, range(5)))
+            })
+        else:
+            stream.append({
+                'type': 'prices', 'accountId': account_id, 'instanceIndex': 0,
+                'prices': list(map(lambda k: {'symbol': symbols[(i + k) % symbol_count],
+                                              'bid': 1.1 + rand.random() / 100, 'ask': 1.1002,
+                                              'profitTickValue': 1, 'lossTickValue': 1, 'time': format_time(time),
+                                              'brokerTime': '2020-04-15 05:45:06.521'}, range(2))),
+                'equity': 1000, 'margin': 10, 'freeMargin': 990, 'marginLevel': 10000
+            })
+    return stream
@@ -0,0 +1,324 @@
+"""Local socket.io server which speaks the MetaApi websocket protocol, so that the client stack can be load tested
+without network access. The server answers RPC requests from in-memory account models, streams the synchronization
+packets of an account on synchronize requests and replays packet streams, e.g. PacketLogger files, at recorded speed,
+at a multiple of it or as fast as possible.
+
+Example:
+
+    server = ReplayServer(port=8765)
+    await server.start()
+    client = MetaApiWebsocketClient('token')
+    client.set_url('http://localhost:8765')
+    ...
+    await server.replay(load_packet_log('.metaapi/logs/2020-04-15-00/accountId.log'), speed=10)
+    await server.stop()
+"""
+from .packetGenerator import generate_symbols, generate_position, generate_order, generate_deal, format_time
+from aiohttp import web
+from datetime import datetime
+from socketio import AsyncServer
+from typing import Dict, Iterable, List, Optional
+from typing_extensions import TypedDict
+import asyncio
+import functools
+import random
+import time
+
+
+class NotFoundError(Exception):
+    """Raised when a requested item does not exist in an account model."""
+
+
+class AccountModel(TypedDict):
+    """In-memory account model the server answers requests from. Items are kept in the wire format, i.e. with ISO
+    time strings."""
+
+    accountInformation: Dict
+    """Account information."""
+    specifications: List[Dict]
+    """Symbol specifications."""
+    prices: List[Dict]
+    """Symbol prices."""
+    positions: List[Dict]
+    """Open positions."""
+    orders: List[Dict]
+    """Open orders."""
+    historyOrders: List[Dict]
+    """History orders."""
+    deals: List[Dict]
+    """Deals."""
+
+
+def generate_account_model(symbol_count: int = 5, position_count: int = 20, order_count: int = 5,
+                           deal_count: int = 100) -> AccountModel:
+    """Generates an account model.
+
+    Args:
+        symbol_count: Amount of symbols.
+        position_count: Amount of open positions.
+        order_count: Amount of open orders.
+        deal_count: Amount of deals and history orders.
+
+    Returns:
+        Account model.
+    """
+    symbols = generate_symbols(symbol_count)
+    time = datetime(2020, 4, 15, 2, 45, 6)
+    return {
+        'accountInformation': {'broker': 'Broker', 'currency': 'USD', 'server': 'Server-Demo', 'balance': 1000,
+                               'equity': 1000, 'margin': 10, 'freeMargin': 990, 'leverage': 100,
+                               'marginLevel': 10000},
+        'specifications': list(map(lambda symbol: {'symbol': symbol, 'tickSize': 0.00001, 'digits': 5}, symbols)),
+        'prices': list(map(lambda symbol: {'symbol': symbol, 'bid': 1.1, 'ask': 1.1002, 'profitTickValue': 1,
+                                           'lossTickValue': 1, 'time': format_time(time),
+                                           'brokerTime': '2020-04-15 05:45:06.000'}, symbols)),
+        'positions': list(map(lambda i: generate_position(i, symbols, time), range(position_count))),
+        'orders': list(map(lambda i: generate_order(i, symbols, time), range(order_count))),
+        'historyOrders': list(map(lambda i: generate_order(i, symbols, time, 'ORDER_STATE_FILLED'),
+                                  range(deal_count))),
+        'deals': list(map(lambda i: generate_deal(i, symbols, time), range(deal_count)))
+    }
+
+
+class ReplayServer:
+    """Local MetaApi websocket API server."""
+
+    def __init__(self, port: int = 8765, accounts: Dict[str, AccountModel] = None, host: str = 'ps-mpa-0'):
+        """Inits the server.
+
+        Args:
+            port: Port to listen on.
+            accounts: Account models by account id. Requests of other accounts get a model generated with default
+            parameters.
+            host: Server host name sent in synchronization packets.
+        """
+        self._port = port
+        self._accounts = accounts or {}
+        self._host = host
+        self._sio = AsyncServer(async_mode='aiohttp')
+        self._app = web.Application()
+        self._runner = None
+        self._sids = set()
+        self._requestCount = 0
+        self._sequenceNumbers = {}
+        self._sio.attach(self._app, socketio_path='ws')
+        self._sio.on('connect', self._on_connect)
+        self._sio.on('disconnect', self._on_disconnect)
+        self._sio.on('request', self._on_request)
+        self._requestHandlers = {
+            'subscribe': self._process_subscribe_request,
+            'synchronize': self._process_synchronize_request,
+            'trade': self._process_trade_request
+        }
+        read_handlers = {
+            'getAccountInformation': lambda request, account: {'accountInformation': account['accountInformation']},
+            'getPositions': lambda request, account: {'positions': account['positions']},
+            'getPosition': lambda request, account: {
+                'position': self._find(account['positions'], 'id', request['positionId'])},
+            'getOrders': lambda request, account: {'orders': account['orders']},
+            'getOrder': lambda request, account: {'order': self._find(account['orders'], 'id', request['orderId'])},
+            'getSymbolSpecification': lambda request, account: {
+                'specification': self._find(account['specifications'], 'symbol', request['symbol'])},
+            'getSymbolPrice': lambda request, account: {
+                'price': self._find(account['prices'], 'symbol', request['symbol'])},
+            'getHistoryOrdersByTicket': lambda request, account: self._history(
+                account, 'historyOrders', lambda order: order['id'] == request['ticket']),
+            'getHistoryOrdersByPosition': lambda request, account: self._history(
+                account, 'historyOrders', lambda order: order['positionId'] == request['positionId']),
+            'getHistoryOrdersByTimeRange': lambda request, account: self._history(
+                account, 'historyOrders', lambda order: request['startTime'] <= order['doneTime'] <
+                request['endTime'], request),
+            'getDealsByTicket': lambda request, account: self._history(
+                account, 'deals', lambda deal: request['ticket'] in [deal['id'], deal['orderId']]),
+            'getDealsByPosition': lambda request, account: self._history(
+                account, 'deals', lambda deal: deal['positionId'] == request['positionId']),
+            'getDealsByTimeRange': lambda request, account: self._history(
+                account, 'deals', lambda deal: request['startTime'] <= deal['time'] < request['endTime'], request)
+        }
+        for request_type in ['unsubscribe', 'subscribeToMarketData', 'unsubscribeFromMarketData', 'reconnect',
+                             'waitSynchronized', 'saveUptime', 'removeHistory', 'removeApplication']:
+            read_handlers[request_type] = lambda request, account: {}
+        for request_type, handler in read_handlers.items():
+            self._requestHandlers[request_type] = functools.partial(self._process_read_request, handler)
+
+    @property
+    def request_count(self) -> int:
+        """Returns amount of requests received.
+
+        Returns:
+            Amount of requests received.
+        """
+        return self._requestCount
+
+    def get_account(self, account_id: str) -> AccountModel:
+        """Returns an account model, generating it if it does not exist.
+
+        Args:
+            account_id: Account id.
+
+        Returns:
+            Account model.
+        """
+        if account_id not in self._accounts:
+            self._accounts[account_id] = generate_account_model()
+        return self._accounts[account_id]
+
+    async def start(self):
+        """Starts listening for connections."""
+        self._runner = web.AppRunner(self._app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, 'localhost', self._port).start()
+
+    async def stop(self):
+        """Disconnects clients and stops the server."""
+        await self._runner.cleanup()
+
+    async def disconnect_clients(self):
+        """Disconnects all connected clients, which makes them reconnect."""
+        for sid in list(self._sids):
+            await self._sio.disconnect(sid)
+
+    async def wait_for_clients(self, count: int = 1, timeout_in_seconds: float = 60):
+        """Waits until clients connect to the server.
+
+        Args:
+            count: Amount of clients to wait for.
+            timeout_in_seconds: Wait timeout in seconds.
+        """
+        await asyncio.wait_for(self._wait_for_clients(count), timeout_in_seconds)
+
+    async def emit_synchronization_packet(self, packet: Dict, sid: str = None):
+        """Sends a synchronization packet.
+
+        Args:
+            packet: Packet in the wire format.
+            sid: Socket id of the client to send the packet to, or None to send it to all clients.
+        """
+        await self._sio.emit('synchronization', packet, room=sid)
+
+    async def replay(self, packets: Iterable[Dict], speed: Optional[float] = 1, reorder_window: int = 0,
+                     seed: int = 0) -> int:
+        """Sends synchronization packets to all clients. Packets with sequence timestamps are sent at the recorded
+        intervals divided by speed, the other packets are sent right after the previous packet. Packets get sequence
+        numbers and timestamps of the server, so that recorded packets are not discarded by clients as packets of a
+        previous synchronization.
+
+        Args:
+            packets: Packets in the wire format, e.g. loaded from a PacketLogger file.
+            speed: Replay speed as a multiple of the recorded speed, or None to send packets as fast as possible.
+            reorder_window: Size of windows packets are shuffled within after they are numbered, to exercise packet
+            ordering of the clients. Zero keeps the recorded order.
+            seed: Random seed of the shuffling.
+
+        Returns:
+            Amount of packets sent.
+        """
+        schedule = []
+        first_timestamp = None
+        for packet in packets:
+            offset = None
+            if speed and 'sequenceTimestamp' in packet and packet['sequenceTimestamp'] is not None:
+                first_timestamp = packet['sequenceTimestamp'] if first_timestamp is None else first_timestamp
+                offset = (packet['sequenceTimestamp'] - first_timestamp) / 1000 / speed
+            schedule.append((offset, self._number_packet(packet)))
+        if reorder_window > 1:
+            rand = random.Random(seed)
+            for i in range(0, len(schedule), reorder_window):
+                window = schedule[i:i + reorder_window]
+                rand.shuffle(window)
+                schedule[i:i + reorder_window] = window
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        for offset, packet in schedule:
+            if offset is not None and start_time + offset > loop.time():
+                await asyncio.sleep(start_time + offset - loop.time())
+            await self.emit_synchronization_packet(packet)
+        return len(schedule)
+
+    def _number_packet(self, packet: Dict) -> Dict:
+        instance_id = f'{packet["accountId"]}:{packet["instanceIndex"] if "instanceIndex" in packet else 0}'
+        self._sequenceNumbers[instance_id] = self._sequenceNumbers[instance_id] + 1 if instance_id in \
+            self._sequenceNumbers else 1
+        return {**packet, 'sequenceNumber': self._sequenceNumbers[instance_id],
+                'sequenceTimestamp': int(time.time() * 1000)}
+
+    async def _wait_for_clients(self, count: int):
+        while len(self._sids) < count:
+            await asyncio.sleep(0.01)
+
+    async def _on_connect(self, sid: str, environ: Dict):
+        self._sids.add(sid)
+
+    async def _on_disconnect(self, sid: str):
+        self._sids.discard(sid)
+
+    async def _on_request(self, sid: str, request: Dict):
+        self._requestCount += 1
+        account = self.get_account(request['accountId'])
+        if request['type'] not in self._requestHandlers:
+            await self._emit_error(sid, request, 'ValidationError', f'Unknown request type {request["type"]}')
+            return
+        try:
+            response = await self._requestHandlers[request['type']](sid, request, account)
+        except NotFoundError as err:
+            await self._emit_error(sid, request, 'NotFoundError', str(err))
+            return
+        await self._sio.emit('response', {'type': 'response', 'accountId': request['accountId'],
+                                          'requestId': request['requestId'], **response}, room=sid)
+
+    async def _emit_error(self, sid: str, request: Dict, error: str, message: str):
+        await self._sio.emit('processingError', {'type': 'processingError', 'accountId': request['accountId'],
+                                                 'requestId': request['requestId'], 'error': error,
+                                                 'message': message, 'details': []}, room=sid)
+
+    async def _process_subscribe_request(self, sid: str, request: Dict, account: AccountModel) -> Dict:
+        instance_index = request['instanceIndex'] if 'instanceIndex' in request else 0
+
+        async def authenticate():
+            await self.emit_synchronization_packet({
+                'type': 'authenticated', 'accountId': request['accountId'], 'instanceIndex': instance_index,
+                'host': self._host, 'replicas': 1}, sid)
+
+        asyncio.create_task(authenticate())
+        return {}
+
+    async def _process_synchronize_request(self, sid: str, request: Dict, account: AccountModel) -> Dict:
+        asyncio.create_task(self._synchronize(sid, request, account))
+        return {}
+
+    async def _synchronize(self, sid: str, request: Dict, account: AccountModel):
+        packet = {'accountId': request['accountId'], 'instanceIndex': request['instanceIndex'] if 'instanceIndex' in
+                  request else 0, 'host': self._host}
+        synchronization_id = request['requestId']
+        for data in [{'type': 'synchronizationStarted', 'synchronizationId': synchronization_id},
+                     {'type': 'accountInformation', 'accountInformation': account['accountInformation']},
+                     {'type': 'specifications', 'specifications': account['specifications']},
+                     {'type': 'positions', 'positions': account['positions']},
+                     {'type': 'orders', 'orders': account['orders']},
+                     {'type': 'historyOrders', 'historyOrders': account['historyOrders']},
+                     {'type': 'orderSynchronizationFinished', 'synchronizationId': synchronization_id},
+                     {'type': 'deals', 'deals': account['deals']},
+                     {'type': 'dealSynchronizationFinished', 'synchronizationId': synchronization_id},
+                     {'type': 'prices', 'prices': account['prices']}]:
+            await self.emit_synchronization_packet(self._number_packet({**packet, **data}), sid)
+
+    async def _process_read_request(self, handler, sid: str, request: Dict, account: AccountModel) -> Dict:
+        return handler(request, account)
+
+    async def _process_trade_request(self, sid: str, request: Dict, account: AccountModel) -> Dict:
+        return {'response': {'numericCode': 10009, 'stringCode': 'TRADE_RETCODE_DONE',
+                             'message': 'Request completed', 'orderId': str(len(account['deals']))}}
+
+    def _find(self, items: List[Dict], field: str, value) -> Dict:
+        for item in items:
+            if item[field] == value:
+                return item
+        raise NotFoundError(f'Item with {field} {value} not found')
+
+    def _history(self, account: AccountModel, field: str, predicate, request: Dict = None) -> Dict:
+        items = list(filter(predicate, account[field]))
+        if request is not None:
+            offset = request['offset'] if 'offset' in request else 0
+            limit = request['limit'] if 'limit' in request else 1000
+            items = items[offset:offset + limit]
+        return {field: items, 'synchronizing': False}
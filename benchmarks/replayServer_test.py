@@ -0,0 +1,63 @@
+from lib.clients.metaApi.metaApiWebsocket_client import MetaApiWebsocketClient
+from lib.clients.metaApi.synchronizationListener import SynchronizationListener
+from .replayServer import ReplayServer, generate_account_model
+import pytest
+import asyncio
+server = None
+client = None
+account = generate_account_model(symbol_count=2, position_count=3, order_count=1, deal_count=5)
+
+
+@pytest.fixture(autouse=True)
+async def run_around_tests():
+    global server
+    global client
+    server = ReplayServer(port=8766, accounts={'accountId': account})
+    await server.start()
+    client = MetaApiWebsocketClient('token', {'requestTimeout': 3})
+    client.set_url('http://localhost:8766')
+    await client.connect()
+    client._resolved = True
+    await server.wait_for_clients(timeout_in_seconds=3)
+    yield
+    await client.close()
+    await server.stop()
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.tasks.current_task()]
+    list(map(lambda task: task.cancel(), tasks))
+
+
+class TestReplayServer:
+    @pytest.mark.asyncio
+    async def test_answer_rpc_request(self):
+        """Should answer RPC requests from the account model."""
+        positions = await client.get_positions('accountId')
+        assert list(map(lambda position: position['id'], positions)) == ['0', '1', '2']
+        assert server.request_count == 1
+
+    @pytest.mark.asyncio
+    async def test_send_processing_error(self):
+        """Should send processing error if requested item is not found."""
+        try:
+            await client.get_position('accountId', 'missing')
+            raise Exception('NotFoundException is expected')
+        except Exception as err:
+            assert err.__class__.__name__ == 'NotFoundException'
+
+    @pytest.mark.asyncio
+    async def test_replay_packets_to_listeners(self):
+        """Should replay packets to synchronization listeners."""
+        listener = SynchronizationListener()
+        account_information = asyncio.Future()
+
+        async def on_account_information_updated(instance_index, information):
+            account_information.set_result(information)
+        listener.on_account_information_updated = on_account_information_updated
+        client.add_synchronization_listener('accountId', listener)
+        sent = await server.replay([
+            {'type': 'synchronizationStarted', 'accountId': 'accountId', 'instanceIndex': 0,
+             'synchronizationId': 'synchronizationId', 'sequenceTimestamp': 1586918706000},
+            {'type': 'accountInformation', 'accountId': 'accountId', 'instanceIndex': 0,
+             'accountInformation': {'balance': 2000, 'equity': 2000}, 'sequenceTimestamp': 1586918706100}
+        ], speed=None)
+        assert sent == 2
+        assert (await asyncio.wait_for(account_information, 3)) == {'balance': 2000, 'equity': 2000}
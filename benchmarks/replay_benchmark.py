@@ -0,0 +1,115 @@
+"""Measures end-to-end synchronization throughput of the client stack against a local ReplayServer.
+
+A MetaApiConnection subscribes to each account of the stream through a real socket.io connection, waits for the
+synchronization served by the server and then receives the stream, optionally shuffled to exercise packet ordering
+and interrupted by server side disconnects to exercise reconnects. The benchmark reports the amount of packets
+processed per second by the client, measured until a marker packet sent after the stream is processed.
+
+Run from the repository root:
+
+    python -m benchmarks.replay_benchmark --prices 20000
+    python -m benchmarks.replay_benchmark --prices 20000 --reorder-window 5 --reconnects 2
+    python -m benchmarks.replay_benchmark --log .metaapi/logs/2020-04-15-00/accountId.log --speed 10
+"""
+from lib.clients.metaApi.metaApiWebsocket_client import MetaApiWebsocketClient
+from lib.clients.metaApi.synchronizationListener import SynchronizationListener
+from lib.metaApi.metaApiConnection import MetaApiConnection
+from lib.metaApi.metatraderAccount import MetatraderAccount
+from .packetGenerator import generate_price_stream
+from .replayServer import ReplayServer
+from .synchronization_benchmark import load_packet_log
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import time
+
+marker_synchronization_id = 'replayFinished'
+
+
+class MarkerListener(SynchronizationListener):
+    """Resolves a future when the marker packet sent after a stream is processed."""
+
+    def __init__(self):
+        super().__init__()
+        self.finished = asyncio.Future()
+
+    async def on_deal_synchronization_finished(self, instance_index: int, synchronization_id: str):
+        if synchronization_id == marker_synchronization_id and not self.finished.done():
+            self.finished.set_result(time.perf_counter())
+
+
+async def run(packets: List[Dict], port: int, speed: Optional[float], reorder_window: int, reconnects: int) -> Dict:
+    """Replays packets to a client connected to a local server.
+
+    Args:
+        packets: Packets in the wire format.
+        port: Server port.
+        speed: Replay speed as a multiple of the recorded speed, or None to send packets as fast as possible.
+        reorder_window: Size of windows packets are shuffled within.
+        reconnects: Amount of times the server disconnects the client during the replay.
+
+    Returns:
+        Benchmark results.
+    """
+    server = ReplayServer(port)
+    await server.start()
+    client = MetaApiWebsocketClient('token', {'requestTimeout': 60, 'packetOrderingTimeout': 1})
+    client.set_url(f'http://localhost:{port}')
+    connections = []
+    listeners = []
+    for account_id in sorted(set(map(lambda packet: packet['accountId'], packets))):
+        account = MetatraderAccount({'_id': account_id, 'synchronizationMode': 'user', 'application': 'MetaApi'},
+                                    None, client, None)
+        connection = MetaApiConnection(client, account, None, None)
+        listener = MarkerListener()
+        connection.add_synchronization_listener(listener)
+        await connection.subscribe()
+        await connection.wait_synchronized({'timeoutInSeconds': 60})
+        connections.append(connection)
+        listeners.append(listener)
+    chunk_size = len(packets) // (reconnects + 1) + 1
+    start_time = time.perf_counter()
+    for i in range(0, len(packets), chunk_size):
+        if i:
+            await server.disconnect_clients()
+            await server.wait_for_clients()
+            for connection in connections:
+                await connection.wait_synchronized({'timeoutInSeconds': 60})
+        await server.replay(packets[i:i + chunk_size], speed, reorder_window)
+    sent_time = time.perf_counter()
+    await server.replay(list(map(lambda connection: {
+        'type': 'dealSynchronizationFinished', 'accountId': connection.account.id, 'instanceIndex': 0,
+        'synchronizationId': marker_synchronization_id}, connections)), None)
+    finished_time = max(await asyncio.gather(*map(lambda listener: listener.finished, listeners)))
+    result = {'packets': len(packets), 'sendTime': sent_time - start_time,
+              'packetsPerSecond': len(packets) / (finished_time - start_time), 'requests': server.request_count,
+              'rpcRequestMetrics': client.rpc_request_metrics}
+    for connection in connections:
+        connection.health_monitor.stop()
+        connection.history_storage._fileManager.stop_update_job()
+    await client.close()
+    await server.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end synchronization benchmark against a local server')
+    parser.add_argument('--prices', type=int, default=20000, help='amount of generated prices packets')
+    parser.add_argument('--symbols', type=int, default=50, help='amount of symbols of generated packets')
+    parser.add_argument('--log', help='PacketLogger file to replay instead of a generated stream')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='replay speed as a multiple of the recorded speed, 0 to send packets as fast as possible')
+    parser.add_argument('--reorder-window', type=int, default=0, help='size of windows packets are shuffled within')
+    parser.add_argument('--reconnects', type=int, default=0, help='amount of server side disconnects')
+    parser.add_argument('--port', type=int, default=8765, help='server port')
+    args = parser.parse_args()
+    packets = load_packet_log(args.log) if args.log else \
+        generate_price_stream(packet_count=args.prices, symbol_count=args.symbols)
+    result = asyncio.run(run(packets, args.port, args.speed or None, args.reorder_window, args.reconnects))
+    print(f'{result["packets"]} packets sent in {result["sendTime"]:.2f} s, '
+          f'{result["packetsPerSecond"]:.0f} packets/s processed, {result["requests"]} requests, '
+          f'rpc metrics {result["rpcRequestMetrics"]}')
+
+
+if __name__ == '__main__':
+    main()
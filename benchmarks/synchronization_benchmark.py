@@ -0,0 +1,180 @@
+"""Measures synchronization packet processing performance of MetaApiWebsocketClient.
+
+Packets are fed through MetaApiWebsocketClient._process_synchronization_packet of a client which has a MetaApiConnection
+attached, so they are processed by the real TerminalState, MemoryHistoryStorage and ConnectionHealthMonitor listeners.
+The generated stream consists of three scenarios which run one after another on the same account: the synchronization
+bootstrap, update packets with thousands of positions and deals and a high rate prices stream. For each scenario the
+benchmark reports packets per second, p50 and p99 handling latency and peak memory, which is measured in a separate
+pass because tracing memory allocations slows processing down.
+
+Run from the repository root:
+
+    python -m benchmarks.synchronization_benchmark
+    python -m benchmarks.synchronization_benchmark --positions 5000 --deals 20000 --prices 20000
+    python -m benchmarks.synchronization_benchmark --log .metaapi/logs/2020-04-15-00/accountId.log
+"""
+from lib.clients.metaApi.metaApiWebsocket_client import MetaApiWebsocketClient
+from lib.metaApi.metaApiConnection import MetaApiConnection
+from lib.metaApi.metatraderAccount import MetatraderAccount
+from .packetGenerator import generate_bootstrap_stream, generate_update_stream, generate_price_stream
+from typing import Callable, Dict, List, Tuple
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+import zlib
+
+
+def load_packet_log(path: str) -> List[Dict]:
+    """Loads synchronization packets from a file written by PacketLogger, either a text .log file or a compressed
+    .zlog file.
+
+    Args:
+        path: Log file path.
+
+    Returns:
+        List of packets.
+    """
+    packets = []
+    if path.endswith('.zlog'):
+        with open(path + '.idx') as index_file, open(path, 'rb') as file:
+            lines = []
+            for entry in index_file.read().splitlines():
+                block_time, offset, length = entry.split('\t')
+                file.seek(int(offset))
+                lines += zlib.decompress(file.read(int(length))).decode('utf-8').split('\r')
+    else:
+        with open(path) as file:
+            lines = file.read().splitlines()
+    for line in lines:
+        message = line[26:]
+        if message.startswith('{'):
+            packet = json.loads(message)
+            if 'accountId' in packet:
+                packets.append(packet)
+    return packets
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Returns a percentile of sorted values.
+
+    Args:
+        sorted_values: Values sorted in ascending order.
+        fraction: Percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        Percentile value.
+    """
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def create_client(account_ids: List[str]) -> Tuple[MetaApiWebsocketClient, List[MetaApiConnection]]:
+    """Creates a websocket client with a MetaApi connection attached for each account. The client does not connect to
+    the server, the connections are not subscribed.
+
+    Args:
+        account_ids: Account ids.
+
+    Returns:
+        Websocket client and connections.
+    """
+    client = MetaApiWebsocketClient('token')
+    client._packetOrderer.start()
+    connections = []
+    for account_id in account_ids:
+        account = MetatraderAccount({'_id': account_id, 'synchronizationMode': 'user'}, None, client, None)
+        connections.append(MetaApiConnection(client, account, None, None))
+    return client, connections
+
+
+def close_client(client: MetaApiWebsocketClient, connections: List[MetaApiConnection]):
+    """Stops background jobs of a client created with create_client.
+
+    Args:
+        client: Websocket client.
+        connections: Connections of the client.
+    """
+    for connection in connections:
+        connection.health_monitor.stop()
+        connection.history_storage._fileManager.stop_update_job()
+    client._packetOrderer.stop()
+
+
+async def run(scenarios: List[Tuple[str, Callable[[], List[Dict]]]], trace_memory: bool) -> List[Dict]:
+    """Feeds scenario packets through the synchronization packet dispatcher.
+
+    Args:
+        scenarios: Scenario names and functions which create scenario packets in the wire format.
+        trace_memory: Whether to measure peak memory instead of timing.
+
+    Returns:
+        Results by scenario.
+    """
+    streams = list(map(lambda scenario: (scenario[0], scenario[1]()), scenarios))
+    account_ids = sorted(set(packet['accountId'] for name, packets in streams for packet in packets))
+    client, connections = create_client(account_ids)
+    results = []
+    for name, packets in streams:
+        for packet in packets:
+            client._convert_iso_time_to_date(packet)
+        if trace_memory:
+            # tracing is restarted for each scenario, so that the peak of a scenario is measured from the memory
+            # allocated when the scenario starts
+            tracemalloc.start()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            for packet in packets:
+                await client._process_synchronization_packet(packet)
+            results.append({'scenario': name, 'peakMemory': tracemalloc.get_traced_memory()[1] - start_memory})
+            tracemalloc.stop()
+        else:
+            latencies = []
+            start_time = time.perf_counter()
+            for packet in packets:
+                packet_start_time = time.perf_counter()
+                await client._process_synchronization_packet(packet)
+                latencies.append(time.perf_counter() - packet_start_time)
+            elapsed = time.perf_counter() - start_time
+            latencies.sort()
+            results.append({'scenario': name, 'packets': len(packets), 'packetsPerSecond': len(packets) / elapsed,
+                            'p50': percentile(latencies, 0.5), 'p99': percentile(latencies, 0.99)})
+    close_client(client, connections)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synchronization packet processing benchmark')
+    parser.add_argument('--symbols', type=int, default=50, help='amount of symbols')
+    parser.add_argument('--positions', type=int, default=2000, help='amount of open positions')
+    parser.add_argument('--orders', type=int, default=500, help='amount of open orders')
+    parser.add_argument('--deals', type=int, default=5000, help='amount of deals and history orders')
+    parser.add_argument('--updates', type=int, default=200, help='amount of update packets')
+    parser.add_argument('--prices', type=int, default=5000, help='amount of prices packets')
+    parser.add_argument('--log', help='PacketLogger file to replay instead of generated streams')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory pass')
+    args = parser.parse_args()
+    if args.log:
+        scenarios = [('log', lambda: load_packet_log(args.log))]
+    else:
+        scenarios = [
+            ('bootstrap', lambda: generate_bootstrap_stream(
+                symbol_count=args.symbols, position_count=args.positions, order_count=args.orders,
+                history_order_count=args.deals, deal_count=args.deals)),
+            ('updates', lambda: generate_update_stream(
+                packet_count=args.updates, symbol_count=args.symbols, position_count=args.positions,
+                deal_count=args.deals, positions_per_update=min(1000, args.positions))),
+            ('prices', lambda: generate_price_stream(packet_count=args.prices, symbol_count=args.symbols))
+        ]
+    results = asyncio.run(run(scenarios, False))
+    peak_memory = asyncio.run(run(scenarios, True)) if not args.no_memory else []
+    print(f'{"scenario":<10} {"packets":>8} {"packets/s":>10} {"p50, us":>9} {"p99, us":>9} {"peak, MB":>9}')
+    for i, result in enumerate(results):
+        memory = f'{peak_memory[i]["peakMemory"] / 1024 / 1024:>9.1f}' if peak_memory else f'{"-":>9}'
+        print(f'{result["scenario"]:<10} {result["packets"]:>8} {result["packetsPerSecond"]:>10.0f} '
+              f'{result["p50"] * 1e6:>9.1f} {result["p99"] * 1e6:>9.1f} {memory}')
+
+
+if __name__ == '__main__':
+    main()
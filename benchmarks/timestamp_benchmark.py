@@ -0,0 +1,70 @@
+"""Compares time conversion of synchronization packets with the regex and iso8601 based implementation it replaced.
+
+Run from the repository root:
+
+    python -m benchmarks.timestamp_benchmark --packets 20000
+"""
+from lib.metaApi.models import convert_iso_time_to_date
+from lib.metaApi.lazyDateDict import convert_iso_time_to_lazy_date
+from .packetGenerator import generate_synchronization_stream
+from typing import Callable, Dict, List
+import argparse
+import iso8601
+import json
+import re
+import time
+
+
+def legacy_convert_iso_time_to_date(packet: Dict):
+    """Time conversion implementation which was used before the field decision cache and fast ISO parsing."""
+    for field in packet:
+        value = packet[field]
+        if isinstance(value, str) and re.search('time|Time', field) and not \
+                re.search('brokerTime|BrokerTime', field):
+            packet[field] = iso8601.parse_date(value)
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    legacy_convert_iso_time_to_date(item)
+        if isinstance(value, dict):
+            legacy_convert_iso_time_to_date(value)
+    if packet and 'timestamps' in packet:
+        for field in packet['timestamps']:
+            packet['timestamps'][field] = iso8601.parse_date(packet['timestamps'][field])
+
+
+def measure(convert: Callable, packets: List[Dict]) -> float:
+    """Converts copies of packets and measures the time spent.
+
+    Args:
+        convert: Conversion function.
+        packets: Packets in the wire format.
+
+    Returns:
+        Average conversion time per packet in microseconds.
+    """
+    copies = json.loads(json.dumps(packets))
+    start_time = time.perf_counter()
+    for packet in copies:
+        convert(packet)
+    return (time.perf_counter() - start_time) / len(packets) * 1000000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synchronization packet time conversion benchmark')
+    parser.add_argument('--packets', type=int, default=20000, help='amount of generated packets')
+    args = parser.parse_args()
+    packets = generate_synchronization_stream(packet_count=args.packets)
+    for packet in packets:
+        if packet['type'] == 'prices':
+            # latency tracking timestamps are present in production price packets
+            packet['timestamps'] = {'serverProcessingFinished': packet['prices'][0]['time']}
+    legacy = measure(legacy_convert_iso_time_to_date, packets)
+    current = measure(convert_iso_time_to_date, packets)
+    lazy = measure(convert_iso_time_to_lazy_date, packets)
+    print(f'{len(packets)} packets, legacy {legacy:.2f} us/packet, current {current:.2f} us/packet, ' +
+          f'speedup {legacy / current:.1f}x, lazy without access {lazy:.2f} us/packet')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ from .errorHandler import UnauthorizedException, ForbiddenException, ApiExceptio
 from typing_extensions import TypedDict
 from typing import Optional
 from ..metaApi.models import ExceptionMessage
-import json
+from . import jsonCodec
 import asyncio
 import sys
 import httpx
@@ -48,7 +48,7 @@ class HttpClient:
             response.raise_for_status()
             if response.content:
                 try:
-                    response = response.json()
+                    response = jsonCodec.loads(response.content)
                 except Exception as err:
                     print('Error parsing json', err)
         except HTTPError as err:
@@ -69,7 +69,7 @@ class HttpClient:
 
     def _convert_error(self, err: HTTPError):
         try:
-            response: ExceptionMessage or TypedDict = json.loads(err.response.text)
+            response: ExceptionMessage or TypedDict = jsonCodec.loads(err.response.text)
         except Exception:
             response = {}
         err_message = response['message'] if 'message' in response else err.response.reason_phrase
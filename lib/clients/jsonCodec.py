@@ -0,0 +1,45 @@
+import json as _json
+from typing import Any
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON codec used for socket.io packets, REST responses, packet logs and history files. orjson is used if it is
+# installed, the module itself can be passed to socket.io as a json module
+backend = 'orjson' if orjson is not None else 'json'
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    """Serializes an object to a compact JSON string.
+
+    Args:
+        obj: Object to serialize.
+        kwargs: Options of the standard json module, used when orjson is not installed or can not serialize the
+        object. Separators are always compact.
+
+    Returns:
+        JSON string.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    kwargs['separators'] = (',', ':')
+    return _json.dumps(obj, **kwargs)
+
+
+def loads(s: str or bytes, **kwargs) -> Any:
+    """Deserializes a JSON string.
+
+    Args:
+        s: JSON string or UTF-8 encoded bytes.
+        kwargs: Options of the standard json module, used when orjson is not installed.
+
+    Returns:
+        Deserialized object.
+    """
+    if orjson is not None and not kwargs:
+        return orjson.loads(s)
+    return _json.loads(s, **kwargs)
@@ -0,0 +1,17 @@
+from . import jsonCodec
+from mock import patch
+
+
+class TestJsonCodec:
+    def test_serialize_compactly(self):
+        """Should serialize objects to compact JSON."""
+        obj = {'type': 'prices', 'prices': [{'symbol': 'EURUSD', 'bid': 1.1}], 'numbers': [1, 2], 'name': 'тест'}
+        assert ' ' not in jsonCodec.dumps(obj)
+        assert jsonCodec.loads(jsonCodec.dumps(obj)) == obj
+        assert jsonCodec.loads(jsonCodec.dumps(obj).encode('utf-8')) == obj
+
+    def test_use_standard_json_without_orjson(self):
+        """Should use the standard json module if orjson is not installed."""
+        with patch('lib.clients.jsonCodec.orjson', None):
+            assert jsonCodec.dumps({'a': [1, 2]}, separators=(', ', ': ')) == '{"a":[1,2]}'
+            assert jsonCodec.loads('{"a": [1, 2]}') == {'a': [1, 2]}
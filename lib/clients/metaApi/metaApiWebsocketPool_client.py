@@ -0,0 +1,312 @@
+from .metaApiWebsocket_client import MetaApiWebsocketClient, RpcRequestMetrics
+from .synchronizationListener import SynchronizationListener
+from .reconnectListener import ReconnectListener
+from .latencyListener import LatencyListener
+from .packetLogger import PacketLogger
+from .packetQueue import PacketQueueMetrics
+from .priceConflator import PriceConflationMetrics
+from ..errorHandler import ValidationException
+from ...metaApi.models import MetatraderHistoryOrders, MetatraderDeals, MetatraderSymbolSpecification, \
+    MetatraderTradeResponse, MetatraderSymbolPrice, MetatraderAccountInformation, MetatraderPosition, MetatraderOrder
+import asyncio
+import bisect
+import hashlib
+from datetime import datetime
+from typing import Coroutine, List, Dict, Optional
+
+
+class MetaApiWebsocketPoolClient:
+    """Pool of MetaApi websocket API clients which spreads accounts across several sockets. Accounts are assigned to
+    the sockets by consistent hashing of account ids, so that each socket is processed and reconnected independently.
+    Exposes the same API as MetaApiWebsocketClient."""
+
+    def __init__(self, token: str, opts: Dict = None, size: int = 2, virtual_nodes: int = 100):
+        """Inits MetaApi websocket API client pool instance.
+
+        Args:
+            token: Authorization token.
+            opts: Websocket client options.
+            size: Amount of sockets in the pool. Default is 2.
+            virtual_nodes: Amount of points each socket occupies on the hash ring. Default is 100.
+        """
+        if size < 1:
+            raise ValidationException('Websocket client pool size must be a positive number')
+        opts = opts or {}
+        # packets of all sockets are logged by a single packet logger, since the log files are per account and the
+        # logger owns them
+        if 'packetLogger' in opts and 'enabled' in opts['packetLogger'] and opts['packetLogger']['enabled']:
+            self._packetLogger = PacketLogger(opts['packetLogger'])
+            self._packetLogger.start()
+        else:
+            self._packetLogger = None
+        self._clients = [MetaApiWebsocketClient(token, dict(opts), self._packetLogger) for i in range(size)]
+        self._ring = []
+        for client_index in range(size):
+            for node in range(virtual_nodes):
+                self._ring.append((self._hash(f'{client_index}:{node}'), client_index))
+        self._ring.sort()
+        self._ringKeys = [key for key, client_index in self._ring]
+        self._clientIndexes = {}
+
+    @property
+    def clients(self) -> List[MetaApiWebsocketClient]:
+        """Returns websocket clients of the pool.
+
+        Returns:
+            Websocket clients of the pool.
+        """
+        return self._clients
+
+    def get_client(self, account_id: str) -> MetaApiWebsocketClient:
+        """Returns websocket client which serves an account.
+
+        Args:
+            account_id: Account id.
+
+        Returns:
+            Websocket client which serves the account.
+        """
+        if account_id not in self._clientIndexes:
+            position = bisect.bisect(self._ringKeys, self._hash(account_id)) % len(self._ring)
+            self._clientIndexes[account_id] = self._ring[position][1]
+        return self._clients[self._clientIndexes[account_id]]
+
+    def set_url(self, url: str):
+        """Patch server URL for use in unit tests
+
+        Args:
+            url: Patched server URL.
+        """
+        for client in self._clients:
+            client.set_url(url)
+
+    async def connect(self):
+        """Connects all sockets of the pool to MetaApi server.
+
+        Returns:
+            A coroutine which resolves when connections are established.
+        """
+        await asyncio.gather(*[client.connect() for client in self._clients])
+
+    async def close(self):
+        """Closes all sockets of the pool."""
+        await asyncio.gather(*[client.close() for client in self._clients])
+
+    @property
+    def synchronization_queue_metrics(self) -> Dict[str, PacketQueueMetrics]:
+        """Returns metrics of synchronization packet queues.
+
+        Returns:
+            Dictionary of synchronization packet queue metrics by account id.
+        """
+        metrics = {}
+        for client in self._clients:
+            metrics.update(client.synchronization_queue_metrics)
+        return metrics
+
+    @property
+    def rpc_request_metrics(self) -> RpcRequestMetrics:
+        """Returns RPC request metrics of all sockets of the pool.
+
+        Returns:
+            RPC request metrics.
+        """
+        metrics = list(map(lambda client: client.rpc_request_metrics, self._clients))
+        return {
+            'inFlightRequests': sum(map(lambda m: m['inFlightRequests'], metrics)),
+            'oldestRequestAge': max(map(lambda m: m['oldestRequestAge'], metrics)),
+            'timedOutRequests': sum(map(lambda m: m['timedOutRequests'], metrics)),
+            'coalescedRequests': sum(map(lambda m: m['coalescedRequests'], metrics))
+        }
+
+    def get_price_conflation_metrics(self, account_id: str, listener) -> Optional[PriceConflationMetrics]:
+        """Returns price conflation metrics of a synchronization listener.
+
+        Args:
+            account_id: Account id.
+            listener: Synchronization listener added with price conflation enabled.
+
+        Returns:
+            Price conflation metrics or None if prices are not conflated for the listener.
+        """
+        return self.get_client(account_id).get_price_conflation_metrics(account_id, listener)
+
+    def get_account_information(self, account_id: str) -> 'Coroutine[asyncio.Future[MetatraderAccountInformation]]':
+        """Returns account information for a specified MetaTrader account (see
+        MetaApiWebsocketClient.get_account_information)."""
+        return self.get_client(account_id).get_account_information(account_id)
+
+    def get_positions(self, account_id: str) -> 'Coroutine[asyncio.Future[List[MetatraderPosition]]]':
+        """Returns positions for a specified MetaTrader account (see MetaApiWebsocketClient.get_positions)."""
+        return self.get_client(account_id).get_positions(account_id)
+
+    def get_position(self, account_id: str, position_id: str) -> 'Coroutine[asyncio.Future[MetatraderPosition]]':
+        """Returns specific position for a MetaTrader account (see MetaApiWebsocketClient.get_position)."""
+        return self.get_client(account_id).get_position(account_id, position_id)
+
+    def get_orders(self, account_id: str) -> 'Coroutine[asyncio.Future[List[MetatraderOrder]]]':
+        """Returns open orders for a specified MetaTrader account (see MetaApiWebsocketClient.get_orders)."""
+        return self.get_client(account_id).get_orders(account_id)
+
+    def get_order(self, account_id: str, order_id: str) -> 'Coroutine[asyncio.Future[MetatraderOrder]]':
+        """Returns specific open order for a MetaTrader account (see MetaApiWebsocketClient.get_order)."""
+        return self.get_client(account_id).get_order(account_id, order_id)
+
+    def get_history_orders_by_ticket(self, account_id: str, ticket: str) -> \
+            'Coroutine[asyncio.Future[MetatraderHistoryOrders]]':
+        """Returns the history of completed orders for a specific ticket number (see
+        MetaApiWebsocketClient.get_history_orders_by_ticket)."""
+        return self.get_client(account_id).get_history_orders_by_ticket(account_id, ticket)
+
+    def get_history_orders_by_position(self, account_id: str, position_id: str) -> \
+            'Coroutine[asyncio.Future[MetatraderHistoryOrders]]':
+        """Returns the history of completed orders for a specific position id (see
+        MetaApiWebsocketClient.get_history_orders_by_position)."""
+        return self.get_client(account_id).get_history_orders_by_position(account_id, position_id)
+
+    def get_history_orders_by_time_range(self, account_id: str, start_time: datetime, end_time: datetime,
+                                         offset: int = 0, limit: int = 1000) -> \
+            'Coroutine[asyncio.Future[MetatraderHistoryOrders]]':
+        """Returns the history of completed orders for a specific time range (see
+        MetaApiWebsocketClient.get_history_orders_by_time_range)."""
+        return self.get_client(account_id).get_history_orders_by_time_range(account_id, start_time, end_time, offset,
+                                                                            limit)
+
+    def get_deals_by_ticket(self, account_id: str, ticket: str) -> 'Coroutine[asyncio.Future[MetatraderDeals]]':
+        """Returns history deals with a specific ticket number (see MetaApiWebsocketClient.get_deals_by_ticket)."""
+        return self.get_client(account_id).get_deals_by_ticket(account_id, ticket)
+
+    def get_deals_by_position(self, account_id: str, position_id: str) -> \
+            'Coroutine[asyncio.Future[MetatraderDeals]]':
+        """Returns history deals for a specific position id (see MetaApiWebsocketClient.get_deals_by_position)."""
+        return self.get_client(account_id).get_deals_by_position(account_id, position_id)
+
+    def get_deals_by_time_range(self, account_id: str, start_time: datetime, end_time: datetime, offset: int = 0,
+                                limit: int = 1000) -> 'Coroutine[asyncio.Future[MetatraderDeals]]':
+        """Returns history deals with for a specific time range (see
+        MetaApiWebsocketClient.get_deals_by_time_range)."""
+        return self.get_client(account_id).get_deals_by_time_range(account_id, start_time, end_time, offset, limit)
+
+    def remove_history(self, account_id: str, application: str = None) -> Coroutine:
+        """Clears the order and transaction history of a specified application (see
+        MetaApiWebsocketClient.remove_history)."""
+        return self.get_client(account_id).remove_history(account_id, application)
+
+    def remove_application(self, account_id: str) -> Coroutine:
+        """Clears the order and transaction history of a specified application and removes the application (see
+        MetaApiWebsocketClient.remove_application)."""
+        return self.get_client(account_id).remove_application(account_id)
+
+    def trade(self, account_id: str, trade) -> 'Coroutine[asyncio.Future[MetatraderTradeResponse]]':
+        """Execute a trade on a connected MetaTrader account (see MetaApiWebsocketClient.trade)."""
+        return self.get_client(account_id).trade(account_id, trade)
+
+    def subscribe(self, account_id: str, instance_index: int = None) -> Coroutine:
+        """Subscribes to the Metatrader terminal events (see MetaApiWebsocketClient.subscribe)."""
+        return self.get_client(account_id).subscribe(account_id, instance_index)
+
+    def reconnect(self, account_id: str) -> Coroutine:
+        """Reconnects to the Metatrader terminal (see MetaApiWebsocketClient.reconnect)."""
+        return self.get_client(account_id).reconnect(account_id)
+
+    def synchronize(self, account_id: str, instance_index: int, synchronization_id: str,
+                    starting_history_order_time: datetime, starting_deal_time: datetime) -> Coroutine:
+        """Requests the terminal to start synchronization process (see MetaApiWebsocketClient.synchronize)."""
+        return self.get_client(account_id).synchronize(account_id, instance_index, synchronization_id,
+                                                       starting_history_order_time, starting_deal_time)
+
+    def wait_synchronized(self, account_id: str, instance_index: int, application_pattern: str,
+                          timeout_in_seconds: float) -> Coroutine:
+        """Waits for server-side terminal state synchronization to complete (see
+        MetaApiWebsocketClient.wait_synchronized)."""
+        return self.get_client(account_id).wait_synchronized(account_id, instance_index, application_pattern,
+                                                             timeout_in_seconds)
+
+    def subscribe_to_market_data(self, account_id: str, instance_index: int, symbol: str) -> Coroutine:
+        """Subscribes on market data of specified symbol (see MetaApiWebsocketClient.subscribe_to_market_data)."""
+        return self.get_client(account_id).subscribe_to_market_data(account_id, instance_index, symbol)
+
+    def get_symbol_specification(self, account_id: str, symbol: str) -> \
+            'Coroutine[asyncio.Future[MetatraderSymbolSpecification]]':
+        """Retrieves specification for a symbol (see MetaApiWebsocketClient.get_symbol_specification)."""
+        return self.get_client(account_id).get_symbol_specification(account_id, symbol)
+
+    def get_symbol_price(self, account_id: str, symbol: str) -> 'Coroutine[asyncio.Future[MetatraderSymbolPrice]]':
+        """Retrieves price for a symbol (see MetaApiWebsocketClient.get_symbol_price)."""
+        return self.get_client(account_id).get_symbol_price(account_id, symbol)
+
+    def save_uptime(self, account_id: str, uptime: Dict) -> Coroutine:
+        """Sends client uptime stats to the server (see MetaApiWebsocketClient.save_uptime)."""
+        return self.get_client(account_id).save_uptime(account_id, uptime)
+
+    def unsubscribe(self, account_id: str) -> Coroutine:
+        """Unsubscribe from account (see MetaApiWebsocketClient.unsubscribe)."""
+        return self.get_client(account_id).unsubscribe(account_id)
+
+    def add_synchronization_listener(self, account_id: str, listener, conflate_prices: bool = False):
+        """Adds synchronization listener for specific account.
+
+        Args:
+            account_id: Account id.
+            listener: Synchronization listener to add.
+            conflate_prices: Whether to deliver only the latest price of each symbol to the listener if it can not
+            keep up with price updates. Default is False.
+        """
+        self.get_client(account_id).add_synchronization_listener(account_id, listener, conflate_prices)
+
+    def remove_synchronization_listener(self, account_id: str, listener: SynchronizationListener):
+        """Removes synchronization listener for specific account.
+
+        Args:
+            account_id: Account id.
+            listener: Synchronization listener to remove.
+        """
+        self.get_client(account_id).remove_synchronization_listener(account_id, listener)
+
+    def add_latency_listener(self, listener: LatencyListener):
+        """Adds latency listener.
+
+        Args:
+            listener: Latency listener to add."""
+        for client in self._clients:
+            client.add_latency_listener(listener)
+
+    def remove_latency_listener(self, listener: LatencyListener):
+        """Removes latency listener.
+
+        Args:
+            listener: Latency listener to remove."""
+        for client in self._clients:
+            client.remove_latency_listener(listener)
+
+    def add_reconnect_listener(self, listener: ReconnectListener, account_id: str = None):
+        """Adds reconnect listener.
+
+        Args:
+            listener: Reconnect listener to add.
+            account_id: Id of the account the listener relates to. If specified, the listener is notified only about
+            reconnection of the socket which serves the account, otherwise about reconnection of any socket.
+        """
+        if account_id is not None:
+            self.get_client(account_id).add_reconnect_listener(listener, account_id)
+        else:
+            for client in self._clients:
+                client.add_reconnect_listener(listener)
+
+    def remove_reconnect_listener(self, listener: ReconnectListener):
+        """Removes reconnect listener.
+
+        Args:
+            listener: Listener to remove.
+        """
+        for client in self._clients:
+            client.remove_reconnect_listener(listener)
+
+    def remove_all_listeners(self):
+        """Removes all listeners. Intended for use in unit tests."""
+        for client in self._clients:
+            client.remove_all_listeners()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
@@ -0,0 +1,115 @@
+from .metaApiWebsocketPool_client import MetaApiWebsocketPoolClient
+from ..errorHandler import ValidationException
+from mock import MagicMock, AsyncMock, patch
+import pytest
+
+accounts = list(map(lambda i: f'account{i}', range(1000)))
+
+
+class TestMetaApiWebsocketPoolClient:
+    def test_spread_accounts(self):
+        """Should spread accounts across sockets of the pool."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 4)
+        counts = {}
+        for account_id in accounts:
+            client = pool.get_client(account_id)
+            assert pool.get_client(account_id) is client
+            counts[id(client)] = counts[id(client)] + 1 if id(client) in counts else 1
+        assert len(counts) == 4
+        assert min(counts.values()) > 150
+
+    def test_assign_accounts_consistently(self):
+        """Should move only a part of accounts to a new socket when the pool grows."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 4)
+        grown_pool = MetaApiWebsocketPoolClient('token', {}, 5)
+        moved = 0
+        for account_id in accounts:
+            client_index = pool.clients.index(pool.get_client(account_id))
+            grown_client_index = grown_pool.clients.index(grown_pool.get_client(account_id))
+            if client_index != grown_client_index:
+                assert grown_client_index == 4
+                moved += 1
+        assert 100 < moved < 300
+
+    @pytest.mark.asyncio
+    async def test_delegate_account_requests(self):
+        """Should delegate account requests to the socket which serves the account."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 3)
+        for client in pool.clients:
+            client.get_positions = AsyncMock(return_value=[])
+        assert await pool.get_positions('accountId') == []
+        for client in pool.clients:
+            if client is pool.get_client('accountId'):
+                client.get_positions.assert_called_once_with('accountId')
+            else:
+                client.get_positions.assert_not_called()
+
+    def test_add_synchronization_listener(self):
+        """Should add synchronization listener to the socket which serves the account."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 3)
+        listener = MagicMock()
+        pool.add_synchronization_listener('accountId', listener, True)
+        for client in pool.clients:
+            if client is pool.get_client('accountId'):
+                assert client._synchronizationListeners == {'accountId': [listener]}
+            else:
+                assert client._synchronizationListeners == {}
+        pool.remove_synchronization_listener('accountId', listener)
+        assert pool.get_client('accountId')._synchronizationListeners == {'accountId': []}
+
+    def test_add_reconnect_listener(self):
+        """Should add reconnect listener to the socket which serves the account."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 3)
+        account_listener = MagicMock()
+        listener = MagicMock()
+        pool.add_reconnect_listener(account_listener, 'accountId')
+        pool.add_reconnect_listener(listener)
+        for client in pool.clients:
+            if client is pool.get_client('accountId'):
+                assert client._reconnectListeners == [account_listener, listener]
+            else:
+                assert client._reconnectListeners == [listener]
+        pool.remove_reconnect_listener(account_listener)
+        pool.remove_reconnect_listener(listener)
+        for client in pool.clients:
+            assert client._reconnectListeners == []
+
+    @pytest.mark.asyncio
+    async def test_connect_and_close_sockets(self):
+        """Should connect and close all sockets of the pool."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 2)
+        for client in pool.clients:
+            client.connect = AsyncMock()
+            client.close = AsyncMock()
+        await pool.connect()
+        await pool.close()
+        for client in pool.clients:
+            client.connect.assert_called_once()
+            client.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_share_packet_logger(self):
+        """Should log packets of all sockets with a single packet logger."""
+        with patch('lib.clients.metaApi.metaApiWebsocketPool_client.PacketLogger') as packet_logger:
+            pool = MetaApiWebsocketPoolClient('token', {'packetLogger': {'enabled': True, 'compressLogs': True}}, 3)
+            packet_logger.assert_called_once_with({'enabled': True, 'compressLogs': True})
+            packet_logger.return_value.start.assert_called_once()
+            for client in pool.clients:
+                assert client._packetLogger is packet_logger.return_value
+        pool = MetaApiWebsocketPoolClient('token', {}, 2)
+        for client in pool.clients:
+            assert client._packetLogger is None
+
+    @pytest.mark.asyncio
+    async def test_merge_rpc_request_metrics(self):
+        """Should merge RPC request metrics of sockets."""
+        pool = MetaApiWebsocketPoolClient('token', {}, 2)
+        pool.clients[0]._timedOutRequests = 2
+        pool.clients[1]._timedOutRequests = 3
+        assert pool.rpc_request_metrics == {'inFlightRequests': 0, 'oldestRequestAge': 0, 'timedOutRequests': 5,
+                                            'coalescedRequests': 0}
+
+    def test_validate_size(self):
+        """Should validate pool size."""
+        with pytest.raises(ValidationException):
+            MetaApiWebsocketPoolClient('token', {}, 0)
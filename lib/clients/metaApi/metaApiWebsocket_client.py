@@ -5,29 +5,61 @@ from .notSynchronizedException import NotSynchronizedException
 from .notConnectedException import NotConnectedException
 from .synchronizationListener import SynchronizationListener
 from .reconnectListener import ReconnectListener
-from ...metaApi.models import MetatraderHistoryOrders, MetatraderDeals, date, random_id, \
+from ...metaApi.models import MetatraderHistoryOrders, MetatraderDeals, random_id, \
     MetatraderSymbolSpecification, MetatraderTradeResponse, MetatraderSymbolPrice, MetatraderAccountInformation, \
-    MetatraderPosition, MetatraderOrder, format_date
+    MetatraderPosition, MetatraderOrder, format_date, convert_iso_time_to_date
+from ...metaApi.lazyDateDict import convert_iso_time_to_lazy_date
 from .latencyListener import LatencyListener
 from .packetOrderer import PacketOrderer
 from .packetLogger import PacketLogger
+from .packetQueue import PacketQueue, PacketQueueMetrics, overflow_strategies
+from .priceConflator import PriceConflator, PriceConflationMetrics
+from .subscribeScheduler import SubscribeScheduler
+from .. import jsonCodec
 import socketio
 import asyncio
-import re
+import functools
+import heapq
 from random import random
-from datetime import datetime, timedelta
-from typing import Coroutine, List, Dict
+from copy import deepcopy
+from datetime import datetime
+from typing import Coroutine, List, Dict, Callable, Optional
+from typing_extensions import TypedDict
+
+_synchronization_listener_method_names = [name for name in dir(SynchronizationListener) if name.startswith('on_')]
+_synchronization_listener_batch_methods = {
+    'on_positions_updated': ('on_position_updated', 'positions'),
+    'on_orders_updated': ('on_order_updated', 'orders'),
+    'on_history_orders_added': ('on_history_order_added', 'historyOrders'),
+    'on_deals_added': ('on_deal_added', 'deals'),
+    'on_symbol_specifications_updated': ('on_symbol_specification_updated', 'specifications')
+}
+
+
+class RpcRequestMetrics(TypedDict):
+    """RPC request metrics."""
+
+    inFlightRequests: int
+    """Amount of requests waiting for a response."""
+    oldestRequestAge: float
+    """Time the oldest in-flight request has been waiting for a response, in seconds."""
+    timedOutRequests: int
+    """Amount of requests timed out since the client was created."""
+    coalescedRequests: int
+    """Amount of read requests served by an identical request already in flight since the client was created."""
 
 
 class MetaApiWebsocketClient:
     """MetaApi websocket API client (see https://metaapi.cloud/docs/client/websocket/overview/)"""
 
-    def __init__(self, token: str, opts: Dict = None):
+    def __init__(self, token: str, opts: Dict = None, packet_logger: PacketLogger = None):
         """Inits MetaApi websocket API client instance.
 
         Args:
             token: Authorization token.
             opts: Websocket client options.
+            packet_logger: Started packet logger to log packets with instead of the one configured by the packetLogger
+            option, e.g. a packet logger shared by the clients of a pool.
         """
         opts = opts or {}
         opts['packetOrderingTimeout'] = opts['packetOrderingTimeout'] if 'packetOrderingTimeout' in opts else 60
@@ -35,21 +67,69 @@ class MetaApiWebsocketClient:
         self._url = f'https://mt-client-api-v1.{opts["domain"] if "domain" in opts else "agiliumtrade.agiliumtrade.ai"}'
         self._request_timeout = opts['requestTimeout'] if 'requestTimeout' in opts else 60
         self._connect_timeout = opts['connectTimeout'] if 'connectTimeout' in opts else 60
+        self._lazyTimeParsing = opts['lazyTimeParsing'] if 'lazyTimeParsing' in opts else False
         self._token = token
         self._requestResolves = {}
+        self._requestDeadlines = []
+        self._requestDeadlineCounter = 0
+        self._requestTimeoutHandle = None
+        self._requestTimeoutDeadline = None
+        self._timedOutRequests = 0
+        self._inFlightReadRequests = {}
+        self._coalescedRequests = 0
         self._synchronizationListeners = {}
+        self._synchronizationListenerMethods = {}
+        self._priceConflators = {}
         self._latencyListeners = []
         self._connected = False
+        self._resolved = False
+        self._connectedEvent = None
         self._socket = None
         self._reconnectListeners = []
         self._connectedHosts = {}
         self._resubscriptionTriggerTimes = {}
-        self._packetOrderer = PacketOrderer(self, opts['packetOrderingTimeout'])
-        if 'packetLogger' in opts and 'enabled' in opts['packetLogger'] and opts['packetLogger']['enabled']:
+        self._packetOrderer = PacketOrderer(self, opts['packetOrderingTimeout'], opts['adaptivePacketOrdering'] if
+                                            'adaptivePacketOrdering' in opts else None)
+        self._subscribeScheduler = SubscribeScheduler(self._send_subscribe_request, opts['subscribeScheduler'] if
+                                                      'subscribeScheduler' in opts else None)
+        self._packetQueueOpts = opts['synchronizationQueue'] if 'synchronizationQueue' in opts else {}
+        if 'overflowStrategy' in self._packetQueueOpts and \
+                self._packetQueueOpts['overflowStrategy'] not in overflow_strategies:
+            raise ValidationException('Synchronization queue overflow strategy must be one of ' +
+                                      ', '.join(overflow_strategies))
+        self._packetQueues = {}
+        self._packetQueueWorkers = {}
+        if packet_logger:
+            self._packetLogger = packet_logger
+        elif 'packetLogger' in opts and 'enabled' in opts['packetLogger'] and opts['packetLogger']['enabled']:
             self._packetLogger = PacketLogger(opts['packetLogger'])
             self._packetLogger.start()
         else:
             self._packetLogger = None
+        self._synchronizationPacketHandlers = {
+            'authenticated': self._process_authenticated_packet,
+            'disconnected': self._process_disconnected_packet,
+            'synchronizationStarted': self._process_synchronization_started_packet,
+            'accountInformation': self._process_account_information_packet,
+            'deals': self._process_deals_packet,
+            'orders': self._process_orders_packet,
+            'historyOrders': self._process_history_orders_packet,
+            'positions': self._process_positions_packet,
+            'update': self._process_update_packet,
+            'dealSynchronizationFinished': self._process_deal_synchronization_finished_packet,
+            'orderSynchronizationFinished': self._process_order_synchronization_finished_packet,
+            'status': self._process_status_packet,
+            'specifications': self._process_specifications_packet,
+            'prices': self._process_prices_packet
+        }
+        self._updatePacketFields = [
+            ('updatedPositions', 'on_positions_updated'),
+            ('removedPositionIds', 'on_position_removed'),
+            ('updatedOrders', 'on_orders_updated'),
+            ('completedOrderIds', 'on_order_completed'),
+            ('historyOrders', 'on_history_orders_added'),
+            ('deals', 'on_deals_added')
+        ]
 
     async def on_out_of_order_packet(self, account_id: str, instance_index: int, expected_sequence_number: int,
                                      actual_sequence_number: int, packet: Dict, received_at: datetime):
@@ -73,6 +153,19 @@ class MetaApiWebsocketClient:
                 print((f'[{datetime.now().isoformat()}] MetaApi websocket client failed to receive ' +
                        'subscribe response for account id ' + account_id + ':' + str(instance_index), err))
 
+    async def on_dropped_packet(self, account_id: str, instance_index: int, packet: Dict):
+        """Restarts the account synchronization process when a synchronization packet is dropped because of
+        synchronization queue overflow.
+
+        Args:
+            account_id: Account id.
+            instance_index: Instance index.
+            packet: Dropped packet.
+        """
+        print(f'[{datetime.now().isoformat()}] MetaApi websocket client dropped a packet type {packet["type"]} for ' +
+              f'account id {account_id} because of synchronization queue overflow, resubscribing')
+        await self._retry_subscribe(account_id, instance_index, account_id + ':' + str(instance_index))
+
     def set_url(self, url: str):
         """Patch server URL for use in unit tests
 
@@ -91,35 +184,41 @@ class MetaApiWebsocketClient:
             self._connected = True
             self._requestResolves = {}
             self._resolved = False
+            self._connectedEvent = asyncio.Event()
             result = asyncio.Future()
             self._packetOrderer.start()
             url = f'{self._url}?auth-token={self._token}'
-            self._socket = socketio.AsyncClient(reconnection=False, request_timeout=self._request_timeout)
-
-            while not self._socket.connected:
-                try:
-                    await asyncio.wait_for(
-                        self._socket.connect(url, socketio_path='ws',
-                                             headers={'Client-id': '{:01.10f}'.format(random())}),
-                        timeout=self._connect_timeout)
-                except Exception:
-                    pass
+            self._socket = socketio.AsyncClient(reconnection=False, request_timeout=self._request_timeout,
+                                                json=jsonCodec)
 
+            # the connect event may be triggered before the socket connect call returns, so the handler is registered
+            # beforehand
             @self._socket.on('connect')
             async def on_connect():
                 print(f'[{datetime.now().isoformat()}] MetaApi websocket client connected to the MetaApi server')
                 if not self._resolved:
                     self._resolved = True
+                    self._connectedEvent.set()
                     result.set_result(None)
 
                 if not self._connected:
-                    self._socket.disconnect()
+                    await self._socket.disconnect()
+
+            while not self._socket.connected:
+                try:
+                    await asyncio.wait_for(
+                        self._socket.connect(url, socketio_path='ws',
+                                             headers={'Client-id': '{:01.10f}'.format(random())}),
+                        timeout=self._connect_timeout)
+                except Exception:
+                    pass
 
             @self._socket.on('connect_error')
             def on_connect_error(err):
                 print(f'[{datetime.now().isoformat()}] MetaApi websocket client connection error', err)
                 if not self._resolved:
                     self._resolved = True
+                    self._connectedEvent.set()
                     result.set_exception(Exception(err))
 
             @self._socket.on('connect_timeout')
@@ -127,6 +226,7 @@ class MetaApiWebsocketClient:
                 print(f'[{datetime.now().isoformat()}] MetaApi websocket client connection timeout')
                 if not self._resolved:
                     self._resolved = True
+                    self._connectedEvent.set()
                     result.set_exception(TimeoutException('MetaApi websocket client connection timed out'))
 
             @self._socket.on('disconnect')
@@ -171,8 +271,11 @@ class MetaApiWebsocketClient:
             async def on_synchronization(data):
                 if self._packetLogger:
                     self._packetLogger.log_packet(data)
-                self._convert_iso_time_to_date(data)
-                await self._process_synchronization_packet(data)
+                if self._lazyTimeParsing:
+                    data = convert_iso_time_to_lazy_date(data)
+                else:
+                    self._convert_iso_time_to_date(data)
+                await self._queue_synchronization_packet(data)
 
             return result
 
@@ -185,10 +288,62 @@ class MetaApiWebsocketClient:
                 if not self._requestResolves[request_resolve].done():
                     self._requestResolves[request_resolve].set_exception(Exception('MetaApi connection closed'))
             self._requestResolves = {}
+            self._inFlightReadRequests = {}
+            self._requestDeadlines = []
+            if self._requestTimeoutHandle is not None:
+                self._requestTimeoutHandle.cancel()
+                self._requestTimeoutHandle = None
             self._synchronizationListeners = {}
+            self._synchronizationListenerMethods = {}
+            self._stop_price_conflators()
             self._latencyListeners = []
             self._reconnectListeners = []
             self._packetOrderer.stop()
+            self._subscribeScheduler.stop(Exception('MetaApi connection closed'))
+            for account_id in list(self._packetQueues.keys()):
+                self._remove_packet_queue(account_id)
+
+    @property
+    def synchronization_queue_metrics(self) -> Dict[str, PacketQueueMetrics]:
+        """Returns metrics of synchronization packet queues.
+
+        Returns:
+            Dictionary of synchronization packet queue metrics by account id.
+        """
+        metrics = {}
+        for account_id in self._packetQueues:
+            metrics[account_id] = self._packetQueues[account_id].metrics
+        return metrics
+
+    @property
+    def rpc_request_metrics(self) -> RpcRequestMetrics:
+        """Returns RPC request metrics.
+
+        Returns:
+            RPC request metrics.
+        """
+        now = asyncio.get_event_loop().time()
+        start_times = [request_resolve.startTime for request_resolve in self._requestResolves.values()
+                       if hasattr(request_resolve, 'startTime')]
+        return {
+            'inFlightRequests': len(self._requestResolves),
+            'oldestRequestAge': now - min(start_times) if start_times else 0,
+            'timedOutRequests': self._timedOutRequests,
+            'coalescedRequests': self._coalescedRequests
+        }
+
+    def get_price_conflation_metrics(self, account_id: str, listener) -> Optional[PriceConflationMetrics]:
+        """Returns price conflation metrics of a synchronization listener.
+
+        Args:
+            account_id: Account id.
+            listener: Synchronization listener added with price conflation enabled.
+
+        Returns:
+            Price conflation metrics or None if prices are not conflated for the listener.
+        """
+        conflator = self._get_price_conflator(account_id, listener)
+        return conflator.metrics if conflator is not None else None
 
     async def get_account_information(self, account_id: str) -> 'asyncio.Future[MetatraderAccountInformation]':
         """Returns account information for a specified MetaTrader account
@@ -200,7 +355,7 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with account information.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getAccountInformation'})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getAccountInformation'})
         return response['accountInformation']
 
     async def get_positions(self, account_id: str) -> 'asyncio.Future[List[MetatraderPosition]]':
@@ -213,7 +368,7 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with array of open positions.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getPositions'})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getPositions'})
         return response['positions']
 
     async def get_position(self, account_id: str, position_id: str) -> 'asyncio.Future[MetatraderPosition]':
@@ -227,8 +382,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with MetaTrader position found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getPosition',
-                                                        'positionId': position_id})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getPosition',
+                                                         'positionId': position_id})
         return response['position']
 
     async def get_orders(self, account_id: str) -> 'asyncio.Future[List[MetatraderOrder]]':
@@ -241,7 +396,7 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with open MetaTrader orders.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getOrders'})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getOrders'})
         return response['orders']
 
     async def get_order(self, account_id: str, order_id: str) -> 'asyncio.Future[MetatraderOrder]':
@@ -255,7 +410,7 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with metatrader order found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getOrder', 'orderId': order_id})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getOrder', 'orderId': order_id})
         return response['order']
 
     async def get_history_orders_by_ticket(self, account_id: str, ticket: str) -> MetatraderHistoryOrders:
@@ -269,8 +424,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with request results containing history orders found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getHistoryOrdersByTicket',
-                                                        'ticket': ticket})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getHistoryOrdersByTicket',
+                                                         'ticket': ticket})
         return {
             'historyOrders': response['historyOrders'],
             'synchronizing': response['synchronizing']
@@ -287,8 +442,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with request results containing history orders found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getHistoryOrdersByPosition',
-                                                        'positionId': position_id})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getHistoryOrdersByPosition',
+                                                         'positionId': position_id})
         return {
             'historyOrders': response['historyOrders'],
             'synchronizing': response['synchronizing']
@@ -309,10 +464,10 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with request results containing history orders found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getHistoryOrdersByTimeRange',
-                                                        'startTime': format_date(start_time),
-                                                        'endTime': format_date(end_time),
-                                                        'offset': offset, 'limit': limit})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getHistoryOrdersByTimeRange',
+                                                         'startTime': format_date(start_time),
+                                                         'endTime': format_date(end_time),
+                                                         'offset': offset, 'limit': limit})
         return {
             'historyOrders': response['historyOrders'],
             'synchronizing': response['synchronizing']
@@ -329,8 +484,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with request results containing deals found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getDealsByTicket',
-                                                        'ticket': ticket})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getDealsByTicket',
+                                                         'ticket': ticket})
         return {
             'deals': response['deals'],
             'synchronizing': response['synchronizing']
@@ -347,8 +502,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with request results containing deals found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getDealsByPosition',
-                                                        'positionId': position_id})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getDealsByPosition',
+                                                         'positionId': position_id})
         return {
             'deals': response['deals'],
             'synchronizing': response['synchronizing']
@@ -369,10 +524,10 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine resolving with request results containing deals found.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getDealsByTimeRange',
-                                                        'startTime': format_date(start_time),
-                                                        'endTime': format_date(end_time),
-                                                        'offset': offset, 'limit': limit})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getDealsByTimeRange',
+                                                         'startTime': format_date(start_time),
+                                                         'endTime': format_date(end_time),
+                                                         'offset': offset, 'limit': limit})
         return {
             'deals': response['deals'],
             'synchronizing': response['synchronizing']
@@ -420,6 +575,7 @@ class MetaApiWebsocketClient:
         Raises:
             TradeException: On trade error, check error properties for error code details.
         """
+        self._subscribeScheduler.on_trade(account_id)
         response = await self._rpc_request(account_id, {'type': 'trade', 'trade': trade})
         if 'response' not in response:
             response['response'] = {}
@@ -445,10 +601,7 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine which resolves when subscription started.
         """
-        packet = {'type': 'subscribe'}
-        if instance_index:
-            packet['instanceIndex'] = instance_index
-        return self._rpc_request(account_id, packet)
+        return self._subscribeScheduler.schedule(account_id, instance_index)
 
     def reconnect(self, account_id: str) -> Coroutine:
         """Reconnects to the Metatrader terminal (see https://metaapi.cloud/docs/client/websocket/api/reconnect/).
@@ -527,8 +680,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine which resolves when specification is retrieved.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getSymbolSpecification',
-                                                        'symbol': symbol})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getSymbolSpecification',
+                                                         'symbol': symbol})
         return response['specification']
 
     async def get_symbol_price(self, account_id: str, symbol: str) -> 'asyncio.Future[MetatraderSymbolPrice]':
@@ -542,8 +695,8 @@ class MetaApiWebsocketClient:
         Returns:
             A coroutine which resolves when price is retrieved.
         """
-        response = await self._rpc_request(account_id, {'application': 'RPC', 'type': 'getSymbolPrice',
-                                                        'symbol': symbol})
+        response = await self._read_request(account_id, {'application': 'RPC', 'type': 'getSymbolPrice',
+                                                         'symbol': symbol})
         return response['price']
 
     def save_uptime(self, account_id: str, uptime: Dict):
@@ -558,7 +711,7 @@ class MetaApiWebsocketClient:
         """
         return self._rpc_request(account_id, {'type': 'saveUptime', 'uptime': uptime})
 
-    def unsubscribe(self, account_id: str):
+    async def unsubscribe(self, account_id: str):
         """Unsubscribe from account (see https://metaapi.cloud/docs/client/websocket/api/synchronizing/unsubscribe).
 
         Args:
@@ -566,14 +719,19 @@ class MetaApiWebsocketClient:
 
         Returns:
             A coroutine which resolves when socket is unsubscribed."""
-        return self._rpc_request(account_id, {'type': 'unsubscribe'})
+        response = await self._rpc_request(account_id, {'type': 'unsubscribe'})
+        self._remove_packet_queue(account_id)
+        return response
 
-    def add_synchronization_listener(self, account_id: str, listener):
+    def add_synchronization_listener(self, account_id: str, listener, conflate_prices: bool = False):
         """Adds synchronization listener for specific account.
 
         Args:
             account_id: Account id.
             listener: Synchronization listener to add.
+            conflate_prices: Whether to deliver prices to the listener in a separate task, merging the prices which
+            arrive while the listener is busy so that only the latest price of each symbol is delivered. Intended for
+            listeners which can not keep up with price updates. Default is False.
         """
         if account_id in self._synchronizationListeners:
             listeners = self._synchronizationListeners[account_id]
@@ -581,6 +739,11 @@ class MetaApiWebsocketClient:
             listeners = []
             self._synchronizationListeners[account_id] = listeners
         listeners.append(listener)
+        if conflate_prices:
+            if account_id not in self._priceConflators:
+                self._priceConflators[account_id] = []
+            self._priceConflators[account_id].append(PriceConflator(account_id, listener))
+        self._bind_synchronization_listener_methods(account_id)
 
     def remove_synchronization_listener(self, account_id: str, listener: SynchronizationListener):
         """Removes synchronization listener for specific account.
@@ -596,6 +759,15 @@ class MetaApiWebsocketClient:
         elif listeners.__contains__(listener):
             listeners.remove(listener)
         self._synchronizationListeners[account_id] = listeners
+        if account_id in self._priceConflators:
+            for conflator in self._priceConflators[account_id]:
+                if conflator.listener is listener:
+                    conflator.stop()
+            self._priceConflators[account_id] = list(filter(lambda c: c.listener is not listener,
+                                                            self._priceConflators[account_id]))
+        self._bind_synchronization_listener_methods(account_id)
+        if not listeners:
+            self._remove_packet_queue(account_id)
 
     def add_latency_listener(self, listener: LatencyListener):
         """Adds latency listener.
@@ -611,11 +783,13 @@ class MetaApiWebsocketClient:
             listener: Latency listener to remove."""
         self._latencyListeners = list(filter(lambda l: l != listener, self._latencyListeners))
 
-    def add_reconnect_listener(self, listener: ReconnectListener):
+    def add_reconnect_listener(self, listener: ReconnectListener, account_id: str = None):
         """Adds reconnect listener.
 
         Args:
             listener: Reconnect listener to add.
+            account_id: Id of the account the listener relates to. Used by MetaApiWebsocketPoolClient to notify the
+            listener only about reconnection of the socket which serves the account.
         """
 
         self._reconnectListeners.append(listener)
@@ -634,7 +808,11 @@ class MetaApiWebsocketClient:
         """Removes all listeners. Intended for use in unit tests."""
 
         self._synchronizationListeners = {}
+        self._synchronizationListenerMethods = {}
+        self._stop_price_conflators()
         self._reconnectListeners = []
+        for account_id in list(self._packetQueues.keys()):
+            self._remove_packet_queue(account_id)
 
     async def _reconnect(self):
         reconnected = False
@@ -652,9 +830,12 @@ class MetaApiWebsocketClient:
     async def _rpc_request(self, account_id: str, request: dict, timeout_in_seconds: float = None) -> Coroutine:
         if not self._connected:
             await self.connect()
-        start_time = datetime.now()
-        while not self._resolved and (start_time + timedelta(seconds=self._connect_timeout) > datetime.now()):
-            await asyncio.sleep(1)
+        if not self._resolved:
+            # requests are sent as soon as the socket connects instead of polling the connection state
+            try:
+                await asyncio.wait_for(self._connectedEvent.wait(), timeout=self._connect_timeout)
+            except asyncio.TimeoutError:
+                pass
         if not self._resolved:
             raise TimeoutException(f"MetaApi websocket client request of account {account_id} timed because socket "
                                    f"client failed to connect to the server.")
@@ -665,19 +846,91 @@ class MetaApiWebsocketClient:
             request['requestId'] = request_id
 
         request['timestamps'] = {'clientProcessingStarted': format_date(datetime.now())}
-        self._requestResolves[request_id] = asyncio.Future()
-        self._requestResolves[request_id].type = request['type']
+        request_resolve = asyncio.Future()
+        request_resolve.type = request['type']
+        request_resolve.startTime = asyncio.get_event_loop().time()
+        self._requestResolves[request_id] = request_resolve
+        self._schedule_request_timeout(request_id, request_resolve, request_resolve.startTime +
+                                       (timeout_in_seconds or self._request_timeout))
         request['accountId'] = account_id
         request['application'] = request['application'] if 'application' in request else self._application
-        await self._socket.emit('request', request)
         try:
-            resolve = await asyncio.wait_for(self._requestResolves[request_id], timeout=timeout_in_seconds or
-                                             self._request_timeout)
-        except asyncio.TimeoutError:
-            raise TimeoutException(f"MetaApi websocket client request {request['requestId']} of type "
-                                   f"{request['type']} timed out. Please make sure your account is connected "
-                                   f"to broker before retrying your request.")
-        return resolve
+            await self._socket.emit('request', request)
+            return await request_resolve
+        finally:
+            if request_id in self._requestResolves and self._requestResolves[request_id] is request_resolve:
+                del self._requestResolves[request_id]
+
+    async def _read_request(self, account_id: str, request: dict) -> Coroutine:
+        # concurrent identical read requests share one request in flight. The shared request is cancelled only when
+        # all its callers are cancelled, each caller of a shared request receives its own copy of the response
+        key = (account_id,) + tuple(sorted(request.items()))
+        if key in self._inFlightReadRequests:
+            self._coalescedRequests += 1
+            read_request = self._inFlightReadRequests[key]
+            read_request.shared = True
+        else:
+            read_request = asyncio.create_task(self._rpc_request(account_id, request))
+            read_request.callers = 0
+            read_request.shared = False
+            self._inFlightReadRequests[key] = read_request
+            read_request.add_done_callback(functools.partial(self._on_read_request_done, key))
+        read_request.callers += 1
+        try:
+            response = await asyncio.shield(read_request)
+        except asyncio.CancelledError:
+            if read_request.callers == 1 and not read_request.done():
+                # the request is removed before it is cancelled, so that new callers do not join a cancelled request
+                if key in self._inFlightReadRequests and self._inFlightReadRequests[key] is read_request:
+                    del self._inFlightReadRequests[key]
+                read_request.cancel()
+            raise
+        finally:
+            read_request.callers -= 1
+        return deepcopy(response) if read_request.shared else response
+
+    def _on_read_request_done(self, key: tuple, read_request: asyncio.Task):
+        if key in self._inFlightReadRequests and self._inFlightReadRequests[key] is read_request:
+            del self._inFlightReadRequests[key]
+        if not read_request.cancelled():
+            # the error is retrieved here as well, since all callers of the request might have been cancelled
+            read_request.exception()
+
+    def _send_subscribe_request(self, account_id: str, instance_index: int = None) -> Coroutine:
+        packet = {'type': 'subscribe'}
+        if instance_index:
+            packet['instanceIndex'] = instance_index
+        return self._rpc_request(account_id, packet)
+
+    def _schedule_request_timeout(self, request_id: str, request_resolve: asyncio.Future, deadline: float):
+        # timeouts of all requests are kept in a single deadline heap served by one timer, so that requests do not
+        # need a timeout handle and a wrapper task each
+        self._requestDeadlineCounter += 1
+        heapq.heappush(self._requestDeadlines, (deadline, self._requestDeadlineCounter, request_id,
+                                                request_resolve))
+        if self._requestTimeoutDeadline is None or deadline < self._requestTimeoutDeadline:
+            if self._requestTimeoutHandle is not None:
+                self._requestTimeoutHandle.cancel()
+            self._requestTimeoutDeadline = deadline
+            self._requestTimeoutHandle = asyncio.get_event_loop().call_at(deadline, self._expire_requests)
+
+    def _expire_requests(self):
+        self._requestTimeoutHandle = None
+        self._requestTimeoutDeadline = None
+        now = asyncio.get_event_loop().time()
+        while self._requestDeadlines and self._requestDeadlines[0][0] <= now:
+            deadline, counter, request_id, request_resolve = heapq.heappop(self._requestDeadlines)
+            if request_id in self._requestResolves and self._requestResolves[request_id] is request_resolve:
+                del self._requestResolves[request_id]
+            if not request_resolve.done():
+                self._timedOutRequests += 1
+                request_resolve.set_exception(TimeoutException(
+                    f"MetaApi websocket client request {request_id} of type {request_resolve.type} timed out. "
+                    f"Please make sure your account is connected to broker before retrying your request."))
+        if self._requestDeadlines:
+            self._requestTimeoutDeadline = self._requestDeadlines[0][0]
+            self._requestTimeoutHandle = asyncio.get_event_loop().call_at(self._requestTimeoutDeadline,
+                                                                          self._expire_requests)
 
     def _convert_error(self, data) -> Exception:
         if data['error'] == 'ValidationError':
@@ -699,451 +952,282 @@ class MetaApiWebsocketClient:
             return InternalException(data['message'])
 
     def _convert_iso_time_to_date(self, packet):
-        if not isinstance(packet, str):
-            for field in packet:
-                value = packet[field]
-                if isinstance(value, str) and re.search('time|Time', field) and not \
-                        re.search('brokerTime|BrokerTime', field):
-                    packet[field] = date(value)
-                if isinstance(value, list):
-                    for item in value:
-                        self._convert_iso_time_to_date(item)
-                if isinstance(value, dict):
-                    self._convert_iso_time_to_date(value)
-            if packet and 'timestamps' in packet:
-                for field in packet['timestamps']:
-                    packet['timestamps'][field] = date(packet['timestamps'][field])
-            if packet and 'type' in packet and packet['type'] == 'prices':
-                if 'prices' in packet:
-                    for price in packet['prices']:
-                        if 'timestamps' in price:
-                            for field in price['timestamps']:
-                                if isinstance(price['timestamps'][field], str):
-                                    price['timestamps'][field] = date(price['timestamps'][field])
+        if isinstance(packet, dict):
+            convert_iso_time_to_date(packet)
 
-    async def _process_synchronization_packet(self, packet):
+    async def _queue_synchronization_packet(self, packet):
+        # each account has its own queue and worker, so that a slow listener of one account does not delay
+        # processing of packets of other accounts
         try:
             packets = self._packetOrderer.restore_order(packet)
             for data in packets:
-                instance_id = data['accountId'] + ':' + str(data['instanceIndex'] if 'instanceIndex' in data else 0)
-                instance_index = data['instanceIndex'] if 'instanceIndex' in data else 0
-                if data['type'] == 'authenticated':
-                    if 'host' in data:
-                        self._connectedHosts[instance_id] = data['host']
+                await self._get_packet_queue(data['accountId']).put(data)
+        except Exception as err:
+            print('Failed to queue incoming synchronization packet', err)
+
+    def _get_packet_queue(self, account_id: str) -> PacketQueue:
+        if account_id not in self._packetQueues:
+            queue = PacketQueue(self, self._packetQueueOpts)
+            self._packetQueues[account_id] = queue
+            self._packetQueueWorkers[account_id] = asyncio.create_task(self._process_packet_queue(queue))
+        return self._packetQueues[account_id]
+
+    def _remove_packet_queue(self, account_id: str):
+        if account_id in self._packetQueues:
+            self._packetQueueWorkers[account_id].cancel()
+            self._packetQueues[account_id].clear()
+            del self._packetQueueWorkers[account_id]
+            del self._packetQueues[account_id]
+
+    async def _process_packet_queue(self, queue: PacketQueue):
+        while True:
+            data = await queue.get()
+            await self._dispatch_synchronization_packet(data)
 
-                    on_connected_tasks: List[asyncio.Task] = []
+    async def _process_synchronization_packet(self, packet):
+        try:
+            packets = self._packetOrderer.restore_order(packet)
+            for data in packets:
+                await self._dispatch_synchronization_packet(data)
+        except Exception as err:
+            print('Failed to process incoming synchronization packet', err)
 
-                    async def run_on_connected(listener):
-                        try:
-                            await listener.on_connected(instance_index, data['replicas'])
-                        except Exception as err:
-                            print(f'{data["accountId"]}: Failed to notify listener about connected event', err)
-
-                    if data['accountId'] in self._synchronizationListeners:
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_connected_tasks.append(asyncio.create_task(run_on_connected(listener)))
-                    if len(on_connected_tasks) > 0:
-                        await asyncio.wait(on_connected_tasks)
-                elif data['type'] == 'disconnected':
-                    if instance_id in self._connectedHosts and self._connectedHosts[instance_id] == data['host']:
-                        on_disconnected_tasks: List[asyncio.Task] = []
-
-                        async def run_on_disconnected(listener):
-                            try:
-                                await listener.on_disconnected(instance_index)
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about disconnected event', err)
-
-                        if data['accountId'] in self._synchronizationListeners:
-                            for listener in self._synchronizationListeners[data['accountId']]:
-                                on_disconnected_tasks.append(asyncio.create_task(run_on_disconnected(listener)))
-                        if len(on_disconnected_tasks) > 0:
-                            await asyncio.wait(on_disconnected_tasks)
-                        del self._connectedHosts[instance_id]
-                elif data['type'] == 'synchronizationStarted':
-                    on_sync_started_tasks: List[asyncio.Task] = []
-
-                    async def run_on_sync_started(listener):
-                        try:
-                            await listener.on_synchronization_started(instance_index)
-                        except Exception as err:
-                            print(f'{data["accountId"]}: Failed to notify listener about synchronization started ' +
-                                  'event', err)
-
-                    if data['accountId'] in self._synchronizationListeners:
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_sync_started_tasks.append(asyncio.create_task(run_on_sync_started(listener)))
-                    if len(on_sync_started_tasks) > 0:
-                        await asyncio.wait(on_sync_started_tasks)
-                elif data['type'] == 'accountInformation':
-                    if data['accountInformation'] and (data['accountId'] in self._synchronizationListeners):
-                        on_account_information_updated_tasks: List[asyncio.Task] = []
-
-                        async def run_on_account_info(listener):
-                            try:
-                                await listener.on_account_information_updated(instance_index,
-                                                                              data['accountInformation'])
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about ' +
-                                      'accountInformation event', err)
-
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_account_information_updated_tasks.append(asyncio
-                                                                        .create_task(run_on_account_info(listener)))
-                        if len(on_account_information_updated_tasks) > 0:
-                            await asyncio.wait(on_account_information_updated_tasks)
-                elif data['type'] == 'deals':
-                    if 'deals' in data:
-                        for deal in data['deals']:
-                            on_deal_added_tasks: List[asyncio.Task] = []
-
-                            async def run_on_deal_added(listener):
-                                try:
-                                    await listener.on_deal_added(instance_index, deal)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about deals event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_deal_added_tasks.append(asyncio.create_task(run_on_deal_added(listener)))
-                            if len(on_deal_added_tasks) > 0:
-                                await asyncio.wait(on_deal_added_tasks)
-                elif data['type'] == 'orders':
-                    on_order_updated_tasks: List[asyncio.Task] = []
-
-                    async def run_on_order_updated(listener):
-                        try:
-                            if 'orders' in data:
-                                await listener.on_orders_replaced(instance_index, data['orders'])
-                        except Exception as err:
-                            print(f'{data["accountId"]}: Failed to notify listener about orders event', err)
-
-                    if data['accountId'] in self._synchronizationListeners:
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_order_updated_tasks.append(asyncio.create_task(run_on_order_updated(listener)))
-                    if len(on_order_updated_tasks) > 0:
-                        await asyncio.wait(on_order_updated_tasks)
-                elif data['type'] == 'historyOrders':
-                    if 'historyOrders' in data:
-                        for historyOrder in data['historyOrders']:
-                            on_history_order_added_tasks: List[asyncio.Task] = []
-
-                            async def run_on_order_added(listener):
-                                try:
-                                    await listener.on_history_order_added(instance_index, historyOrder)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about historyOrders ' +
-                                          'event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_history_order_added_tasks.append(asyncio
-                                                                        .create_task(run_on_order_added(listener)))
-                            if len(on_history_order_added_tasks) > 0:
-                                await asyncio.wait(on_history_order_added_tasks)
-                elif data['type'] == 'positions':
-                    on_position_updated_tasks: List[asyncio.Task] = []
-
-                    async def run_on_position_updated(listener):
-                        try:
-                            if 'positions' in data:
-                                await listener.on_positions_replaced(instance_index, data['positions'])
-                        except Exception as err:
-                            print(f'{data["accountId"]}: Failed to notify listener about positions event', err)
-
-                    if data['accountId'] in self._synchronizationListeners:
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_position_updated_tasks.append(asyncio
-                                                             .create_task(run_on_position_updated(listener)))
-                    if len(on_position_updated_tasks) > 0:
-                        await asyncio.wait(on_position_updated_tasks)
-                elif data['type'] == 'update':
-                    if 'accountInformation' in data and (data['accountId'] in self._synchronizationListeners):
-                        on_account_information_updated_tasks: List[asyncio.Task] = []
-
-                        async def run_on_account_information_updated(listener):
-                            try:
-                                await listener.on_account_information_updated(instance_index,
-                                                                              data['accountInformation'])
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_account_information_updated_tasks.append(
-                                asyncio.create_task(run_on_account_information_updated(listener)))
-                        if len(on_account_information_updated_tasks) > 0:
-                            await asyncio.wait(on_account_information_updated_tasks)
-                    if 'updatedPositions' in data:
-                        for position in data['updatedPositions']:
-                            on_position_updated_tasks: List[asyncio.Task] = []
-
-                            async def run_on_position_updated(listener):
-                                try:
-                                    await listener.on_position_updated(instance_index, position)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_position_updated_tasks.append(
-                                        asyncio.create_task(run_on_position_updated(listener)))
-                            if len(on_position_updated_tasks) > 0:
-                                await asyncio.wait(on_position_updated_tasks)
-                    if 'removedPositionIds' in data:
-                        for positionId in data['removedPositionIds']:
-                            on_position_removed_tasks: List[asyncio.Task] = []
-
-                            async def run_on_position_removed(listener):
-                                try:
-                                    await listener.on_position_removed(instance_index, positionId)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_position_removed_tasks.append(
-                                        asyncio.create_task(run_on_position_removed(listener)))
-                            if len(on_position_removed_tasks) > 0:
-                                await asyncio.wait(on_position_removed_tasks)
-                    if 'updatedOrders' in data:
-                        for order in data['updatedOrders']:
-                            on_order_updated_tasks: List[asyncio.Task] = []
-
-                            async def run_on_order_updated(listener):
-                                try:
-                                    await listener.on_order_updated(instance_index, order)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_order_updated_tasks.append(
-                                        asyncio.create_task(run_on_order_updated(listener)))
-                            if len(on_order_updated_tasks) > 0:
-                                await asyncio.wait(on_order_updated_tasks)
-                    if 'completedOrderIds' in data:
-                        for orderId in data['completedOrderIds']:
-                            on_order_completed_tasks: List[asyncio.Task] = []
-
-                            async def run_on_order_completed(listener):
-                                try:
-                                    await listener.on_order_completed(instance_index, orderId)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_order_completed_tasks.append(
-                                        asyncio.create_task(run_on_order_completed(listener)))
-                            if len(on_order_completed_tasks) > 0:
-                                await asyncio.wait(on_order_completed_tasks)
-                    if 'historyOrders' in data:
-                        for historyOrder in data['historyOrders']:
-                            on_history_order_added_tasks: List[asyncio.Task] = []
-
-                            async def run_on_history_order_added(listener):
-                                try:
-                                    await listener.on_history_order_added(instance_index, historyOrder)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_history_order_added_tasks.append(
-                                        asyncio.create_task(run_on_history_order_added(listener)))
-                            if len(on_history_order_added_tasks) > 0:
-                                await asyncio.wait(on_history_order_added_tasks)
-                    if 'deals' in data:
-                        for deal in data['deals']:
-                            on_deal_added_tasks: List[asyncio.Task] = []
-
-                            async def run_on_deal_added(listener):
-                                try:
-                                    await listener.on_deal_added(instance_index, deal)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about update event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_deal_added_tasks.append(
-                                        asyncio.create_task(run_on_deal_added(listener)))
-                            if len(on_deal_added_tasks) > 0:
-                                await asyncio.wait(on_deal_added_tasks)
-                    if 'timestamps' in data:
-                        data['timestamps']['clientProcessingFinished'] = datetime.now()
-                        on_update_tasks: List[asyncio.Task] = []
-
-                        async def run_on_update(listener):
-                            try:
-                                await listener.on_update(data['accountId'], data['timestamps'])
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify latency listener about update event', err)
-
-                        for listener in self._latencyListeners:
-                            on_update_tasks.append(asyncio.create_task(run_on_update(listener)))
-
-                        if len(on_update_tasks) > 0:
-                            await asyncio.wait(on_update_tasks)
-                elif data['type'] == 'dealSynchronizationFinished':
-                    if data['accountId'] in self._synchronizationListeners:
-                        on_deal_synchronization_finished_tasks: List[asyncio.Task] = []
-
-                        async def run_on_deal_synchronization_finished(listener):
-                            try:
-                                await listener.on_deal_synchronization_finished(instance_index,
-                                                                                data['synchronizationId'])
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about ' +
-                                      'dealSynchronizationFinished event', err)
-
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_deal_synchronization_finished_tasks.append(
-                                        asyncio.create_task(run_on_deal_synchronization_finished(listener)))
-                        if len(on_deal_synchronization_finished_tasks) > 0:
-                            await asyncio.wait(on_deal_synchronization_finished_tasks)
-                elif data['type'] == 'orderSynchronizationFinished':
-                    if data['accountId'] in self._synchronizationListeners:
-                        on_order_synchronization_finished_tasks: List[asyncio.Task] = []
-
-                        async def run_on_order_synchronization_finished(listener):
-                            try:
-                                await listener.on_order_synchronization_finished(instance_index,
-                                                                                 data['synchronizationId'])
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about ' +
-                                      'orderSynchronizationFinished event', err)
-
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_order_synchronization_finished_tasks.append(
-                                asyncio.create_task(run_on_order_synchronization_finished(listener)))
-                        if len(on_order_synchronization_finished_tasks) > 0:
-                            await asyncio.wait(on_order_synchronization_finished_tasks)
-                elif data['type'] == 'status':
-                    if instance_id not in self._connectedHosts:
-                        if instance_id not in self._resubscriptionTriggerTimes:
-                            self._resubscriptionTriggerTimes[instance_id] = datetime.now()
-                        elif self._resubscriptionTriggerTimes[instance_id].timestamp() + 2 * 60 < \
-                                datetime.now().timestamp():
-                            del self._resubscriptionTriggerTimes[instance_id]
-                            print(f'[{datetime.now().isoformat()}] it seems like we are not connected to a ' +
-                                  'running API server yet, retrying subscription for account ' + instance_id)
-
-                            async def run_subscribe():
-                                try:
-                                    await self.subscribe(data['accountId'], data['instanceIndex'])
-                                except Exception as error:
-                                    print(f'[{datetime.now().isoformat()}] MetaApi websocket client failed to ' +
-                                          'receive subscribe response for account id ' + instance_id, error)
-                            asyncio.create_task(run_subscribe())
-                    elif instance_id in self._connectedHosts and self._connectedHosts[instance_id] == data['host']:
-                        if instance_id in self._resubscriptionTriggerTimes:
-                            del self._resubscriptionTriggerTimes[instance_id]
-                        on_broker_connection_status_changed_tasks: List[asyncio.Task] = []
-
-                        async def run_on_broker_connection_status_changed(listener):
-                            try:
-                                await listener.on_broker_connection_status_changed(instance_index,
-                                                                                   bool(data['connected']))
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about ' +
-                                      'brokerConnectionStatusChanged event', err)
-
-                        for listener in self._synchronizationListeners[data['accountId']]:
-                            on_broker_connection_status_changed_tasks.append(
-                                asyncio.create_task(run_on_broker_connection_status_changed(listener)))
-                        if len(on_broker_connection_status_changed_tasks) > 0:
-                            await asyncio.wait(on_broker_connection_status_changed_tasks)
-                        if 'healthStatus' in data:
-                            on_health_status_tasks: List[asyncio.Task] = []
-
-                            async def run_on_health_status(listener):
-                                try:
-                                    await listener.on_health_status(instance_index, data['healthStatus'])
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about server-side ' +
-                                          'healthStatus event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_health_status_tasks.append(
-                                        asyncio.create_task(run_on_health_status(listener)))
-                                if len(on_health_status_tasks) > 0:
-                                    await asyncio.wait(on_health_status_tasks)
-                elif data['type'] == 'specifications':
-                    if 'specifications' in data:
-                        for specification in data['specifications']:
-                            on_symbol_specification_updated_tasks: List[asyncio.Task] = []
-
-                            async def run_on_symbol_specification_updated(listener):
-                                try:
-                                    await listener.on_symbol_specification_updated(instance_index, specification)
-                                except Exception as err:
-                                    print(f'{data["accountId"]}: Failed to notify listener about specifications ' +
-                                          'event', err)
-
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_symbol_specification_updated_tasks.append(
-                                        asyncio.create_task(run_on_symbol_specification_updated(listener)))
-                                if len(on_symbol_specification_updated_tasks) > 0:
-                                    await asyncio.wait(on_symbol_specification_updated_tasks)
-                elif data['type'] == 'prices':
-                    if 'prices' in data:
-                        prices = data['prices']
-                        on_symbol_prices_updated_tasks: List[asyncio.Task] = []
-
-                        async def run_on_symbol_prices_updated(listener):
-                            try:
-                                equity = data['equity'] if 'equity' in data else None
-                                margin = data['margin'] if 'margin' in data else None
-                                free_margin = data['freeMargin'] if 'freeMargin' in data else None
-                                margin_level = data['marginLevel'] if 'marginLevel' in data else None
-                                await listener.on_symbol_prices_updated(instance_index, prices, equity, margin,
-                                                                        free_margin, margin_level)
-                            except Exception as err:
-                                print(f'{data["accountId"]}: Failed to notify listener about prices event', err)
-
-                        if data['accountId'] in self._synchronizationListeners:
-                            for listener in self._synchronizationListeners[data['accountId']]:
-                                on_symbol_prices_updated_tasks.append(
-                                    asyncio.create_task(run_on_symbol_prices_updated(listener)))
-                            if len(on_symbol_prices_updated_tasks) > 0:
-                                await asyncio.wait(on_symbol_prices_updated_tasks)
-                        for price in data['prices']:
-                            on_symbol_price_updated_tasks: List[asyncio.Task] = []
-
-                            async def run_on_symbol_price_updated(listener):
-                                try:
-                                    await listener.on_symbol_price_updated(instance_index, price)
-                                except Exception as err:
-                                    print('Failed to notify listener about price event', err)
-                            if data['accountId'] in self._synchronizationListeners:
-                                for listener in self._synchronizationListeners[data['accountId']]:
-                                    on_symbol_price_updated_tasks.append(
-                                        asyncio.create_task(run_on_symbol_price_updated(listener)))
-                                if len(on_symbol_price_updated_tasks) > 0:
-                                    await asyncio.wait(on_symbol_price_updated_tasks)
-
-                        for price in data['prices']:
-                            if 'timestamps' in price:
-                                price['timestamps']['clientProcessingFinished'] = datetime.now()
-                                on_symbol_price_tasks: List[asyncio.Task] = []
-
-                                async def run_on_symbol_price(listener):
-                                    try:
-                                        await listener.on_symbol_price(data['accountId'], price['symbol'],
-                                                                       price['timestamps'])
-                                    except Exception as err:
-                                        print(f'{data["accountId"]}: Failed to notify latency listener about ' +
-                                              'update event', err)
-                                for listener in self._latencyListeners:
-                                    on_symbol_price_tasks.append(
-                                        asyncio.create_task(run_on_symbol_price(listener)))
-                                if len(on_symbol_price_tasks) > 0:
-                                    await asyncio.wait(on_symbol_price_tasks)
+    async def _dispatch_synchronization_packet(self, data: Dict):
+        try:
+            if data['type'] in self._synchronizationPacketHandlers:
+                instance_index = data['instanceIndex'] if 'instanceIndex' in data else 0
+                await self._synchronizationPacketHandlers[data['type']](
+                    data, instance_index, data['accountId'] + ':' + str(instance_index))
         except Exception as err:
             print('Failed to process incoming synchronization packet', err)
 
+    async def _process_authenticated_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'host' in data:
+            self._connectedHosts[instance_id] = data['host']
+        if 'replicas' not in data:
+            print(f'{data["accountId"]}: Failed to notify listeners about connected event, replicas are not specified')
+            return
+        # listeners may issue requests to the server on connection, so they are notified concurrently to let the
+        # local state of every listener be reset before synchronization packets arrive
+        methods = self._get_synchronization_listener_methods(data['accountId'], 'on_connected')
+        await asyncio.gather(*[self._invoke_listener_methods(data['accountId'], 'connected', [method], instance_index,
+                                                             data['replicas']) for method in methods])
+
+    async def _process_disconnected_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if instance_id in self._connectedHosts and self._connectedHosts[instance_id] == data['host']:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_disconnected', 'disconnected',
+                                                         instance_index)
+            del self._connectedHosts[instance_id]
+
+    async def _process_synchronization_started_packet(self, data: Dict, instance_index: int, instance_id: str):
+        await self._notify_synchronization_listeners(data['accountId'], 'on_synchronization_started',
+                                                     'synchronization started', instance_index)
+
+    async def _process_account_information_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if data['accountInformation']:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_account_information_updated',
+                                                         'accountInformation', instance_index,
+                                                         data['accountInformation'])
+
+    async def _process_deals_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'deals' in data:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_deals_added', 'deals',
+                                                         instance_index, data['deals'])
+
+    async def _process_orders_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'orders' in data:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_orders_replaced', 'orders',
+                                                         instance_index, data['orders'])
+
+    async def _process_history_orders_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'historyOrders' in data:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_history_orders_added',
+                                                         'historyOrders', instance_index, data['historyOrders'])
+
+    async def _process_positions_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'positions' in data:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_positions_replaced', 'positions',
+                                                         instance_index, data['positions'])
+
+    async def _process_update_packet(self, data: Dict, instance_index: int, instance_id: str):
+        account_id = data['accountId']
+        if 'accountInformation' in data:
+            await self._notify_synchronization_listeners(account_id, 'on_account_information_updated', 'update',
+                                                         instance_index, data['accountInformation'])
+        for field, method_name in self._updatePacketFields:
+            if field in data:
+                methods = self._get_synchronization_listener_methods(account_id, method_name)
+                if method_name in _synchronization_listener_batch_methods:
+                    await self._invoke_listener_methods(account_id, 'update', methods, instance_index, data[field])
+                else:
+                    for item in data[field]:
+                        await self._invoke_listener_methods(account_id, 'update', methods, instance_index, item)
+        if 'timestamps' in data:
+            data['timestamps']['clientProcessingFinished'] = datetime.now()
+            await self._notify_latency_listeners(account_id, 'on_update', account_id, data['timestamps'])
+
+    async def _process_deal_synchronization_finished_packet(self, data: Dict, instance_index: int,
+                                                            instance_id: str):
+        await self._notify_synchronization_listeners(data['accountId'], 'on_deal_synchronization_finished',
+                                                     'dealSynchronizationFinished', instance_index,
+                                                     data['synchronizationId'])
+
+    async def _process_order_synchronization_finished_packet(self, data: Dict, instance_index: int,
+                                                             instance_id: str):
+        await self._notify_synchronization_listeners(data['accountId'], 'on_order_synchronization_finished',
+                                                     'orderSynchronizationFinished', instance_index,
+                                                     data['synchronizationId'])
+
+    async def _process_status_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if instance_id not in self._connectedHosts:
+            if instance_id not in self._resubscriptionTriggerTimes:
+                self._resubscriptionTriggerTimes[instance_id] = datetime.now()
+            elif self._resubscriptionTriggerTimes[instance_id].timestamp() + 2 * 60 < datetime.now().timestamp():
+                del self._resubscriptionTriggerTimes[instance_id]
+                print(f'[{datetime.now().isoformat()}] it seems like we are not connected to a ' +
+                      'running API server yet, retrying subscription for account ' + instance_id)
+                asyncio.create_task(self._retry_subscribe(data['accountId'], instance_index, instance_id))
+        elif self._connectedHosts[instance_id] == data['host']:
+            if instance_id in self._resubscriptionTriggerTimes:
+                del self._resubscriptionTriggerTimes[instance_id]
+            await self._notify_synchronization_listeners(data['accountId'], 'on_broker_connection_status_changed',
+                                                         'brokerConnectionStatusChanged', instance_index,
+                                                         bool(data['connected']))
+            if 'healthStatus' in data:
+                await self._notify_synchronization_listeners(data['accountId'], 'on_health_status',
+                                                             'server-side healthStatus', instance_index,
+                                                             data['healthStatus'])
+
+    async def _process_specifications_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'specifications' in data:
+            await self._notify_synchronization_listeners(data['accountId'], 'on_symbol_specifications_updated',
+                                                         'specifications', instance_index, data['specifications'])
+
+    async def _process_prices_packet(self, data: Dict, instance_index: int, instance_id: str):
+        if 'prices' in data:
+            account_id = data['accountId']
+            prices = data['prices']
+            await self._notify_synchronization_listeners(
+                account_id, 'on_symbol_prices_updated', 'prices', instance_index, prices,
+                data['equity'] if 'equity' in data else None, data['margin'] if 'margin' in data else None,
+                data['freeMargin'] if 'freeMargin' in data else None,
+                data['marginLevel'] if 'marginLevel' in data else None)
+            methods = self._get_synchronization_listener_methods(account_id, 'on_symbol_price_updated')
+            if methods:
+                for price in prices:
+                    await self._invoke_listener_methods(account_id, 'price', methods, instance_index, price)
+            for price in prices:
+                if 'timestamps' in price:
+                    price['timestamps']['clientProcessingFinished'] = datetime.now()
+                    await self._notify_latency_listeners(account_id, 'on_symbol_price', account_id, price['symbol'],
+                                                         price['timestamps'])
+
+    async def _retry_subscribe(self, account_id: str, instance_index: int, instance_id: str):
+        try:
+            await self.subscribe(account_id, instance_index)
+        except Exception as error:
+            print(f'[{datetime.now().isoformat()}] MetaApi websocket client failed to ' +
+                  'receive subscribe response for account id ' + instance_id, error)
+
+    def _bind_synchronization_listener_methods(self, account_id: str):
+        methods_by_name = {}
+        for listener in self._synchronizationListeners[account_id]:
+            conflator = self._get_price_conflator(account_id, listener)
+            for method_name in _synchronization_listener_method_names:
+                if conflator is not None and method_name in ['on_symbol_prices_updated', 'on_symbol_price_updated']:
+                    # prices of a conflating listener are delivered by its conflator in a separate task
+                    method = conflator.on_symbol_prices_updated if method_name == 'on_symbol_prices_updated' and \
+                        (self._get_overridden_listener_method(listener, 'on_symbol_prices_updated') is not None or
+                         self._get_overridden_listener_method(listener, 'on_symbol_price_updated') is not None) \
+                        else None
+                elif method_name in _synchronization_listener_batch_methods:
+                    method = self._get_batch_listener_method(account_id, listener, method_name)
+                else:
+                    method = self._get_overridden_listener_method(listener, method_name)
+                if method is not None:
+                    if method_name not in methods_by_name:
+                        methods_by_name[method_name] = []
+                    methods_by_name[method_name].append(method)
+        self._synchronizationListenerMethods[account_id] = methods_by_name
+
+    def _get_price_conflator(self, account_id: str, listener) -> Optional[PriceConflator]:
+        if account_id in self._priceConflators:
+            for conflator in self._priceConflators[account_id]:
+                if conflator.listener is listener:
+                    return conflator
+        return None
+
+    def _stop_price_conflators(self):
+        for conflators in self._priceConflators.values():
+            for conflator in conflators:
+                conflator.stop()
+        self._priceConflators = {}
+
+    def _get_overridden_listener_method(self, listener, method_name: str) -> Optional[Callable]:
+        # no-op methods inherited from SynchronizationListener are not bound, so that events are dispatched only to
+        # the listeners which process them
+        method = getattr(listener, method_name, None)
+        if method is None or getattr(method, '__func__', None) is getattr(SynchronizationListener, method_name):
+            return None
+        return method
+
+    def _get_batch_listener_method(self, account_id: str, listener, method_name: str) -> Optional[Callable]:
+        item_method_name, event = _synchronization_listener_batch_methods[method_name]
+        method = self._get_overridden_listener_method(listener, method_name)
+        item_method = self._get_overridden_listener_method(listener, item_method_name)
+        # a batch method is used unless the listener does not implement it as a coroutine or a subclass overrides the
+        # item method below the class which implements the batch method
+        if method is not None and asyncio.iscoroutinefunction(method) and \
+                (item_method is None or self._get_method_definition_depth(listener, method_name) <=
+                 self._get_method_definition_depth(listener, item_method_name)):
+            return method
+        # listeners which do not process items in bulk receive items one by one, so that a failure on one item
+        # does not prevent the rest of the items from being delivered
+        if item_method is not None:
+            return functools.partial(self._invoke_listener_method_for_each_item, account_id, event, item_method)
+        return None
+
+    def _get_method_definition_depth(self, listener, method_name: str) -> int:
+        if method_name in getattr(listener, '__dict__', {}):
+            return -1
+        mro = type(listener).__mro__
+        for i in range(len(mro)):
+            if method_name in mro[i].__dict__:
+                return i
+        return len(mro)
+
+    def _get_synchronization_listener_methods(self, account_id: str, method_name: str) -> List[Callable]:
+        if account_id in self._synchronizationListenerMethods:
+            methods_by_name = self._synchronizationListenerMethods[account_id]
+            if method_name in methods_by_name:
+                return methods_by_name[method_name]
+        return []
+
+    async def _notify_synchronization_listeners(self, account_id: str, method_name: str, event: str, *args):
+        methods = self._get_synchronization_listener_methods(account_id, method_name)
+        if methods:
+            await self._invoke_listener_methods(account_id, event, methods, *args)
+
+    async def _notify_latency_listeners(self, account_id: str, method_name: str, *args):
+        if self._latencyListeners:
+            methods = [getattr(listener, method_name) for listener in self._latencyListeners]
+            await self._invoke_listener_methods(account_id, 'latency', methods, *args)
+
+    async def _invoke_listener_methods(self, account_id: str, event: str, methods: List[Callable], *args):
+        for method in methods:
+            try:
+                await method(*args)
+            except Exception as err:
+                print(f'{account_id}: Failed to notify listener about {event} event', err)
+
+    async def _invoke_listener_method_for_each_item(self, account_id: str, event: str, method: Callable,
+                                                    instance_index: int, items: List):
+        for item in items:
+            try:
+                await method(instance_index, item)
+            except Exception as err:
+                print(f'{account_id}: Failed to notify listener about {event} event', err)
+
     async def _fire_reconnected(self):
         for listener in self._reconnectListeners:
             try:
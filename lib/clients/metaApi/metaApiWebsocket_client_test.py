@@ -1,4 +1,5 @@
 from .metaApiWebsocket_client import MetaApiWebsocketClient
+from .synchronizationListener import SynchronizationListener
 from socketio import AsyncServer
 from aiohttp import web
 from ...metaApi.models import date, format_date
@@ -788,6 +789,57 @@ class TestMetaApiWebsocketClient:
         await client._socket.wait()
         listener.on_health_status.assert_called_with(1, {'restApiHealthy': True})
 
+    @pytest.mark.asyncio
+    async def test_process_packets_of_accounts_independently(self):
+        """Should not delay packets of an account while a listener of another account processes a packet."""
+        metrics = {}
+
+        async def process_slowly(*args):
+            await asyncio.Event().wait()
+
+        async def save_metrics(*args):
+            metrics.update(client.synchronization_queue_metrics)
+            await client.close()
+
+        slow_listener = MagicMock()
+        slow_listener.on_account_information_updated = AsyncMock(side_effect=process_slowly)
+        listener = MagicMock()
+        listener.on_account_information_updated = AsyncMock(side_effect=save_metrics)
+        client.add_synchronization_listener('accountId1', slow_listener)
+        client.add_synchronization_listener('accountId2', listener)
+        await sio.emit('synchronization', {'type': 'accountInformation', 'accountId': 'accountId1',
+                                           'accountInformation': {'balance': 1}})
+        await sio.emit('synchronization', {'type': 'accountInformation', 'accountId': 'accountId1',
+                                           'accountInformation': {'balance': 2}})
+        await sio.emit('synchronization', {'type': 'accountInformation', 'accountId': 'accountId2',
+                                           'accountInformation': {'balance': 3}})
+        await asyncio.wait_for(client._socket.wait(), 3)
+        listener.on_account_information_updated.assert_called_with(0, {'balance': 3})
+        slow_listener.on_account_information_updated.assert_called_once_with(0, {'balance': 1})
+        assert metrics['accountId1']['depth'] == 1
+        assert metrics['accountId2']['depth'] == 0
+
+    @pytest.mark.asyncio
+    async def test_remove_packet_queue_with_last_listener(self):
+        """Should remove the packet queue of an account when the last synchronization listener is removed."""
+        listener = MagicMock()
+        listener.on_account_information_updated = AsyncMock()
+        client.add_synchronization_listener('accountId', listener)
+        await client._queue_synchronization_packet({'type': 'accountInformation', 'accountId': 'accountId',
+                                                    'accountInformation': {'balance': 1}})
+        await asyncio.sleep(0.05)
+        listener.on_account_information_updated.assert_called_with(0, {'balance': 1})
+        assert 'accountId' in client.synchronization_queue_metrics
+        client.remove_synchronization_listener('accountId', listener)
+        assert 'accountId' not in client.synchronization_queue_metrics
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_on_dropped_state_packet(self):
+        """Should resubscribe an instance when its state packet is dropped because of queue overflow."""
+        client.subscribe = AsyncMock()
+        await client.on_dropped_packet('accountId', 1, {'type': 'update', 'accountId': 'accountId'})
+        client.subscribe.assert_called_with('accountId', 1)
+
     @pytest.mark.asyncio
     async def test_process_disconnected_synchronization_event(self):
         """Should process disconnected synchronization event."""
@@ -981,6 +1033,164 @@ class TestMetaApiWebsocketClient:
         deals[0]['time'] = date(deals[0]['time'])
         listener.on_deal_added.assert_called_with(1, deals[0])
 
+    @pytest.mark.asyncio
+    async def test_notify_listeners_after_listener_failure(self):
+        """Should notify remaining listeners if one of the listeners fails to process an event."""
+
+        deals = [{'id': '33230099', 'type': 'DEAL_TYPE_BUY', 'time': '2020-04-15T02:45:06.521Z'},
+                 {'id': '33230100', 'type': 'DEAL_TYPE_SELL', 'time': '2020-04-15T02:45:07.521Z'}]
+        failing_listener = MagicMock()
+        failing_listener.on_deal_added = AsyncMock(side_effect=Exception('test'))
+        listener = MagicMock()
+        listener.on_deal_added = AsyncMock()
+        client.add_synchronization_listener('accountId', failing_listener)
+        client.add_synchronization_listener('accountId', listener)
+        await client._process_synchronization_packet({'type': 'deals', 'accountId': 'accountId', 'deals': deals,
+                                                      'instanceIndex': 1})
+        assert failing_listener.on_deal_added.call_count == 2
+        listener.on_deal_added.assert_any_call(1, deals[0])
+        listener.on_deal_added.assert_any_call(1, deals[1])
+
+    @pytest.mark.asyncio
+    async def test_notify_listeners_sequentially(self):
+        """Should notify listeners one after another in the order of registration."""
+
+        events = []
+
+        class SlowListener(SynchronizationListener):
+            async def on_account_information_updated(self, instance_index, account_information):
+                events.append('slow listener started')
+                await asyncio.sleep(0.05)
+                events.append('slow listener finished')
+
+        class FastListener(SynchronizationListener):
+            async def on_account_information_updated(self, instance_index, account_information):
+                events.append('fast listener notified')
+
+        client.add_synchronization_listener('accountId', SlowListener())
+        client.add_synchronization_listener('accountId', FastListener())
+        await client._process_synchronization_packet({'type': 'accountInformation', 'accountId': 'accountId',
+                                                      'accountInformation': {'balance': 1000}})
+        assert events == ['slow listener started', 'slow listener finished', 'fast listener notified']
+
+    @pytest.mark.asyncio
+    async def test_notify_listeners_about_connection_concurrently(self):
+        """Should notify listeners about connection concurrently."""
+
+        connected = asyncio.Event()
+
+        class WaitingListener(SynchronizationListener):
+            async def on_connected(self, instance_index, replicas):
+                await connected.wait()
+
+        class ConnectedListener(SynchronizationListener):
+            async def on_connected(self, instance_index, replicas):
+                connected.set()
+
+        client.add_synchronization_listener('accountId', WaitingListener())
+        client.add_synchronization_listener('accountId', ConnectedListener())
+        await asyncio.wait_for(client._process_synchronization_packet({
+            'type': 'authenticated', 'accountId': 'accountId', 'instanceIndex': 1, 'replicas': 1}), 1)
+        assert connected.is_set()
+
+    @pytest.mark.asyncio
+    async def test_skip_connected_event_without_replicas(self):
+        """Should not notify listeners about connection if the number of replicas is not specified."""
+
+        listener = MagicMock()
+        listener.on_connected = AsyncMock()
+        client.add_synchronization_listener('accountId', listener)
+        await client._process_synchronization_packet({'type': 'authenticated', 'accountId': 'accountId',
+                                                      'instanceIndex': 1})
+        listener.on_connected.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_notify_batch_listeners_once_per_packet(self):
+        """Should pass all packet items to a listener which overrides a batch callback in a single call."""
+
+        deals = [{'id': '33230099', 'type': 'DEAL_TYPE_BUY', 'time': '2020-04-15T02:45:06.521Z'},
+                 {'id': '33230100', 'type': 'DEAL_TYPE_SELL', 'time': '2020-04-15T02:45:07.521Z'}]
+
+        class BatchListener(SynchronizationListener):
+            def __init__(self):
+                super().__init__()
+                self.batches = []
+                self.deals = []
+
+            async def on_deals_added(self, instance_index, deals):
+                self.batches.append(deals)
+
+            async def on_deal_added(self, instance_index, deal):
+                self.deals.append(deal)
+
+        listener = BatchListener()
+        client.add_synchronization_listener('accountId', listener)
+        await client._process_synchronization_packet({'type': 'deals', 'accountId': 'accountId', 'deals': deals,
+                                                      'instanceIndex': 1})
+        assert listener.batches == [deals]
+        assert listener.deals == []
+
+    @pytest.mark.asyncio
+    async def test_notify_item_listeners_overriding_batch_listeners(self):
+        """Should pass packet items one by one to a subclass which overrides an item callback only."""
+
+        deals = [{'id': '33230099', 'type': 'DEAL_TYPE_BUY', 'time': '2020-04-15T02:45:06.521Z'},
+                 {'id': '33230100', 'type': 'DEAL_TYPE_SELL', 'time': '2020-04-15T02:45:07.521Z'}]
+
+        class BatchListener(SynchronizationListener):
+            async def on_deals_added(self, instance_index, deals):
+                raise Exception('batch listener should not be called')
+
+        class ItemListener(BatchListener):
+            def __init__(self):
+                super().__init__()
+                self.deals = []
+
+            async def on_deal_added(self, instance_index, deal):
+                self.deals.append(deal)
+
+        listener = ItemListener()
+        client.add_synchronization_listener('accountId', listener)
+        await client._process_synchronization_packet({'type': 'deals', 'accountId': 'accountId', 'deals': deals,
+                                                      'instanceIndex': 1})
+        assert listener.deals == deals
+
+    @pytest.mark.asyncio
+    async def test_notify_duck_typed_batch_listeners(self):
+        """Should pass all packet items in a single call to a listener which implements a batch coroutine."""
+
+        deals = [{'id': '33230099', 'type': 'DEAL_TYPE_BUY', 'time': '2020-04-15T02:45:06.521Z'}]
+        listener = MagicMock()
+        listener.on_deals_added = AsyncMock()
+        listener.on_deal_added = AsyncMock()
+        client.add_synchronization_listener('accountId', listener)
+        await client._process_synchronization_packet({'type': 'deals', 'accountId': 'accountId', 'deals': deals,
+                                                      'instanceIndex': 1})
+        listener.on_deals_added.assert_called_once_with(1, deals)
+        listener.on_deal_added.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_skip_listener_methods_which_are_not_overridden(self):
+        """Should not dispatch events to listener methods which are not overridden."""
+
+        class PriceListener(SynchronizationListener):
+            def __init__(self):
+                super().__init__()
+                self.prices = []
+
+            async def on_symbol_price_updated(self, instance_index, price):
+                self.prices.append(price)
+
+        listener = PriceListener()
+        client.add_synchronization_listener('accountId', listener)
+        assert client._get_synchronization_listener_methods('accountId', 'on_symbol_price_updated') == \
+            [listener.on_symbol_price_updated]
+        assert client._get_synchronization_listener_methods('accountId', 'on_deals_added') == []
+        assert client._get_synchronization_listener_methods('accountId', 'on_symbol_prices_updated') == []
+        await client._process_synchronization_packet({'type': 'prices', 'accountId': 'accountId', 'instanceIndex': 1,
+                                                      'prices': [{'symbol': 'EURUSD', 'bid': 1, 'ask': 1.1}]})
+        assert listener.prices == [{'symbol': 'EURUSD', 'bid': 1, 'ask': 1.1}]
+
     @pytest.mark.asyncio
     async def test_process_synchronization_updates(self):
         """Should process synchronization updates."""
@@ -1115,6 +1325,138 @@ class TestMetaApiWebsocketClient:
             assert err.__class__.__name__ == 'TimeoutException'
             await client.close()
 
+    @pytest.mark.asyncio
+    async def test_send_request_once_connected(self):
+        """Should send a request as soon as the socket is connected."""
+
+        @sio.on('request')
+        async def on_request(sid, data):
+            if data['type'] == 'getPositions':
+                await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                            'requestId': data['requestId'], 'positions': []})
+
+        new_client = MetaApiWebsocketClient('token', {'application': 'application', 'requestTimeout': 3})
+        new_client.set_url('http://localhost:8080')
+        start_time = datetime.now()
+        try:
+            assert await new_client.get_positions('accountId') == []
+            assert (datetime.now() - start_time).total_seconds() < 0.5
+        finally:
+            await new_client.close()
+
+    @pytest.mark.asyncio
+    async def test_remove_timed_out_requests(self):
+        """Should remove timed out requests and track request metrics."""
+
+        @sio.on('request')
+        async def on_request(sid, data):
+            if data['type'] == 'getPositions':
+                await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                            'requestId': data['requestId'], 'positions': []})
+
+        client._request_timeout = 0.2
+        tasks = [asyncio.create_task(client.get_account_information('accountId')),
+                 asyncio.create_task(client.get_orders('accountId'))]
+        await asyncio.sleep(0.1)
+        metrics = client.rpc_request_metrics
+        assert metrics['inFlightRequests'] == 2
+        assert 0.05 < metrics['oldestRequestAge'] < 0.2
+        assert await client.get_positions('accountId') == []
+        tasks[1].cancel()
+        for task in tasks:
+            try:
+                await task
+                raise Exception('TimeoutException expected')
+            except asyncio.CancelledError:
+                pass
+            except Exception as err:
+                assert err.__class__.__name__ == 'TimeoutException'
+        assert client._requestResolves == {}
+        assert client.rpc_request_metrics == {'inFlightRequests': 0, 'oldestRequestAge': 0, 'timedOutRequests': 1,
+                                              'coalescedRequests': 0}
+
+    @pytest.mark.asyncio
+    async def test_coalesce_identical_read_requests(self):
+        """Should share one request in flight between identical read requests."""
+
+        requests = []
+
+        @sio.on('request')
+        async def on_request(sid, data):
+            requests.append(data['type'])
+            await asyncio.sleep(0.05)
+            if data['type'] == 'getSymbolPrice':
+                await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                            'requestId': data['requestId'], 'price': {'symbol': data['symbol']}})
+            elif data['type'] == 'trade':
+                await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                            'requestId': data['requestId'],
+                                            'response': {'stringCode': 'TRADE_RETCODE_DONE', 'numericCode': 10009}})
+
+        prices = await asyncio.gather(client.get_symbol_price('accountId', 'EURUSD'),
+                                      client.get_symbol_price('accountId', 'EURUSD'),
+                                      client.get_symbol_price('accountId', 'GBPUSD'))
+        assert prices == [{'symbol': 'EURUSD'}, {'symbol': 'EURUSD'}, {'symbol': 'GBPUSD'}]
+        trade = {'actionType': 'ORDER_TYPE_SELL', 'symbol': 'EURUSD', 'volume': 0.07}
+        await asyncio.gather(client.trade('accountId', dict(trade)), client.trade('accountId', dict(trade)))
+        assert requests == ['getSymbolPrice', 'getSymbolPrice', 'trade', 'trade']
+        assert client.rpc_request_metrics['coalescedRequests'] == 1
+        assert client._inFlightReadRequests == {}
+
+    @pytest.mark.asyncio
+    async def test_keep_coalesced_read_request_if_one_caller_is_cancelled(self):
+        """Should keep a coalesced read request in flight while it has callers."""
+
+        @sio.on('request')
+        async def on_request(sid, data):
+            await asyncio.sleep(0.1)
+            await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                        'requestId': data['requestId'], 'positions': []})
+
+        tasks = [asyncio.create_task(client.get_positions('accountId')),
+                 asyncio.create_task(client.get_positions('accountId'))]
+        await asyncio.sleep(0.05)
+        tasks[0].cancel()
+        assert await tasks[1] == []
+        assert tasks[0].cancelled()
+
+    @pytest.mark.asyncio
+    async def test_return_own_copy_of_coalesced_response(self):
+        """Should return own copy of a coalesced read response to each caller."""
+
+        @sio.on('request')
+        async def on_request(sid, data):
+            await asyncio.sleep(0.05)
+            await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                        'requestId': data['requestId'], 'positions': [{'id': '1'}]})
+
+        positions = await asyncio.gather(client.get_positions('accountId'), client.get_positions('accountId'))
+        positions[0][0]['id'] = '2'
+        positions[0].append({'id': '3'})
+        assert positions[1] == [{'id': '1'}]
+
+    @pytest.mark.asyncio
+    async def test_not_join_cancelled_read_request(self):
+        """Should send a new read request instead of joining a request cancelled by all its callers."""
+
+        requests = 0
+
+        @sio.on('request')
+        async def on_request(sid, data):
+            nonlocal requests
+            requests += 1
+            await asyncio.sleep(0.1)
+            await sio.emit('response', {'type': 'response', 'accountId': data['accountId'],
+                                        'requestId': data['requestId'], 'positions': []})
+
+        task = asyncio.create_task(client.get_positions('accountId'))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0)
+        # a caller arriving before the cancelled request completes sends a new request
+        assert await client.get_positions('accountId') == []
+        assert requests == 2
+
     @pytest.mark.asyncio
     async def test_subscribe_to_market_data_with_mt_terminal(self):
         """Should subscribe to market data with MetaTrader terminal."""
@@ -1174,6 +1516,53 @@ class TestMetaApiWebsocketClient:
         listener.on_symbol_prices_updated.assert_called_with(1, prices, 100, 200, 400, 40000)
         listener.on_symbol_price_updated.assert_called_with(1, prices[0])
 
+    @pytest.mark.asyncio
+    async def test_parse_symbol_price_times_lazily(self):
+        """Should parse times of symbol prices on access if lazy time parsing is enabled."""
+
+        client._lazyTimeParsing = True
+        listener = MagicMock()
+        listener.on_symbol_price_updated = FinalMock()
+        client.add_synchronization_listener('accountId', listener)
+        await sio.emit('synchronization', {'type': 'prices', 'accountId': 'accountId', 'instanceIndex': 1,
+                                           'prices': [{'symbol': 'AUDNZD', 'bid': 1.05916,
+                                                       'time': '2020-04-15T02:45:06.521Z'}]})
+        await client._socket.wait()
+        price = listener.on_symbol_price_updated.call_args[0][1]
+        assert price['time'] == date('2020-04-15T02:45:06.521Z')
+        assert price == {'symbol': 'AUDNZD', 'bid': 1.05916, 'time': date('2020-04-15T02:45:06.521Z')}
+
+    @pytest.mark.asyncio
+    async def test_conflate_symbol_prices(self):
+        """Should deliver only the latest symbol prices to a listener with price conflation enabled."""
+
+        release = asyncio.Event()
+        calls = []
+
+        class SlowListener(SynchronizationListener):
+            async def on_symbol_prices_updated(self, instance_index, prices, equity=None, margin=None,
+                                               free_margin=None, margin_level=None):
+                calls.append((instance_index, prices, equity))
+                await release.wait()
+
+        listener = SlowListener()
+        client.add_synchronization_listener('accountId', listener, True)
+        for prices, equity in [([{'symbol': 'EURUSD', 'bid': 1}], 100), ([{'symbol': 'EURUSD', 'bid': 2}], None),
+                               ([{'symbol': 'GBPUSD', 'bid': 3}], 110), ([{'symbol': 'EURUSD', 'bid': 4}], None)]:
+            packet = {'type': 'prices', 'accountId': 'accountId', 'prices': prices, 'instanceIndex': 1}
+            if equity is not None:
+                packet['equity'] = equity
+            await client._process_synchronization_packet(packet)
+            await asyncio.sleep(0)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert calls == [(1, [{'symbol': 'EURUSD', 'bid': 1}], 100),
+                         (1, [{'symbol': 'EURUSD', 'bid': 4}, {'symbol': 'GBPUSD', 'bid': 3}], 110)]
+        assert client.get_price_conflation_metrics('accountId', listener) == \
+            {'pendingPrices': 0, 'deliveredPrices': 3, 'droppedPrices': 1}
+        client.remove_synchronization_listener('accountId', listener)
+        assert client.get_price_conflation_metrics('accountId', listener) is None
+
     @pytest.mark.asyncio
     async def test_wait_for_server_side_sync(self):
         """Should wait for server-side terminal state synchronization."""
@@ -1,13 +1,13 @@
 import os
-from typing import Dict, List, Optional
+import zlib
+from typing import AsyncIterator, Dict, List, Optional
 from typing_extensions import TypedDict
-import json
+from .. import jsonCodec
 import math
 from datetime import datetime
 import asyncio
-import functools
 import shutil
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from ...metaApi.models import date
 
 
@@ -22,6 +22,9 @@ class PacketLoggerOpts(TypedDict):
     """Whether to compress specifications packets. Default is true."""
     compressPrices: Optional[bool]
     """Whether to compress price packets. Default is true."""
+    compressLogs: Optional[bool]
+    """Whether to write logs as zlib compressed blocks with an index of block times, which lets read_logs read only
+    the blocks within the requested time range. Default is false."""
 
 
 class PacketLogger:
@@ -38,9 +41,13 @@ class PacketLogger:
         self._logFileSizeInHours = opts['logFileSizeInHours'] if 'logFileSizeInHours' in opts else 4
         self._compressSpecifications = opts['compressSpecifications'] if 'compressSpecifications' in opts else True
         self._compressPrices = opts['compressPrices'] if 'compressPrices' in opts else True
+        self._compressLogs = opts['compressLogs'] if 'compressLogs' in opts else False
         self._previousPrices = {}
         self._lastKeepAlive = {}
         self._writeQueue = {}
+        self._files = {}
+        self._indexFiles = {}
+        self._writerExecutor: ThreadPoolExecutor or None = None
         self._root = './.metaapi/logs'
         self._recordInterval: asyncio.Task or None = None
         self._deleteOldLogsInterval: asyncio.Task or None = None
@@ -55,59 +62,64 @@ class PacketLogger:
             self._previousPrices[account_id] = {}
 
     def log_packet(self, packet: Dict):
-        """Processes packets and pushes them into save queue.
+        """Processes packets and pushes them into save queue. Packets are serialized immediately and are not retained,
+        so they can be modified after the call.
 
         Args:
             packet: Packet to log.
         """
         instance_index = packet['instanceIndex'] if 'instanceIndex' in packet else 0
-        packet = deepcopy(packet)
-        if packet['accountId'] not in self._writeQueue:
-            self._writeQueue[packet['accountId']] = {'isWriting': False, 'queue': []}
+        account_id = packet['accountId']
+        if account_id not in self._writeQueue:
+            self._writeQueue[account_id] = []
         if packet['type'] == 'status':
             return
-        if packet['accountId'] not in self._lastKeepAlive:
-            self._lastKeepAlive[packet['accountId']] = {}
+        if account_id not in self._lastKeepAlive:
+            self._lastKeepAlive[account_id] = {}
         if packet['type'] == 'keepalive':
-            self._lastKeepAlive[packet['accountId']][instance_index] = packet
+            self._lastKeepAlive[account_id][instance_index] = packet['sequenceNumber'] if 'sequenceNumber' in packet \
+                else None
             return
-        queue: List = self._writeQueue[packet['accountId']]['queue']
-        if packet['accountId'] not in self._previousPrices:
-            self._previousPrices[packet['accountId']] = {}
-        prev_price = self._previousPrices[packet['accountId']][instance_index] if \
-            instance_index in self._previousPrices[packet['accountId']] else None
+        queue: List = self._writeQueue[account_id]
+        prev_price = self._previousPrices[account_id][instance_index] if account_id in self._previousPrices and \
+            instance_index in self._previousPrices[account_id] else None
         if packet['type'] != 'prices':
             if prev_price is not None:
-                self._record_prices(packet['accountId'], instance_index)
+                self._record_prices(account_id, instance_index)
             if packet['type'] == 'specifications' and self._compressSpecifications:
-                queue.append(json.dumps({'type': packet['type'], 'sequenceNumber': packet['sequenceNumber'] if
-                                         'sequenceNumber' in packet else None, 'sequenceTimestamp':
-                                         packet['sequenceTimestamp'] if 'sequenceTimestamp' in packet else None,
-                                         'instanceIndex': instance_index}))
+                queue.append(jsonCodec.dumps({'type': packet['type'], 'sequenceNumber': packet['sequenceNumber'] if
+                                              'sequenceNumber' in packet else None, 'sequenceTimestamp':
+                                              packet['sequenceTimestamp'] if 'sequenceTimestamp' in packet else None,
+                                              'instanceIndex': instance_index}))
             else:
-                queue.append(json.dumps(packet))
+                queue.append(jsonCodec.dumps(packet))
         else:
+            message = jsonCodec.dumps(packet)
             if not self._compressPrices:
-                queue.append(json.dumps(packet))
+                queue.append(message)
             else:
                 if prev_price is not None:
-                    valid_sequence_numbers = [prev_price['last']['sequenceNumber'],
-                                              prev_price['last']['sequenceNumber'] + 1]
-                    if instance_index in self._lastKeepAlive[packet['accountId']]:
-                        valid_sequence_numbers.append(
-                            self._lastKeepAlive[packet['accountId']][instance_index]['sequenceNumber'] + 1)
+                    valid_sequence_numbers = [prev_price['last'], prev_price['last'] + 1]
+                    if instance_index in self._lastKeepAlive[account_id] and \
+                            self._lastKeepAlive[account_id][instance_index] is not None:
+                        valid_sequence_numbers.append(self._lastKeepAlive[account_id][instance_index] + 1)
                     if packet['sequenceNumber'] not in valid_sequence_numbers:
-                        self._record_prices(packet['accountId'], instance_index)
-                        self._ensure_previous_price_object(packet['accountId'])
-                        self._previousPrices[packet['accountId']][instance_index] = {'first': packet, 'last': packet}
-                        queue.append(json.dumps(packet))
+                        self._record_prices(account_id, instance_index)
+                        self._ensure_previous_price_object(account_id)
+                        self._previousPrices[account_id][instance_index] = {
+                            'first': packet['sequenceNumber'], 'last': packet['sequenceNumber'],
+                            'lastMessage': message}
+                        queue.append(message)
                     else:
-                        self._previousPrices[packet['accountId']][instance_index]['last'] = packet
+                        prev_price['last'] = packet['sequenceNumber']
+                        prev_price['lastMessage'] = message
                 else:
                     if 'sequenceNumber' in packet:
-                        self._ensure_previous_price_object(packet['accountId'])
-                        self._previousPrices[packet['accountId']][instance_index] = {'first': packet, 'last': packet}
-                    queue.append(json.dumps(packet))
+                        self._ensure_previous_price_object(account_id)
+                        self._previousPrices[account_id][instance_index] = {
+                            'first': packet['sequenceNumber'], 'last': packet['sequenceNumber'],
+                            'lastMessage': message}
+                    queue.append(message)
 
     async def read_logs(self, account_id: str, date_after: datetime = None, date_before: datetime = None):
         """Returns log messages within date bounds as an array of objects.
@@ -117,21 +129,92 @@ class PacketLogger:
             date_after: Date to get logs after.
             date_before: Date to get logs before.
         """
+        return [record async for record in self.iterate_logs(account_id, date_after, date_before)]
+
+    async def iterate_logs(self, account_id: str, date_after: datetime = None, date_before: datetime = None,
+                           types: List[str] = None, instance_index: int = None, min_sequence_number: int = None,
+                           max_sequence_number: int = None) -> AsyncIterator[Dict]:
+        """Iterates over log messages within date bounds, reading log files lazily. Messages which are not packets,
+        e.g. recorded price ranges, are returned only if no packet filters are specified.
+
+        Args:
+            account_id: Account id.
+            date_after: Date to get logs after.
+            date_before: Date to get logs before.
+            types: Packet types to get logs of.
+            instance_index: Instance index to get logs of.
+            min_sequence_number: Minimum sequence number of packets to get logs of.
+            max_sequence_number: Maximum sequence number of packets to get logs of.
+
+        Returns:
+            Async iterator of log messages.
+        """
+        if types is None and instance_index is None and min_sequence_number is None and \
+                max_sequence_number is None:
+            async for record in self._read_records(account_id, date_after, date_before):
+                yield record
+            return
+        # packets are serialized compactly, so substrings of the filtered fields are looked up in messages to skip
+        # most of the messages without parsing them
+        type_substrings = list(map(lambda packet_type: f'"type":"{packet_type}"', types)) if types is not None \
+            else None
+        # the instance index is followed by a delimiter, so that e.g. index 1 does not match index 10, and packets
+        # without an instance index belong to the instance 0
+        instance_substrings = [f'"instanceIndex":{instance_index},', f'"instanceIndex":{instance_index}}}'] if \
+            instance_index is not None else None
+        async for record in self._read_records(account_id, date_after, date_before):
+            message = record['message']
+            if not message.startswith('{') or \
+                    (type_substrings is not None and
+                     not any(map(lambda substring: substring in message, type_substrings))) or \
+                    (instance_substrings is not None and
+                     not any(map(lambda substring: substring in message, instance_substrings)) and
+                     (instance_index != 0 or '"instanceIndex":' in message)) or \
+                    ((min_sequence_number is not None or max_sequence_number is not None) and
+                     '"sequenceNumber":' not in message):
+                continue
+            packet = jsonCodec.loads(message)
+            packet_instance_index = packet['instanceIndex'] if 'instanceIndex' in packet else 0
+            sequence_number = packet['sequenceNumber'] if 'sequenceNumber' in packet else None
+            if (types is not None and (packet['type'] if 'type' in packet else None) not in types) or \
+                    (instance_index is not None and packet_instance_index != instance_index) or \
+                    (min_sequence_number is not None and (sequence_number is None or
+                                                          sequence_number < min_sequence_number)) or \
+                    (max_sequence_number is not None and (sequence_number is None or
+                                                          sequence_number > max_sequence_number)):
+                continue
+            yield record
+
+    async def _read_records(self, account_id: str, date_after: datetime = None,
+                            date_before: datetime = None) -> AsyncIterator[Dict]:
         folders = os.listdir(self._root)
         folders.sort()
-        packets = []
         for folder in folders:
             file_path = f'{self._root}/{folder}/{account_id}.log'
             if os.path.exists(file_path):
-                contents = open(file_path, "r").readlines()
-                messages = list(map(lambda message: {'date': date(message[1:24]), 'message':
-                                    message[26:].replace('\n', '')}, contents))
-                if date_after:
-                    messages = list(filter(lambda message: message['date'] > date_after, messages))
-                if date_before:
-                    messages = list(filter(lambda message: message['date'] < date_before, messages))
-                packets += messages
-        return packets
+                with open(file_path, 'r') as file:
+                    for line in file:
+                        record = {'date': date(line[1:24]), 'message': line[26:].replace('\n', '')}
+                        if (not date_after or record['date'] > date_after) and \
+                                (not date_before or record['date'] < date_before):
+                            yield record
+            file_path = f'{self._root}/{folder}/{account_id}.zlog'
+            if os.path.exists(file_path) and os.path.exists(file_path + '.idx'):
+                with open(file_path + '.idx', 'r') as index_file:
+                    index = index_file.read().splitlines()
+                with open(file_path, 'rb') as file:
+                    for entry in index:
+                        block_time, offset, length = entry.split('\t')
+                        block_date = date(block_time)
+                        # all records of a block are written at the block time, so blocks out of bounds are skipped
+                        # without reading them
+                        if (date_after and block_date <= date_after) or (date_before and block_date >= date_before):
+                            continue
+                        file.seek(int(offset))
+                        for message in zlib.decompress(file.read(int(length))).decode('utf-8').split('\r'):
+                            if message:
+                                yield {'date': block_date, 'message': message[26:]}
+                        await asyncio.sleep(0)
 
     def get_file_path(self, account_id) -> str:
         """Returns path for account log file.
@@ -142,12 +225,15 @@ class PacketLogger:
         Returns:
             File path.
         """
-        file_index = math.floor(datetime.now().hour / self._logFileSizeInHours)
-        folder_name = f'{datetime.now().strftime("%Y-%m-%d")}-{file_index if file_index > 9 else "0" + str(file_index)}'
+        folder_name = self._get_folder_name()
         if not os.path.exists(f'{self._root}/{folder_name}'):
             os.mkdir(f'{self._root}/{folder_name}')
         return f'{self._root}/{folder_name}/{account_id}.log'
 
+    def _get_folder_name(self) -> str:
+        file_index = math.floor(datetime.now().hour / self._logFileSizeInHours)
+        return f'{datetime.now().strftime("%Y-%m-%d")}-{file_index if file_index > 9 else "0" + str(file_index)}'
+
     def start(self):
         """Initializes the packet logger."""
         self._previousPrices = {}
@@ -162,16 +248,23 @@ class PacketLogger:
                 await asyncio.sleep(10)
                 await self._delete_old_data()
 
+        if not self._writerExecutor:
+            # log files are written by a dedicated thread which owns the open file handles
+            self._writerExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='PacketLogger')
         if not self._recordInterval:
             self._recordInterval = asyncio.create_task(record_job())
             self._deleteOldLogsInterval = asyncio.create_task(delete_old_data_job())
 
     def stop(self):
-        """Deinitializes the packet logger."""
+        """Deinitializes the packet logger, writing queued logs and closing log files."""
         self._recordInterval.cancel()
         self._recordInterval = None
         self._deleteOldLogsInterval.cancel()
         self._deleteOldLogsInterval = None
+        self._writerExecutor.submit(self._write_logs, *self._take_write_queue())
+        self._writerExecutor.submit(self._close_files)
+        self._writerExecutor.shutdown(wait=True)
+        self._writerExecutor = None
 
     def _record_prices(self, account_id: str, instance_index: int):
         """Records price packet messages to log files.
@@ -179,39 +272,93 @@ class PacketLogger:
         Args:
             account_id: Account id.
         """
-        prev_price = self._previousPrices[account_id][instance_index] if instance_index \
-            in self._previousPrices[account_id] else {'first': {}, 'last': {}}
-        queue = self._writeQueue[account_id]['queue']
+        prev_price = self._previousPrices[account_id][instance_index]
+        queue = self._writeQueue[account_id]
         del self._previousPrices[account_id][instance_index]
         if not len(self._previousPrices[account_id].keys()):
             del self._previousPrices[account_id]
-        if prev_price['first']['sequenceNumber'] != prev_price['last']['sequenceNumber']:
-            queue.append(json.dumps(prev_price['last']))
-            queue.append(f'Recorded price packets {prev_price["first"]["sequenceNumber"]}'
-                         f'-{prev_price["last"]["sequenceNumber"]}, instanceIndex: {instance_index}')
+        if prev_price['first'] != prev_price['last']:
+            queue.append(prev_price['lastMessage'])
+            queue.append(f'Recorded price packets {prev_price["first"]}-{prev_price["last"]}, '
+                         f'instanceIndex: {instance_index}')
+
+    def _take_write_queue(self) -> tuple:
+        messages_by_account = []
+        for account_id in self._writeQueue:
+            if len(self._writeQueue[account_id]):
+                messages_by_account.append((account_id, self._writeQueue[account_id]))
+                self._writeQueue[account_id] = []
+        return self._get_folder_name(), f'[{datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]}] ', \
+            messages_by_account
 
     async def _append_logs(self):
         """Writes logs to files."""
-        for key in self._writeQueue:
-            queue = self._writeQueue[key]
-            if (not queue['isWriting']) and len(queue['queue']):
-                queue['isWriting'] = True
-                try:
-                    file_path = self.get_file_path(key)
-                    write_string = functools.reduce(
-                        lambda a, b: a + f'[{datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]}] {b}\r',
-                        queue['queue'], '')
-                    queue['queue'] = []
-                    f = open(file_path, "a+")
-                    f.write(write_string)
-                    f.close()
-                except Exception as err:
-                    print('Error writing log', err)
-                queue['isWriting'] = False
+        folder_name, prefix, messages_by_account = self._take_write_queue()
+        if len(messages_by_account):
+            await asyncio.get_event_loop().run_in_executor(self._writerExecutor, self._write_logs, folder_name, prefix,
+                                                           messages_by_account)
+
+    def _write_logs(self, folder_name: str, prefix: str, messages_by_account: List[tuple]):
+        """Writes messages to log files, runs in the writer thread.
+
+        Args:
+            folder_name: Name of the folder of the current time bucket.
+            prefix: Timestamp prefix of the messages.
+            messages_by_account: List of account ids and messages to write.
+        """
+        for account_id, messages in messages_by_account:
+            try:
+                file = self._get_file(account_id, folder_name)
+                contents = ''.join(map(lambda message: prefix + message + '\r', messages))
+                if self._compressLogs:
+                    block = zlib.compress(contents.encode('utf-8'))
+                    offset = file.tell()
+                    file.write(block)
+                    file.flush()
+                    # the index entry is written after the block, so readers only see complete blocks
+                    index_file = self._indexFiles[account_id]
+                    index_file.write(f'{prefix[1:24]}\t{offset}\t{len(block)}\n')
+                    index_file.flush()
+                else:
+                    file.write(contents)
+                    file.flush()
+            except Exception as err:
+                print('Error writing log', err)
+
+    def _get_file(self, account_id: str, folder_name: str):
+        file_path = f'{self._root}/{folder_name}/{account_id}.{"zlog" if self._compressLogs else "log"}'
+        if account_id in self._files:
+            if self._files[account_id].name == file_path:
+                return self._files[account_id]
+            # the time bucket changed, so the file is rotated
+            self._close_account_files(account_id)
+        os.makedirs(f'{self._root}/{folder_name}', exist_ok=True)
+        if self._compressLogs:
+            self._files[account_id] = open(file_path, 'ab')
+            self._indexFiles[account_id] = open(file_path + '.idx', 'a')
+        else:
+            self._files[account_id] = open(file_path, 'a')
+        return self._files[account_id]
+
+    def _close_files(self, folder_path: str = None):
+        for account_id in list(self._files.keys()):
+            if folder_path is None or self._files[account_id].name.startswith(folder_path + '/'):
+                self._close_account_files(account_id)
+
+    def _close_account_files(self, account_id: str):
+        self._files[account_id].close()
+        del self._files[account_id]
+        if account_id in self._indexFiles:
+            self._indexFiles[account_id].close()
+            del self._indexFiles[account_id]
 
     async def _delete_old_data(self):
         """Deletes folders when the folder limit is exceeded."""
+        await asyncio.get_event_loop().run_in_executor(self._writerExecutor, self._delete_folders)
+
+    def _delete_folders(self):
         contents = os.listdir(self._root)
         contents.sort()
         for folder_name in list(reversed(contents))[self._fileNumberLimit:]:
+            self._close_files(f'{self._root}/{folder_name}')
             shutil.rmtree(f'{self._root}/{folder_name}')
@@ -1,11 +1,13 @@
 import pytest
 from mock import patch
 from .packetLogger import PacketLogger
+from .. import jsonCodec
 from typing import Dict
 from copy import deepcopy
 from ...metaApi.models import date
 from asyncio import sleep
 import shutil
+import zlib
 import json
 import os
 from freezegun import freeze_time
@@ -286,3 +288,152 @@ class TestPacketLogger:
             folder_list = os.listdir(folder)
             folder_list.sort()
             assert folder_list == ['2020-10-10-01', '2020-10-10-02', '2020-10-10-03']
+
+    @pytest.mark.asyncio
+    async def test_record_packets_modified_after_logging(self):
+        """Should record packets as they were when logged."""
+        packet = deepcopy(packets['prices'])
+        packet_logger.log_packet(packet)
+        packet_logger.log_packet(change_sn(packets['prices'], 2))
+        last_packet = change_sn(packets['prices'], 3)
+        packet_logger.log_packet(last_packet)
+        packet['prices'][0]['bid'] = 2
+        last_packet['prices'][0]['bid'] = 2
+        packet_logger.log_packet(packets['accountInformation'])
+        await sleep(0.04)
+        result = await packet_logger.read_logs('accountId')
+        assert json.loads(result[0]['message']) == packets['prices']
+        assert json.loads(result[1]['message']) == change_sn(packets['prices'], 3)
+
+    @pytest.mark.asyncio
+    async def test_rotate_log_files(self):
+        """Should keep log files open and rotate them when the time bucket changes."""
+        with freeze_time(start_time) as frozen_datetime:
+            packet_logger.log_packet(packets['accountInformation'])
+            await sleep(0.04)
+            packet_logger.log_packet(packets['accountInformation'])
+            await sleep(0.04)
+            file = packet_logger._files['accountId']
+            assert file.name == folder + '2020-10-10-00/accountId.log'
+            frozen_datetime.move_to('2020-10-10 05:00:01.000')
+            packet_logger.log_packet(packets['accountInformation'])
+            await sleep(0.04)
+            assert file.closed
+            assert packet_logger._files['accountId'].name == folder + '2020-10-10-01/accountId.log'
+            assert len(await packet_logger.read_logs('accountId')) == 3
+
+    @pytest.mark.asyncio
+    async def test_write_queued_logs_on_stop(self):
+        """Should write queued logs and close files on stop."""
+        global packet_logger
+        packet_logger.log_packet(packets['accountInformation'])
+        await sleep(0.04)
+        packet_logger.log_packet(packets['accountInformation'])
+        packet_logger.stop()
+        assert packet_logger._files == {}
+        assert len(await packet_logger.read_logs('accountId')) == 2
+        packet_logger = PacketLogger()
+        packet_logger.start()
+
+    @pytest.mark.asyncio
+    async def test_record_compressed_logs(self):
+        """Should record logs as compressed blocks."""
+        global packet_logger
+        packet_logger.stop()
+        packet_logger = PacketLogger({'compressLogs': True})
+        packet_logger.start()
+        packet_logger.log_packet(packets['accountInformation'])
+        packet_logger.log_packet(packets['prices'])
+        packet_logger.log_packet(change_sn(packets['prices'], 2))
+        packet_logger.log_packet(packets['specifications'])
+        await sleep(0.04)
+        result = await packet_logger.read_logs('accountId')
+        assert json.loads(result[0]['message']) == packets['accountInformation']
+        assert json.loads(result[1]['message']) == packets['prices']
+        assert json.loads(result[2]['message']) == change_sn(packets['prices'], 2)
+        assert result[3]['message'] == 'Recorded price packets 1-2, instanceIndex: 7'
+        assert len(result) == 5
+        assert not os.path.exists(packet_logger.get_file_path('accountId'))
+
+    @pytest.mark.asyncio
+    async def test_read_compressed_logs_within_bounds(self):
+        """Should read only compressed blocks within bounds."""
+        global packet_logger
+        packet_logger.stop()
+        packet_logger = PacketLogger({'compressLogs': True})
+        packet_logger.start()
+        with freeze_time(start_time) as frozen_datetime:
+            for time, count in [('2020-10-10 00:00:01.000', 2), ('2020-10-10 01:00:01.000', 5),
+                                ('2020-10-10 01:30:01.000', 3)]:
+                frozen_datetime.move_to(time)
+                for i in range(count):
+                    packet_logger.log_packet(packets['accountInformation'])
+                await sleep(0.04)
+            with patch('lib.clients.metaApi.packetLogger.zlib.decompress', wraps=zlib.decompress) as decompress:
+                result = await packet_logger.read_logs('accountId', date('2020-10-10 00:30:00.000'),
+                                                       date('2020-10-10 01:30:00.000'))
+                assert len(result) == 5
+                assert json.loads(result[0]['message']) == packets['accountInformation']
+                assert result[0]['date'] == date('2020-10-10 01:00:01.000')
+                assert decompress.call_count == 1
+            assert len(await packet_logger.read_logs('accountId', date('2020-10-10 00:30:00.000'))) == 8
+            assert len(await packet_logger.read_logs('accountId', None, date('2020-10-10 01:30:00.000'))) == 7
+
+    @pytest.mark.asyncio
+    async def test_iterate_logs_with_filters(self):
+        """Should iterate over logs filtered by packet type, instance index and sequence number."""
+        account_info = deepcopy(packets['accountInformation'])
+        account_info['instanceIndex'] = 0
+        packet_logger.log_packet(packets['accountInformation'])
+        packet_logger.log_packet(account_info)
+        for sequence_number in range(1, 5):
+            packet_logger.log_packet(change_sn(packets['specifications'], sequence_number))
+            packet_logger.log_packet(change_sn(packets['specifications'], sequence_number, 70))
+        await sleep(0.04)
+
+        async def messages(**kwargs):
+            records = packet_logger.iterate_logs('accountId', **kwargs)
+            return [json.loads(record['message']) async for record in records]
+        assert len(await messages()) == 10
+        assert await messages(types=['accountInformation']) == [packets['accountInformation'], account_info]
+        assert await messages(types=['accountInformation'], instance_index=0) == [account_info]
+        specifications = await messages(types=['specifications', 'prices'], instance_index=7,
+                                        min_sequence_number=2, max_sequence_number=3)
+        assert list(map(lambda packet: packet['sequenceNumber'], specifications)) == [2, 3]
+        assert all(map(lambda packet: packet['instanceIndex'] == 7, specifications))
+        assert len(await messages(min_sequence_number=4)) == 2
+
+    @pytest.mark.asyncio
+    async def test_filter_instance_index_without_parsing_other_instances(self):
+        """Should skip packets of other instances without parsing them."""
+        account_info = deepcopy(packets['accountInformation'])
+        del account_info['instanceIndex']
+        packet_logger.log_packet(account_info)
+        packet_logger.log_packet(change_sn(packets['accountInformation'], 1, 0))
+        packet_logger.log_packet(change_sn(packets['accountInformation'], 1, 1))
+        packet_logger.log_packet(change_sn(packets['accountInformation'], 1, 10))
+        await sleep(0.04)
+
+        async def messages(instance_index):
+            records = packet_logger.iterate_logs('accountId', instance_index=instance_index)
+            return [json.loads(record['message']) async for record in records]
+        with patch('lib.clients.metaApi.packetLogger.jsonCodec.loads', wraps=jsonCodec.loads) as loads:
+            assert await messages(0) == [account_info, change_sn(packets['accountInformation'], 1, 0)]
+            assert loads.call_count == 2
+            loads.reset_mock()
+            assert await messages(1) == [change_sn(packets['accountInformation'], 1, 1)]
+            assert loads.call_count == 1
+            loads.reset_mock()
+            assert await messages(10) == [change_sn(packets['accountInformation'], 1, 10)]
+            assert loads.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_iterate_logs_lazily(self):
+        """Should read log files lazily."""
+        for i in range(3):
+            packet_logger.log_packet(packets['accountInformation'])
+        await sleep(0.04)
+        iterator = packet_logger.iterate_logs('accountId')
+        record = await iterator.__anext__()
+        assert json.loads(record['message']) == packets['accountInformation']
+        await iterator.aclose()
@@ -1,42 +1,86 @@
+from ...metaApi.reservoir.statisticalReservoir import StatisticalReservoir
 import asyncio
-from typing import Dict, List
+import heapq
+from typing import Dict, List, Optional
+from typing_extensions import TypedDict
 from datetime import datetime
 
 
+class AdaptivePacketOrderingOpts(TypedDict):
+    """Adaptive packet ordering timeout options."""
+
+    enabled: Optional[bool]
+    """An option to derive the packet ordering timeout of an account instance from the observed time it takes for a
+    sequence gap to fill. The packet ordering timeout is used as the maximum timeout and until enough gaps are
+    observed. Default is False."""
+    percentile: Optional[float]
+    """Percentile of observed gap fill times the timeout is derived from, from 0 to 100. Default is 99."""
+    multiplier: Optional[float]
+    """Multiplier applied to the percentile. Default is 2."""
+    minTimeoutInSeconds: Optional[float]
+    """Minimum timeout in seconds. Default is 1."""
+    minSamples: Optional[int]
+    """Amount of observed gap fills required to derive the timeout. Default is 10."""
+
+
 class PacketOrderer:
     """Class which orders the synchronization packets."""
 
-    def __init__(self, out_of_order_listener, ordering_timeout_in_seconds: float):
+    def __init__(self, out_of_order_listener, ordering_timeout_in_seconds: float,
+                 adaptive_opts: AdaptivePacketOrderingOpts = None):
         """Inits the class.
 
         Args:
             out_of_order_listener: A function which will receive out of order packet events.
             ordering_timeout_in_seconds: Packet ordering timeout.
+            adaptive_opts: Adaptive packet ordering timeout options.
         """
+        adaptive_opts = adaptive_opts or {}
         self._outOfOrderListener = out_of_order_listener
         self._orderingTimeoutInSeconds = ordering_timeout_in_seconds
+        self._adaptiveTimeout = adaptive_opts['enabled'] if 'enabled' in adaptive_opts else False
+        self._adaptivePercentile = adaptive_opts['percentile'] if 'percentile' in adaptive_opts else 99
+        self._adaptiveMultiplier = adaptive_opts['multiplier'] if 'multiplier' in adaptive_opts else 2
+        self._minOrderingTimeoutInSeconds = min(ordering_timeout_in_seconds, adaptive_opts['minTimeoutInSeconds'] if
+                                                'minTimeoutInSeconds' in adaptive_opts else 1)
+        self._minGapFillSamples = adaptive_opts['minSamples'] if 'minSamples' in adaptive_opts else 10
+        self._gapFillTimes = {}
+        self._orderingTimeouts = {}
         self._isOutOfOrderEmitted = {}
         self._waitListSizeLimit = 100
-        self._outOfOrderInterval = None
+        self._started = False
 
     def start(self):
         """Initializes the packet orderer"""
         self._sequenceNumberByInstance = {}
         self._lastSessionStartTimestamp = {}
         self._packetsByInstance = {}
-
-        async def emit_events():
-            while True:
-                await asyncio.sleep(1)
-                self._emit_out_of_order_events()
-
-        if not self._outOfOrderInterval:
-            self._outOfOrderInterval = asyncio.create_task(emit_events())
+        self._deadlines = []
+        self._waitListCounter = 0
+        self._timeoutHandle = None
+        self._timeoutDeadline = None
+        self._started = True
 
     def stop(self):
         """Deinitializes the packet orderer."""
-        self._outOfOrderInterval.cancel()
-        self._outOfOrderInterval = None
+        self._started = False
+        if self._timeoutHandle is not None:
+            self._timeoutHandle.cancel()
+            self._timeoutHandle = None
+            self._timeoutDeadline = None
+        self._deadlines = []
+
+    def get_ordering_timeout(self, instance_id: str) -> float:
+        """Returns packet ordering timeout of an account instance.
+
+        Args:
+            instance_id: Account instance id in the account id:instance index format.
+
+        Returns:
+            Packet ordering timeout in seconds.
+        """
+        return self._orderingTimeouts[instance_id] if instance_id in self._orderingTimeouts else \
+            self._orderingTimeoutInSeconds
 
     def restore_order(self, packet: Dict) -> List[Dict]:
         """Processes the packet and resolves in the order of packet sequence number.
@@ -53,11 +97,12 @@ class PacketOrderer:
             self._isOutOfOrderEmitted[instance_id] = False
             self._sequenceNumberByInstance[instance_id] = packet['sequenceNumber']
             self._lastSessionStartTimestamp[instance_id] = packet['sequenceTimestamp']
-            self._packetsByInstance[instance_id] = \
-                list(filter(lambda wait_packet: wait_packet['packet']['sequenceTimestamp'] >=
-                            packet['sequenceTimestamp'],
-                            (self._packetsByInstance[instance_id] if instance_id in
-                             self._packetsByInstance else [])))
+            if instance_id in self._packetsByInstance:
+                wait_list = list(filter(lambda item: item[2]['packet']['sequenceTimestamp'] >=
+                                        packet['sequenceTimestamp'], self._packetsByInstance[instance_id]))
+                heapq.heapify(wait_list)
+                self._packetsByInstance[instance_id] = wait_list
+                self._schedule_head_deadline(instance_id)
             return [packet] + self._find_next_packets_from_wait_list(instance_id)
         elif instance_id in self._lastSessionStartTimestamp and \
                 packet['sequenceTimestamp'] < self._lastSessionStartTimestamp[instance_id]:
@@ -71,49 +116,96 @@ class PacketOrderer:
                 packet['sequenceNumber'] == self._sequenceNumberByInstance[instance_id] + 1:
             # in-order packet was received
             self._sequenceNumberByInstance[instance_id] += 1
-            return [packet] + self._find_next_packets_from_wait_list(instance_id)
+            return [packet] + self._find_next_packets_from_wait_list(instance_id, True)
         else:
-            # out-of-order packet was received, add it to the wait list
-            self._packetsByInstance[instance_id] = self._packetsByInstance[instance_id] \
-                if instance_id in self._packetsByInstance else []
+            # out-of-order packet was received, add it to the wait list which is a heap ordered by sequence number
+            if instance_id not in self._packetsByInstance:
+                self._packetsByInstance[instance_id] = []
             wait_list = self._packetsByInstance[instance_id]
-            wait_list.append({
+            head = wait_list[0] if wait_list else None
+            self._waitListCounter += 1
+            heapq.heappush(wait_list, (packet['sequenceNumber'], self._waitListCounter, {
                 'instanceId': instance_id,
                 'accountId': packet['accountId'],
                 'instanceIndex': packet['instanceIndex'] if 'instanceIndex' in packet else 0,
                 'sequenceNumber': packet['sequenceNumber'],
                 'packet': packet,
-                'receivedAt': datetime.now()
-            })
-            wait_list.sort(key=lambda i: i['sequenceNumber'])
+                'receivedAt': datetime.now(),
+                'addedAt': asyncio.get_event_loop().time(),
+                'deadline': asyncio.get_event_loop().time() + self.get_ordering_timeout(instance_id)
+            }))
             while len(wait_list) > self._waitListSizeLimit:
-                wait_list.pop(0)
+                heapq.heappop(wait_list)
+            if not wait_list or wait_list[0] is not head:
+                self._schedule_head_deadline(instance_id)
             return []
 
-    def _find_next_packets_from_wait_list(self, instance_id) -> List:
+    def _find_next_packets_from_wait_list(self, instance_id, gap_filled: bool = False) -> List:
         result = []
+        added_at = None
         wait_list = self._packetsByInstance[instance_id] if instance_id in self._packetsByInstance else []
-        while len(wait_list) and wait_list[0]['sequenceNumber'] in [self._sequenceNumberByInstance[instance_id],
-                                                                    self._sequenceNumberByInstance[instance_id] + 1]:
-            result.append(wait_list[0]['packet'])
-            if wait_list[0]['sequenceNumber'] == self._sequenceNumberByInstance[instance_id] + 1:
+        head = wait_list[0] if wait_list else None
+        while len(wait_list) and wait_list[0][0] in [self._sequenceNumberByInstance[instance_id],
+                                                     self._sequenceNumberByInstance[instance_id] + 1]:
+            sequence_number, counter, item = heapq.heappop(wait_list)
+            result.append(item['packet'])
+            added_at = item['addedAt'] if added_at is None else min(added_at, item['addedAt'])
+            if sequence_number == self._sequenceNumberByInstance[instance_id] + 1:
                 self._sequenceNumberByInstance[instance_id] += 1
-            wait_list.pop(0)
-        if not len(wait_list) and instance_id in self._packetsByInstance:
-            del self._packetsByInstance[instance_id]
+        if gap_filled and added_at is not None and self._adaptiveTimeout:
+            # the gap is filled, so the time the longest waiting packet spent in the wait list is the gap fill time
+            self._record_gap_fill_time(instance_id, asyncio.get_event_loop().time() - added_at)
+        if not len(wait_list):
+            if instance_id in self._packetsByInstance:
+                del self._packetsByInstance[instance_id]
+        elif wait_list[0] is not head:
+            self._schedule_head_deadline(instance_id)
         return result
 
+    def _record_gap_fill_time(self, instance_id: str, gap_fill_time: float):
+        if instance_id not in self._gapFillTimes:
+            self._gapFillTimes[instance_id] = StatisticalReservoir(1000, 60 * 60 * 1000)
+        reservoir = self._gapFillTimes[instance_id]
+        reservoir.push_measurement(gap_fill_time)
+        if reservoir.length >= self._minGapFillSamples:
+            timeout = reservoir.get_percentile(self._adaptivePercentile) * self._adaptiveMultiplier
+            self._orderingTimeouts[instance_id] = min(self._orderingTimeoutInSeconds,
+                                                      max(self._minOrderingTimeoutInSeconds, timeout))
+
+    def _schedule_head_deadline(self, instance_id: str):
+        # only the packet at the head of a wait list can time out, so a deadline is pushed to the global heap when
+        # the head changes. Deadlines of packets which are no longer at the head are skipped when they expire
+        wait_list = self._packetsByInstance[instance_id] if instance_id in self._packetsByInstance else []
+        if not wait_list or not self._started:
+            return
+        head = wait_list[0]
+        deadline = head[2]['deadline']
+        self._waitListCounter += 1
+        heapq.heappush(self._deadlines, (deadline, self._waitListCounter, instance_id, head))
+        if self._timeoutDeadline is None or deadline < self._timeoutDeadline:
+            if self._timeoutHandle is not None:
+                self._timeoutHandle.cancel()
+            self._timeoutDeadline = deadline
+            self._timeoutHandle = asyncio.get_event_loop().call_at(deadline, self._emit_out_of_order_events)
+
     def _emit_out_of_order_events(self):
-        for key, wait_list in self._packetsByInstance.items():
-            if len(wait_list) and \
-                    (wait_list[0][
-                         'receivedAt'].timestamp() + self._orderingTimeoutInSeconds) < datetime.now().timestamp():
-                instance_id = wait_list[0]['instanceId']
-                if instance_id not in self._isOutOfOrderEmitted or not self._isOutOfOrderEmitted[instance_id]:
-                    self._isOutOfOrderEmitted[instance_id] = True
-                    # Do not emit onOutOfOrderPacket for packets that come before synchronizationStarted
-                    if instance_id in self._sequenceNumberByInstance:
-                        asyncio.create_task(self._outOfOrderListener.on_out_of_order_packet(
-                            wait_list[0]['accountId'], wait_list[0]['instanceIndex'],
-                            self._sequenceNumberByInstance[instance_id] + 1,
-                            wait_list[0]['sequenceNumber'], wait_list[0]['packet'], wait_list[0]['receivedAt']))
+        self._timeoutHandle = None
+        self._timeoutDeadline = None
+        now = asyncio.get_event_loop().time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, counter, instance_id, head = heapq.heappop(self._deadlines)
+            wait_list = self._packetsByInstance[instance_id] if instance_id in self._packetsByInstance else []
+            if not wait_list or wait_list[0] is not head:
+                continue
+            item = head[2]
+            if instance_id not in self._isOutOfOrderEmitted or not self._isOutOfOrderEmitted[instance_id]:
+                self._isOutOfOrderEmitted[instance_id] = True
+                # Do not emit onOutOfOrderPacket for packets that come before synchronizationStarted
+                if instance_id in self._sequenceNumberByInstance:
+                    asyncio.create_task(self._outOfOrderListener.on_out_of_order_packet(
+                        item['accountId'], item['instanceIndex'], self._sequenceNumberByInstance[instance_id] + 1,
+                        item['sequenceNumber'], item['packet'], item['receivedAt']))
+        if self._deadlines:
+            self._timeoutDeadline = self._deadlines[0][0]
+            self._timeoutHandle = asyncio.get_event_loop().call_at(self._timeoutDeadline,
+                                                                   self._emit_out_of_order_events)
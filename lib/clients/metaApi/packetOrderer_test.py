@@ -1,12 +1,10 @@
 from .packetOrderer import PacketOrderer
 import pytest
 import asyncio
-from mock import MagicMock, patch
-from datetime import datetime
+from mock import MagicMock
 
 out_of_order_listener = MagicMock()
 packet_orderer = PacketOrderer(out_of_order_listener, 0.5)
-date = datetime.fromtimestamp(1000000000)
 
 
 @pytest.fixture(autouse=True)
@@ -202,35 +200,37 @@ class TestPacketOrderer:
     async def test_call_out_of_order_if_timeout(self):
         """Should call on-out-of-order listener if the first packet in wait list is timed out."""
         out_of_order_listener.on_out_of_order_packet = MagicMock()
+        start_packet = {
+            'type': 'synchronizationStarted',
+            'sequenceTimestamp': 1603124267178,
+            'sequenceNumber': 1,
+            'synchronizationId': 'synchronizationId',
+            'accountId': 'accountId'
+        }
         timed_out_packet = {
-            'accountId': 'accountId',
-            'instanceId': 'accountId:0',
-            'instanceIndex': 0,
+            'type': 'prices',
+            'sequenceTimestamp': 1603124267180,
             'sequenceNumber': 11,
-            'packet': {},
-            'receivedAt': date
+            'accountId': 'accountId'
         }
         not_timed_out_packet = {
-            'accountId': 'accountId',
-            'instanceId': 'accountId:0',
-            'instanceIndex': 0,
+            'type': 'prices',
+            'sequenceTimestamp': 1603124267187,
             'sequenceNumber': 15,
-            'packet': {},
-            'receivedAt': datetime.fromtimestamp(10000000000)
+            'accountId': 'accountId'
         }
-        packet_orderer._sequenceNumberByInstance['accountId:0'] = 1
-        packet_orderer._packetsByInstance['accountId:0'] = [
-            timed_out_packet,
-            not_timed_out_packet
-        ]
-        await asyncio.sleep(1)
+        packet_orderer.restore_order(start_packet)
+        packet_orderer.restore_order(timed_out_packet)
+        await asyncio.sleep(0.3)
+        packet_orderer.restore_order(not_timed_out_packet)
+        await asyncio.sleep(0.3)
         out_of_order_listener.on_out_of_order_packet.assert_called_once()
         args_list = out_of_order_listener.on_out_of_order_packet.call_args_list[0].args
         assert args_list[0] == 'accountId'
         assert args_list[1] == 0
         assert args_list[2] == 2
         assert args_list[3] == 11
-        assert args_list[4] == timed_out_packet['packet']
+        assert args_list[4] == timed_out_packet
         await asyncio.sleep(1)
         out_of_order_listener.on_out_of_order_packet.assert_called_once()
 
@@ -238,42 +238,92 @@ class TestPacketOrderer:
     async def test_not_call_out_of_order_if_not_timeout(self):
         """Should not call on-out-of-order listener if the first packet in wait list is not timed out."""
         out_of_order_listener.on_out_of_order_packet = MagicMock()
+        start_packet = {
+            'type': 'synchronizationStarted',
+            'sequenceTimestamp': 1603124267178,
+            'sequenceNumber': 1,
+            'synchronizationId': 'synchronizationId',
+            'accountId': 'accountId'
+        }
         timed_out_packet = {
-            'accountId': 'accountId',
-            'sequenceNumber': 11,
-            'packet': {},
-            'receivedAt': date
+            'type': 'prices',
+            'sequenceTimestamp': 1603124267180,
+            'sequenceNumber': 15,
+            'accountId': 'accountId'
         }
         not_timed_out_packet = {
-            'accountId': 'accountId',
-            'sequenceNumber': 15,
-            'packet': {},
-            'receivedAt': datetime.fromtimestamp(10000000000)
+            'type': 'prices',
+            'sequenceTimestamp': 1603124267187,
+            'sequenceNumber': 11,
+            'accountId': 'accountId'
         }
-        packet_orderer._sequenceNumberByInstance['accountId:0'] = 1
-        packet_orderer._packetsByInstance['accountId:0'] = [
-            not_timed_out_packet,
-            timed_out_packet
-        ]
-        await asyncio.sleep(1)
+        packet_orderer.restore_order(start_packet)
+        packet_orderer.restore_order(timed_out_packet)
+        await asyncio.sleep(0.3)
+        packet_orderer.restore_order(not_timed_out_packet)
+        await asyncio.sleep(0.3)
         out_of_order_listener.on_out_of_order_packet.assert_not_called()
+        await asyncio.sleep(0.3)
+        out_of_order_listener.on_out_of_order_packet.assert_called_once()
+        assert out_of_order_listener.on_out_of_order_packet.call_args_list[0].args[3] == 11
+
+    @pytest.mark.asyncio
+    async def test_check_timeout_of_new_wait_list_head(self):
+        """Should call on-out-of-order listener if a packet becomes the first in wait list after its timeout."""
+        out_of_order_listener.on_out_of_order_packet = MagicMock()
+        start_packet = {
+            'type': 'synchronizationStarted',
+            'sequenceTimestamp': 1603124267178,
+            'sequenceNumber': 1,
+            'synchronizationId': 'synchronizationId',
+            'accountId': 'accountId'
+        }
+        packet_orderer.restore_order(start_packet)
+        packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267180, 'sequenceNumber': 15,
+                                      'accountId': 'accountId'})
+        await asyncio.sleep(0.3)
+        packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267181, 'sequenceNumber': 3,
+                                      'accountId': 'accountId'})
+        await asyncio.sleep(0.3)
+        packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267182, 'sequenceNumber': 2,
+                                      'accountId': 'accountId'})
+        await asyncio.sleep(0.05)
+        out_of_order_listener.on_out_of_order_packet.assert_called_once()
+        assert out_of_order_listener.on_out_of_order_packet.call_args_list[0].args[2:4] == (4, 15)
+
+    @pytest.mark.asyncio
+    async def test_not_schedule_timeout_checks_without_wait_list(self):
+        """Should not schedule timeout checks if there are no out-of-order packets."""
+        start_packet = {
+            'type': 'synchronizationStarted',
+            'sequenceTimestamp': 1603124267178,
+            'sequenceNumber': 1,
+            'synchronizationId': 'synchronizationId',
+            'accountId': 'accountId'
+        }
+        packet_orderer.restore_order(start_packet)
+        packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267181, 'sequenceNumber': 3,
+                                      'accountId': 'accountId'})
+        assert packet_orderer._timeoutHandle is not None
+        packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267182, 'sequenceNumber': 2,
+                                      'accountId': 'accountId'})
+        assert 'accountId:0' not in packet_orderer._packetsByInstance
+        await asyncio.sleep(0.6)
+        assert packet_orderer._timeoutHandle is None
 
     @pytest.mark.asyncio
     async def test_not_call_out_of_order_if_before_sync_start(self):
         """Should not call on-out-of-order listener for packets that come before synchronization start."""
         out_of_order_listener.on_out_of_order_packet = MagicMock()
         out_of_order_packet = {
-            'accountId': 'accountId',
+            'type': 'prices',
+            'sequenceTimestamp': 1603124267180,
             'sequenceNumber': 11,
-            'packet': {},
-            'receivedAt': date
+            'accountId': 'accountId'
         }
 
         # There were no synchronization start packets
-        if 'accountId' in packet_orderer._sequenceNumberByInstance:
-            del packet_orderer._sequenceNumberByInstance['accountId:0']
-
-        packet_orderer._packetsByInstance['accountId:0'] = [out_of_order_packet]
+        packet_orderer.restore_order(out_of_order_packet)
         await asyncio.sleep(1)
         out_of_order_listener.on_out_of_order_packet.assert_not_called()
 
@@ -295,10 +345,10 @@ class TestPacketOrderer:
         }
         packet_orderer.restore_order(second_packet)
         assert len(packet_orderer._packetsByInstance['accountId:0']) == 1
-        assert packet_orderer._packetsByInstance['accountId:0'][0]['packet'] == second_packet
+        assert packet_orderer._packetsByInstance['accountId:0'][0][2]['packet'] == second_packet
         packet_orderer.restore_order(third_packet)
         assert len(packet_orderer._packetsByInstance['accountId:0']) == 1
-        assert packet_orderer._packetsByInstance['accountId:0'][0]['packet'] == third_packet
+        assert packet_orderer._packetsByInstance['accountId:0'][0][2]['packet'] == third_packet
 
     @pytest.mark.asyncio
     async def test_count_start_packets_with_no_sync_id_as_out_of_order(self):
@@ -311,4 +361,44 @@ class TestPacketOrderer:
         }
         assert packet_orderer.restore_order(start_packet) == []
         assert len(packet_orderer._packetsByInstance['accountId:0']) == 1
-        assert packet_orderer._packetsByInstance['accountId:0'][0]['packet'] == start_packet
+        assert packet_orderer._packetsByInstance['accountId:0'][0][2]['packet'] == start_packet
+
+    @pytest.mark.asyncio
+    async def test_derive_timeout_from_gap_fill_times(self):
+        """Should derive ordering timeout from observed gap fill times."""
+        out_of_order_listener.on_out_of_order_packet = MagicMock()
+        orderer = PacketOrderer(out_of_order_listener, 60, {'enabled': True, 'minTimeoutInSeconds': 0.2,
+                                                            'minSamples': 3})
+        orderer.start()
+        orderer.restore_order({'type': 'synchronizationStarted', 'sequenceTimestamp': 1603124267178,
+                               'sequenceNumber': 1, 'synchronizationId': 'synchronizationId',
+                               'accountId': 'accountId'})
+        sequence_number = 1
+        for i in range(3):
+            assert orderer.get_ordering_timeout('accountId:0') == 60
+            orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267180,
+                                   'sequenceNumber': sequence_number + 2, 'accountId': 'accountId'})
+            await asyncio.sleep(0.05)
+            assert len(orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267180,
+                                              'sequenceNumber': sequence_number + 1, 'accountId': 'accountId'})) == 2
+            sequence_number += 2
+        assert 0.2 <= orderer.get_ordering_timeout('accountId:0') < 1
+        assert orderer.get_ordering_timeout('accountId:1') == 60
+        orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267180,
+                               'sequenceNumber': sequence_number + 2, 'accountId': 'accountId'})
+        await asyncio.sleep(1)
+        out_of_order_listener.on_out_of_order_packet.assert_called_once()
+        orderer.stop()
+
+    @pytest.mark.asyncio
+    async def test_keep_fixed_timeout_if_adaptive_timeout_is_disabled(self):
+        """Should keep fixed ordering timeout if adaptive timeout is disabled."""
+        packet_orderer.restore_order({'type': 'synchronizationStarted', 'sequenceTimestamp': 1603124267178,
+                                      'sequenceNumber': 1, 'synchronizationId': 'synchronizationId',
+                                      'accountId': 'accountId'})
+        for sequence_number in range(1, 30, 2):
+            packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267180,
+                                          'sequenceNumber': sequence_number + 2, 'accountId': 'accountId'})
+            packet_orderer.restore_order({'type': 'prices', 'sequenceTimestamp': 1603124267180,
+                                          'sequenceNumber': sequence_number + 1, 'accountId': 'accountId'})
+        assert packet_orderer.get_ordering_timeout('accountId:0') == 0.5
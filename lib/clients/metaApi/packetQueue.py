@@ -0,0 +1,211 @@
+from ..errorHandler import ValidationException
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+from typing_extensions import TypedDict
+
+overflow_strategies = ['block', 'dropOldest', 'conflatePrices']
+
+
+class PacketQueueOpts(TypedDict):
+    """Synchronization packet queue options."""
+
+    maxSize: Optional[int]
+    """Maximum amount of packets queued per account. Default is 1000."""
+    overflowStrategy: Optional[str]
+    """Action taken when the queue is full, one of block, dropOldest, conflatePrices. Default is block. The block
+    strategy delays the packet until the queue has room for it, dropOldest discards the oldest queued prices packet
+    and conflatePrices merges queued prices packets of the same instance, falling back to blocking when there are no
+    prices packets to merge. At most maxSize packets are delayed, after that packets are dropped as with the
+    dropOldest strategy. If there are no prices packets to drop, an incoming prices packet is dropped, otherwise the
+    oldest queued packet is dropped and the instance is resubscribed to synchronize its state again."""
+
+
+class PacketQueueMetrics(TypedDict):
+    """Synchronization packet queue metrics."""
+
+    depth: int
+    """Amount of packets currently queued."""
+    maxDepth: int
+    """Maximum amount of packets queued since the queue was created."""
+    blockedPackets: int
+    """Amount of packets currently waiting for the room in the queue."""
+    droppedPackets: int
+    """Amount of packets dropped because of queue overflow."""
+    droppedStatePackets: int
+    """Amount of packets other than prices dropped because of queue overflow. Each of them triggers resubscription
+    of the instance."""
+    conflatedPackets: int
+    """Amount of prices packets merged into other prices packets because of queue overflow."""
+
+
+class PacketQueue:
+    """Bounded queue of synchronization packets of an account."""
+
+    def __init__(self, overflow_listener, opts: PacketQueueOpts = None):
+        """Inits the class.
+
+        Args:
+            overflow_listener: An object which will receive dropped packet events.
+            opts: Packet queue options.
+        """
+        opts = opts or {}
+        self._overflowListener = overflow_listener
+        self._maxSize = opts['maxSize'] if 'maxSize' in opts else 1000
+        self._overflowStrategy = opts['overflowStrategy'] if 'overflowStrategy' in opts else 'block'
+        if self._overflowStrategy not in overflow_strategies:
+            raise ValidationException(f'Packet queue overflow strategy must be one of {", ".join(overflow_strategies)}')
+        self._packets = deque()
+        self._blockedPackets = deque()
+        self._getter = None
+        self._desynchronizedInstances = set()
+        self._maxDepth = 0
+        self._droppedPackets = 0
+        self._droppedStatePackets = 0
+        self._conflatedPackets = 0
+
+    @property
+    def metrics(self) -> PacketQueueMetrics:
+        """Returns queue metrics.
+
+        Returns:
+            Queue metrics.
+        """
+        return {
+            'depth': len(self._packets),
+            'maxDepth': self._maxDepth,
+            'blockedPackets': len(self._blockedPackets),
+            'droppedPackets': self._droppedPackets,
+            'droppedStatePackets': self._droppedStatePackets,
+            'conflatedPackets': self._conflatedPackets
+        }
+
+    async def put(self, packet: Dict):
+        """Adds a packet to the queue, applying the overflow strategy if the queue is full.
+
+        Args:
+            packet: Packet to add.
+
+        Returns:
+            A coroutine which resolves when the packet is queued.
+        """
+        if packet['type'] == 'synchronizationStarted':
+            self._desynchronizedInstances.discard(self._get_instance_index(packet))
+        if len(self._packets) >= self._maxSize and not self._blockedPackets:
+            if self._overflowStrategy == 'dropOldest' and self._drop_packet(packet):
+                return
+            elif self._overflowStrategy == 'conflatePrices':
+                self._conflate_prices(packet)
+        if len(self._packets) < self._maxSize and not self._blockedPackets:
+            self._append(packet)
+            return
+        if len(self._blockedPackets) >= self._maxSize:
+            # the amount of delayed packets is bounded too, so a stuck listener can not make the memory grow
+            # without a limit
+            if self._drop_packet(packet):
+                return
+            blocked_packet, future = self._blockedPackets.popleft()
+            if not future.done():
+                self._append(blocked_packet)
+                future.set_result(None)
+        # blocked packets are queued in the order of arrival as soon as the queue has room for them
+        future = asyncio.Future()
+        self._blockedPackets.append((packet, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            for i in range(len(self._blockedPackets)):
+                if self._blockedPackets[i][1] is future:
+                    del self._blockedPackets[i]
+                    break
+            raise
+
+    async def get(self) -> Dict:
+        """Removes a packet from the queue, waiting for a packet to arrive if the queue is empty.
+
+        Returns:
+            A coroutine resolving with the oldest queued packet.
+        """
+        while not self._packets:
+            self._getter = asyncio.Future()
+            try:
+                await self._getter
+            finally:
+                self._getter = None
+        packet = self._packets.popleft()
+        while self._blockedPackets and len(self._packets) < self._maxSize:
+            blocked_packet, future = self._blockedPackets.popleft()
+            if not future.done():
+                self._append(blocked_packet)
+                future.set_result(None)
+        return packet
+
+    def clear(self):
+        """Removes all packets from the queue, releasing the packets waiting for the room in the queue."""
+        self._packets.clear()
+        while self._blockedPackets:
+            blocked_packet, future = self._blockedPackets.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    def _append(self, packet: Dict):
+        self._packets.append(packet)
+        self._maxDepth = max(self._maxDepth, len(self._packets))
+        if self._getter is not None and not self._getter.done():
+            self._getter.set_result(None)
+
+    def _drop_packet(self, incoming_packet: Dict) -> bool:
+        # prices are superseded by the next prices packets, while dropping any other packet makes the local
+        # terminal state diverge from the server, so the instance is resubscribed to receive the state again
+        for i in range(len(self._packets)):
+            if self._packets[i]['type'] == 'prices':
+                del self._packets[i]
+                self._droppedPackets += 1
+                return False
+        if incoming_packet['type'] == 'prices':
+            self._droppedPackets += 1
+            return True
+        packet = self._packets.popleft()
+        self._droppedPackets += 1
+        self._droppedStatePackets += 1
+        instance_index = self._get_instance_index(packet)
+        if instance_index not in self._desynchronizedInstances:
+            self._desynchronizedInstances.add(instance_index)
+            asyncio.create_task(self._overflowListener.on_dropped_packet(packet['accountId'], instance_index, packet))
+        return False
+
+    def _conflate_prices(self, packet: Dict):
+        if packet['type'] == 'prices' and self._packets[-1]['type'] == 'prices' and \
+                self._get_instance_index(self._packets[-1]) == self._get_instance_index(packet):
+            older_packet = self._packets.pop()
+            self._merge_prices(older_packet, packet)
+            self._conflatedPackets += 1
+            return
+        last_prices_by_instance = {}
+        for i in range(len(self._packets)):
+            queued_packet = self._packets[i]
+            if queued_packet['type'] == 'prices':
+                instance_index = self._get_instance_index(queued_packet)
+                if instance_index in last_prices_by_instance:
+                    older_packet = self._packets[last_prices_by_instance[instance_index]]
+                    self._merge_prices(older_packet, queued_packet)
+                    del self._packets[last_prices_by_instance[instance_index]]
+                    self._conflatedPackets += 1
+                    return
+                last_prices_by_instance[instance_index] = i
+
+    @staticmethod
+    def _get_instance_index(packet: Dict) -> int:
+        return packet['instanceIndex'] if 'instanceIndex' in packet else 0
+
+    @staticmethod
+    def _merge_prices(older_packet: Dict, packet: Dict):
+        prices_by_symbol = {}
+        for price in older_packet['prices'] if 'prices' in older_packet else []:
+            prices_by_symbol[price['symbol']] = price
+        for price in packet['prices'] if 'prices' in packet else []:
+            prices_by_symbol[price['symbol']] = price
+        packet['prices'] = list(prices_by_symbol.values())
+        for field in ['equity', 'margin', 'freeMargin', 'marginLevel']:
+            if field not in packet and field in older_packet:
+                packet[field] = older_packet[field]
@@ -0,0 +1,166 @@
+from .packetQueue import PacketQueue
+from ..errorHandler import ValidationException
+from mock import MagicMock, AsyncMock
+import pytest
+import asyncio
+
+overflow_listener = MagicMock()
+
+
+def prices_packet(prices, instance_index=0, **kwargs):
+    packet = {'type': 'prices', 'accountId': 'accountId', 'instanceIndex': instance_index, 'prices': prices}
+    packet.update(kwargs)
+    return packet
+
+
+def status_packet(sequence, instance_index=0):
+    return {'type': 'status', 'accountId': 'accountId', 'instanceIndex': instance_index, 'sequence': sequence}
+
+
+@pytest.fixture(autouse=True)
+async def run_around_tests():
+    global overflow_listener
+    overflow_listener = MagicMock()
+    overflow_listener.on_dropped_packet = AsyncMock()
+    yield
+
+
+class TestPacketQueue:
+    @pytest.mark.asyncio
+    async def test_return_packets_in_order(self):
+        """Should return packets in the order of arrival."""
+        queue = PacketQueue(overflow_listener)
+        await queue.put(status_packet(1))
+        await queue.put(status_packet(2))
+        assert await queue.get() == status_packet(1)
+        assert await queue.get() == status_packet(2)
+        assert queue.metrics == {'depth': 0, 'maxDepth': 2, 'blockedPackets': 0, 'droppedPackets': 0,
+                                 'droppedStatePackets': 0, 'conflatedPackets': 0}
+
+    @pytest.mark.asyncio
+    async def test_wait_for_packet(self):
+        """Should wait for a packet if the queue is empty."""
+        queue = PacketQueue(overflow_listener)
+        get_task = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not get_task.done()
+        await queue.put(status_packet(1))
+        assert await get_task == status_packet(1)
+
+    @pytest.mark.asyncio
+    async def test_block_when_full(self):
+        """Should delay packets until the queue has room for them if the queue is full."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 2})
+        await queue.put(status_packet(1))
+        await queue.put(status_packet(2))
+        put_tasks = [asyncio.create_task(queue.put(status_packet(3))),
+                     asyncio.create_task(queue.put(status_packet(4)))]
+        await asyncio.sleep(0)
+        assert not put_tasks[0].done()
+        assert queue.metrics['blockedPackets'] == 2
+        assert await queue.get() == status_packet(1)
+        await put_tasks[0]
+        assert not put_tasks[1].done()
+        assert await queue.get() == status_packet(2)
+        await put_tasks[1]
+        assert await queue.get() == status_packet(3)
+        assert await queue.get() == status_packet(4)
+
+    @pytest.mark.asyncio
+    async def test_limit_blocked_packets(self):
+        """Should drop packets when the amount of delayed packets exceeds the queue size."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 2})
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 1}]))
+        await queue.put(status_packet(1))
+        put_tasks = list(map(lambda i: asyncio.create_task(queue.put(status_packet(i))), range(2, 5)))
+        await asyncio.sleep(0)
+        await put_tasks[0]
+        assert queue.metrics['depth'] == 2
+        assert queue.metrics['blockedPackets'] == 2
+        assert queue.metrics['droppedPackets'] == 1
+        assert await queue.get() == status_packet(1)
+        assert await queue.get() == status_packet(2)
+        await asyncio.gather(*put_tasks)
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_prices_packet(self):
+        """Should drop the oldest prices packet if the queue is full."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 3, 'overflowStrategy': 'dropOldest'})
+        await queue.put(status_packet(1))
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 1}]))
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 2}]))
+        await queue.put(status_packet(2))
+        assert await queue.get() == status_packet(1)
+        assert await queue.get() == prices_packet([{'symbol': 'EURUSD', 'bid': 2}])
+        assert await queue.get() == status_packet(2)
+        assert queue.metrics['droppedPackets'] == 1
+        assert queue.metrics['droppedStatePackets'] == 0
+
+    @pytest.mark.asyncio
+    async def test_drop_incoming_prices_packet(self):
+        """Should drop an incoming prices packet if the full queue has no prices packets."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 1, 'overflowStrategy': 'dropOldest'})
+        await queue.put(status_packet(1))
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 1}]))
+        assert await queue.get() == status_packet(1)
+        assert queue.metrics['depth'] == 0
+        assert queue.metrics['droppedPackets'] == 1
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_on_dropped_state_packet(self):
+        """Should notify the overflow listener once per instance when a state packet is dropped."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 1, 'overflowStrategy': 'dropOldest'})
+        await queue.put(status_packet(1, 1))
+        await queue.put(status_packet(2, 1))
+        await queue.put(status_packet(3, 1))
+        await asyncio.sleep(0)
+        overflow_listener.on_dropped_packet.assert_called_once_with('accountId', 1, status_packet(1, 1))
+        assert await queue.get() == status_packet(3, 1)
+        assert queue.metrics['droppedStatePackets'] == 2
+        await queue.put({'type': 'synchronizationStarted', 'accountId': 'accountId', 'instanceIndex': 1})
+        await queue.put(status_packet(4, 1))
+        await asyncio.sleep(0)
+        assert overflow_listener.on_dropped_packet.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_conflate_last_prices_packet(self):
+        """Should merge a prices packet into the last queued prices packet if the queue is full."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 2, 'overflowStrategy': 'conflatePrices'})
+        await queue.put(status_packet(1))
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 1}, {'symbol': 'GBPUSD', 'bid': 2}], equity=100))
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 1.1}]))
+        assert await queue.get() == status_packet(1)
+        assert await queue.get() == prices_packet([{'symbol': 'EURUSD', 'bid': 1.1}, {'symbol': 'GBPUSD', 'bid': 2}],
+                                                  equity=100)
+        assert queue.metrics['conflatedPackets'] == 1
+
+    @pytest.mark.asyncio
+    async def test_conflate_queued_prices_packets(self):
+        """Should merge queued prices packets of the same instance if the queue is full."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 4, 'overflowStrategy': 'conflatePrices'})
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 1}]))
+        await queue.put(prices_packet([{'symbol': 'EURUSD', 'bid': 2}], 1))
+        await queue.put(status_packet(1))
+        await queue.put(prices_packet([{'symbol': 'GBPUSD', 'bid': 3}], equity=100))
+        await queue.put(status_packet(2))
+        assert await queue.get() == prices_packet([{'symbol': 'EURUSD', 'bid': 2}], 1)
+        assert await queue.get() == status_packet(1)
+        assert await queue.get() == prices_packet([{'symbol': 'EURUSD', 'bid': 1}, {'symbol': 'GBPUSD', 'bid': 3}],
+                                                  equity=100)
+        assert await queue.get() == status_packet(2)
+
+    @pytest.mark.asyncio
+    async def test_release_blocked_packets_on_clear(self):
+        """Should release blocked packets when the queue is cleared."""
+        queue = PacketQueue(overflow_listener, {'maxSize': 1, 'overflowStrategy': 'conflatePrices'})
+        await queue.put(status_packet(1))
+        put_task = asyncio.create_task(queue.put(status_packet(2)))
+        await asyncio.sleep(0)
+        queue.clear()
+        await put_task
+        assert queue.metrics['depth'] == 0
+
+    def test_validate_overflow_strategy(self):
+        """Should validate overflow strategy."""
+        with pytest.raises(ValidationException):
+            PacketQueue(overflow_listener, {'overflowStrategy': 'unknown'})
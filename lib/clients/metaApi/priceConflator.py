@@ -0,0 +1,122 @@
+from ...metaApi.models import MetatraderSymbolPrice
+import asyncio
+from typing import Callable, List, Optional
+from typing_extensions import TypedDict
+
+
+class PriceConflationMetrics(TypedDict):
+    """Price conflation metrics of a synchronization listener."""
+
+    pendingPrices: int
+    """Amount of symbol prices waiting to be delivered to the listener."""
+    deliveredPrices: int
+    """Amount of symbol prices delivered to the listener."""
+    droppedPrices: int
+    """Amount of symbol prices replaced by a newer price of the same symbol before delivery."""
+
+
+class PriceConflator:
+    """Delivers symbol prices to a synchronization listener, merging the prices which arrive while the listener is
+    busy so that the listener receives only the latest price of each symbol."""
+
+    def __init__(self, account_id: str, listener):
+        """Inits the class.
+
+        Args:
+            account_id: Account id.
+            listener: Synchronization listener to deliver prices to.
+        """
+        self._accountId = account_id
+        self._listener = listener
+        self._pendingPrices = {}
+        self._pendingAccountFields = {}
+        self._deliveryTask = None
+        self._deliveredPrices = 0
+        self._droppedPrices = 0
+
+    @property
+    def listener(self):
+        """Returns synchronization listener prices are delivered to.
+
+        Returns:
+            Synchronization listener.
+        """
+        return self._listener
+
+    @property
+    def metrics(self) -> PriceConflationMetrics:
+        """Returns price conflation metrics.
+
+        Returns:
+            Price conflation metrics.
+        """
+        return {
+            'pendingPrices': sum(map(len, self._pendingPrices.values())),
+            'deliveredPrices': self._deliveredPrices,
+            'droppedPrices': self._droppedPrices
+        }
+
+    async def on_symbol_prices_updated(self, instance_index: int, prices: List[MetatraderSymbolPrice],
+                                       equity: float = None, margin: float = None, free_margin: float = None,
+                                       margin_level: float = None):
+        """Merges prices into the pending prices and schedules their delivery to the listener.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            prices: Updated MetaTrader symbol prices.
+            equity: Account liquidation value.
+            margin: Margin used.
+            free_margin: Free margin.
+            margin_level: Margin level calculated as % of equity/margin.
+        """
+        if instance_index not in self._pendingPrices:
+            self._pendingPrices[instance_index] = {}
+        pending_prices = self._pendingPrices[instance_index]
+        for price in prices:
+            if price['symbol'] in pending_prices:
+                self._droppedPrices += 1
+            pending_prices[price['symbol']] = price
+        account_fields = self._pendingAccountFields[instance_index] \
+            if instance_index in self._pendingAccountFields else [None, None, None, None]
+        for i, value in enumerate([equity, margin, free_margin, margin_level]):
+            if value is not None:
+                account_fields[i] = value
+        self._pendingAccountFields[instance_index] = account_fields
+        if self._deliveryTask is None:
+            self._deliveryTask = asyncio.create_task(self._deliver_prices())
+
+    def stop(self):
+        """Stops delivering prices, discarding pending prices."""
+        if self._deliveryTask is not None:
+            self._deliveryTask.cancel()
+            self._deliveryTask = None
+        self._pendingPrices = {}
+        self._pendingAccountFields = {}
+
+    async def _deliver_prices(self):
+        try:
+            while self._pendingPrices:
+                instance_index = next(iter(self._pendingPrices))
+                prices = list(self._pendingPrices.pop(instance_index).values())
+                account_fields = self._pendingAccountFields.pop(instance_index)
+                self._deliveredPrices += len(prices)
+                await self._invoke(self._get_listener_method('on_symbol_prices_updated'), 'prices', instance_index,
+                                   prices, *account_fields)
+                price_method = self._get_listener_method('on_symbol_price_updated')
+                if price_method is not None:
+                    for price in prices:
+                        await self._invoke(price_method, 'price', instance_index, price)
+        finally:
+            if self._deliveryTask is asyncio.current_task():
+                self._deliveryTask = None
+
+    def _get_listener_method(self, method_name: str) -> Optional[Callable]:
+        return getattr(self._listener, method_name, None)
+
+    async def _invoke(self, method, event: str, *args):
+        if method is None:
+            return
+        try:
+            await method(*args)
+        except Exception as err:
+            print(f'{self._accountId}: Failed to notify listener about {event} event', err)
@@ -0,0 +1,66 @@
+from .priceConflator import PriceConflator
+from mock import MagicMock, AsyncMock
+import pytest
+import asyncio
+
+listener = MagicMock()
+
+
+@pytest.fixture(autouse=True)
+async def run_around_tests():
+    global listener
+    listener = MagicMock()
+    listener.on_symbol_prices_updated = AsyncMock()
+    listener.on_symbol_price_updated = AsyncMock()
+    yield
+
+
+class TestPriceConflator:
+    @pytest.mark.asyncio
+    async def test_deliver_prices(self):
+        """Should deliver prices to the listener."""
+        conflator = PriceConflator('accountId', listener)
+        price = {'symbol': 'EURUSD', 'bid': 1}
+        await conflator.on_symbol_prices_updated(1, [price], 100, 200, 300, 400)
+        await asyncio.sleep(0)
+        listener.on_symbol_prices_updated.assert_called_once_with(1, [price], 100, 200, 300, 400)
+        listener.on_symbol_price_updated.assert_called_once_with(1, price)
+        assert conflator.metrics == {'pendingPrices': 0, 'deliveredPrices': 1, 'droppedPrices': 0}
+
+    @pytest.mark.asyncio
+    async def test_merge_pending_prices(self):
+        """Should merge prices which arrive before pending prices are delivered."""
+        conflator = PriceConflator('accountId', listener)
+        await conflator.on_symbol_prices_updated(0, [{'symbol': 'EURUSD', 'bid': 1}], 100)
+        await conflator.on_symbol_prices_updated(0, [{'symbol': 'GBPUSD', 'bid': 2}], None, 200)
+        await conflator.on_symbol_prices_updated(0, [{'symbol': 'EURUSD', 'bid': 3}], 110)
+        await conflator.on_symbol_prices_updated(1, [{'symbol': 'EURUSD', 'bid': 4}])
+        assert conflator.metrics == {'pendingPrices': 3, 'deliveredPrices': 0, 'droppedPrices': 1}
+        await asyncio.sleep(0)
+        assert listener.on_symbol_prices_updated.call_args_list[0][0] == \
+            (0, [{'symbol': 'EURUSD', 'bid': 3}, {'symbol': 'GBPUSD', 'bid': 2}], 110, 200, None, None)
+        assert listener.on_symbol_prices_updated.call_args_list[1][0] == \
+            (1, [{'symbol': 'EURUSD', 'bid': 4}], None, None, None, None)
+        assert listener.on_symbol_price_updated.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_continue_after_listener_failure(self):
+        """Should deliver next prices if the listener failed to process prices."""
+        conflator = PriceConflator('accountId', listener)
+        listener.on_symbol_prices_updated.side_effect = [Exception('test'), None]
+        await conflator.on_symbol_prices_updated(0, [{'symbol': 'EURUSD', 'bid': 1}])
+        await asyncio.sleep(0)
+        await conflator.on_symbol_prices_updated(0, [{'symbol': 'EURUSD', 'bid': 2}])
+        await asyncio.sleep(0)
+        assert listener.on_symbol_prices_updated.call_count == 2
+        assert listener.on_symbol_price_updated.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_discard_prices_on_stop(self):
+        """Should discard pending prices when stopped."""
+        conflator = PriceConflator('accountId', listener)
+        await conflator.on_symbol_prices_updated(0, [{'symbol': 'EURUSD', 'bid': 1}])
+        conflator.stop()
+        await asyncio.sleep(0)
+        listener.on_symbol_prices_updated.assert_not_called()
+        assert conflator.metrics['pendingPrices'] == 0
@@ -0,0 +1,142 @@
+import asyncio
+import heapq
+from typing import Callable, Coroutine, Optional
+from typing_extensions import TypedDict
+
+
+class SubscribeSchedulerOpts(TypedDict):
+    """Subscribe scheduler options."""
+
+    rate: Optional[float]
+    """Amount of subscribe requests sent per second. Default is 10."""
+    burst: Optional[int]
+    """Amount of subscribe requests which can be sent at once after a period of inactivity. Default is 50."""
+    activeAccountPeriod: Optional[float]
+    """Time in seconds an account is considered to be actively trading after a trade request. Subscribe requests of
+    actively trading accounts are sent before the requests of the other accounts. Default is 600."""
+
+
+class SubscribeScheduler:
+    """Sends subscribe requests at a limited rate, coalescing the requests for the same account instance which are
+    waiting to be sent or being sent and sending the requests of actively trading accounts first."""
+
+    def __init__(self, send_subscribe_request: Callable[[str, Optional[int]], Coroutine],
+                 opts: SubscribeSchedulerOpts = None):
+        """Inits the class.
+
+        Args:
+            send_subscribe_request: Function which sends a subscribe request for an account instance.
+            opts: Subscribe scheduler options.
+        """
+        opts = opts or {}
+        self._sendSubscribeRequest = send_subscribe_request
+        self._rate = opts['rate'] if 'rate' in opts else 10
+        self._burst = opts['burst'] if 'burst' in opts else 50
+        self._activeAccountPeriod = opts['activeAccountPeriod'] if 'activeAccountPeriod' in opts else 600
+        self._tokens = self._burst
+        self._lastRefillTime = None
+        self._pendingRequests = {}
+        self._queue = []
+        self._counter = 0
+        self._lastTradeTimes = {}
+        self._worker = None
+
+    @property
+    def pending_requests(self) -> int:
+        """Returns amount of subscribe requests waiting to be sent or being sent.
+
+        Returns:
+            Amount of subscribe requests waiting to be sent or being sent.
+        """
+        return len(self._pendingRequests)
+
+    def on_trade(self, account_id: str):
+        """Marks an account as actively trading.
+
+        Args:
+            account_id: Account id.
+        """
+        self._lastTradeTimes[account_id] = asyncio.get_event_loop().time()
+
+    def schedule(self, account_id: str, instance_index: int = None) -> asyncio.Future:
+        """Schedules a subscribe request for an account instance. If a request for the instance is already waiting to
+        be sent or being sent, it is reused.
+
+        Args:
+            account_id: Account id.
+            instance_index: Instance index.
+
+        Returns:
+            A future which resolves with the subscribe response.
+        """
+        key = (account_id, instance_index or 0)
+        # the request is shielded so that a cancelled caller does not cancel the request for the other callers
+        if key in self._pendingRequests and not self._pendingRequests[key].done():
+            return asyncio.shield(self._pendingRequests[key])
+        future = asyncio.Future()
+        self._pendingRequests[key] = future
+        # the request is kept until its response is received, so that duplicates scheduled while it is being sent are
+        # coalesced with it too
+        future.add_done_callback(lambda f: self._remove_pending_request(key, f))
+        self._counter += 1
+        heapq.heappush(self._queue, (0 if self._is_trading(account_id) else 1, self._counter, key))
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._process_queue())
+        return asyncio.shield(future)
+
+    def stop(self, err: Exception):
+        """Stops sending subscribe requests, failing the requests waiting to be sent. The requests being sent are
+        resolved with their responses.
+
+        Args:
+            err: Error to fail the waiting requests with.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        queue = self._queue
+        self._queue = []
+        for priority, counter, key in queue:
+            future = self._pendingRequests.pop(key)
+            if not future.done():
+                future.set_exception(err)
+
+    async def _process_queue(self):
+        try:
+            while self._queue:
+                await self._acquire_token()
+                priority, counter, key = heapq.heappop(self._queue)
+                future = self._pendingRequests[key]
+                asyncio.create_task(self._send(key, future))
+        finally:
+            if self._worker is asyncio.current_task():
+                self._worker = None
+
+    async def _acquire_token(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            if self._lastRefillTime is not None:
+                self._tokens = min(self._burst, self._tokens + (now - self._lastRefillTime) * self._rate)
+            self._lastRefillTime = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def _send(self, key: tuple, future: asyncio.Future):
+        try:
+            result = await self._sendSubscribeRequest(key[0], key[1])
+            if not future.done():
+                future.set_result(result)
+        except Exception as err:
+            if not future.done():
+                future.set_exception(err)
+
+    def _remove_pending_request(self, key: tuple, future: asyncio.Future):
+        if key in self._pendingRequests and self._pendingRequests[key] is future:
+            del self._pendingRequests[key]
+
+    def _is_trading(self, account_id: str) -> bool:
+        return account_id in self._lastTradeTimes and \
+            self._lastTradeTimes[account_id] + self._activeAccountPeriod > asyncio.get_event_loop().time()
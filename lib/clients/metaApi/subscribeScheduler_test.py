@@ -0,0 +1,91 @@
+from .subscribeScheduler import SubscribeScheduler
+from mock import AsyncMock
+import pytest
+import asyncio
+
+send_subscribe_request = AsyncMock()
+
+
+@pytest.fixture(autouse=True)
+async def run_around_tests():
+    global send_subscribe_request
+    send_subscribe_request = AsyncMock(return_value='response')
+    yield
+
+
+class TestSubscribeScheduler:
+    @pytest.mark.asyncio
+    async def test_send_subscribe_request(self):
+        """Should send subscribe request."""
+        scheduler = SubscribeScheduler(send_subscribe_request)
+        assert await scheduler.schedule('accountId', 1) == 'response'
+        send_subscribe_request.assert_called_once_with('accountId', 1)
+
+    @pytest.mark.asyncio
+    async def test_limit_rate(self):
+        """Should limit rate of subscribe requests."""
+        scheduler = SubscribeScheduler(send_subscribe_request, {'rate': 20, 'burst': 2})
+        futures = list(map(lambda i: scheduler.schedule(f'accountId{i}'), range(4)))
+        await asyncio.sleep(0.01)
+        assert send_subscribe_request.call_count == 2
+        assert scheduler.pending_requests == 2
+        await asyncio.sleep(0.06)
+        assert send_subscribe_request.call_count == 3
+        await asyncio.gather(*futures)
+        assert send_subscribe_request.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_coalesce_requests(self):
+        """Should coalesce subscribe requests for the same account instance waiting to be sent."""
+        scheduler = SubscribeScheduler(send_subscribe_request, {'rate': 20, 'burst': 1})
+        futures = [scheduler.schedule('accountId0'), scheduler.schedule('accountId1', 0),
+                   scheduler.schedule('accountId1'), scheduler.schedule('accountId1', 1)]
+        assert await asyncio.gather(*futures) == ['response'] * 4
+        assert send_subscribe_request.call_count == 3
+        send_subscribe_request.assert_any_call('accountId1', 0)
+        send_subscribe_request.assert_any_call('accountId1', 1)
+
+    @pytest.mark.asyncio
+    async def test_prioritize_trading_accounts(self):
+        """Should send subscribe requests of actively trading accounts first."""
+        scheduler = SubscribeScheduler(send_subscribe_request, {'rate': 100, 'burst': 1})
+        scheduler.on_trade('tradingAccountId')
+        await asyncio.gather(scheduler.schedule('accountId0'), scheduler.schedule('accountId1'),
+                             scheduler.schedule('tradingAccountId'))
+        assert list(map(lambda call: call[0][0], send_subscribe_request.call_args_list)) == \
+            ['tradingAccountId', 'accountId0', 'accountId1']
+
+    @pytest.mark.asyncio
+    async def test_fail_requests_on_stop(self):
+        """Should fail requests waiting to be sent when stopped."""
+        scheduler = SubscribeScheduler(send_subscribe_request, {'rate': 1, 'burst': 1})
+        scheduler.schedule('accountId0')
+        future = scheduler.schedule('accountId1')
+        await asyncio.sleep(0)
+        scheduler.stop(Exception('closed'))
+        with pytest.raises(Exception, match='closed'):
+            await future
+        assert send_subscribe_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesce_requests_being_sent(self):
+        """Should coalesce subscribe requests for the same account instance with the request being sent."""
+        response = asyncio.Future()
+
+        async def send(account_id, instance_index):
+            return await asyncio.shield(response)
+        send_subscribe_request.side_effect = send
+        scheduler = SubscribeScheduler(send_subscribe_request)
+        future = scheduler.schedule('accountId', 1)
+        await asyncio.sleep(0.01)
+        assert send_subscribe_request.call_count == 1
+        duplicate = scheduler.schedule('accountId', 1)
+        await asyncio.sleep(0.01)
+        assert send_subscribe_request.call_count == 1
+        assert scheduler.pending_requests == 1
+        response.set_result('response')
+        assert await asyncio.gather(future, duplicate) == ['response'] * 2
+        await asyncio.sleep(0)
+        assert scheduler.pending_requests == 0
+        assert await scheduler.schedule('accountId', 1) == 'response'
+        assert send_subscribe_request.call_count == 2
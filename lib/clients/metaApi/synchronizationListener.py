@@ -113,6 +113,22 @@ class SynchronizationListener(ABC):
         """
         pass
 
+    async def on_positions_updated(self, instance_index: int, positions: List[MetatraderPosition]):
+        """Invoked when MetaTrader positions are updated.
+
+        The default implementation invokes on_position_updated for every item.
+        Override this method to process the items in bulk.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            positions: Updated MetaTrader positions.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        for position in positions:
+            await self.on_position_updated(instance_index, position)
+
     async def on_position_removed(self, instance_index: int, position_id: str):
         """Invoked when MetaTrader position is removed.
 
@@ -149,6 +165,22 @@ class SynchronizationListener(ABC):
         """
         pass
 
+    async def on_orders_updated(self, instance_index: int, orders: List[MetatraderOrder]):
+        """Invoked when MetaTrader orders are updated.
+
+        The default implementation invokes on_order_updated for every item.
+        Override this method to process the items in bulk.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            orders: Updated MetaTrader orders.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        for order in orders:
+            await self.on_order_updated(instance_index, order)
+
     async def on_order_completed(self, instance_index: int, order_id: str):
         """Invoked when MetaTrader order is completed (executed or canceled).
 
@@ -173,6 +205,22 @@ class SynchronizationListener(ABC):
         """
         pass
 
+    async def on_history_orders_added(self, instance_index: int, history_orders: List[MetatraderOrder]):
+        """Invoked when new MetaTrader history orders are added.
+
+        The default implementation invokes on_history_order_added for every item.
+        Override this method to process the items in bulk.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            history_orders: New MetaTrader history orders.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        for history_order in history_orders:
+            await self.on_history_order_added(instance_index, history_order)
+
     async def on_deal_added(self, instance_index: int, deal: MetatraderDeal):
         """Invoked when a new MetaTrader history deal is added.
 
@@ -185,6 +233,22 @@ class SynchronizationListener(ABC):
         """
         pass
 
+    async def on_deals_added(self, instance_index: int, deals: List[MetatraderDeal]):
+        """Invoked when new MetaTrader history deals are added.
+
+        The default implementation invokes on_deal_added for every item.
+        Override this method to process the items in bulk.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            deals: New MetaTrader history deals.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        for deal in deals:
+            await self.on_deal_added(instance_index, deal)
+
     async def on_deal_synchronization_finished(self, instance_index: int, synchronization_id: str):
         """Invoked when a synchronization of history deals on a MetaTrader account have finished.
 
@@ -221,6 +285,23 @@ class SynchronizationListener(ABC):
         """
         pass
 
+    async def on_symbol_specifications_updated(self, instance_index: int,
+                                               specifications: List[MetatraderSymbolSpecification]):
+        """Invoked when symbol specifications were updated.
+
+        The default implementation invokes on_symbol_specification_updated for every item.
+        Override this method to process the items in bulk.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            specifications: Updated MetaTrader symbol specifications.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        for specification in specifications:
+            await self.on_symbol_specification_updated(instance_index, specification)
+
     async def on_symbol_price_updated(self, instance_index: int, price: MetatraderSymbolPrice):
         """Invoked when a symbol price was updated.
 
@@ -1,8 +1,9 @@
-from .metaApiConnection import MetaApiConnection
+from .metaApiConnection import MetaApiConnection, ReadPreferenceOpts
 from ..clients.metaApi.metaApiWebsocket_client import MetaApiWebsocketClient
 from .metatraderAccountModel import MetatraderAccountModel
 from .historyStorage import HistoryStorage
 from .connectionRegistryModel import ConnectionRegistryModel
+from .responseCache import ResponseCacheOpts
 from datetime import datetime
 import asyncio
 
@@ -10,15 +11,20 @@ import asyncio
 class ConnectionRegistry(ConnectionRegistryModel):
     """Manages account connections"""
 
-    def __init__(self, meta_api_websocket_client: MetaApiWebsocketClient, application: str = 'MetaApi'):
+    def __init__(self, meta_api_websocket_client: MetaApiWebsocketClient, application: str = 'MetaApi',
+                 response_cache: ResponseCacheOpts = None, read_preference: ReadPreferenceOpts = None):
         """Inits a MetaTrader connection registry instance.
 
         Args:
             meta_api_websocket_client: MetaApi websocket client.
             application: Application type.
+            response_cache: Response cache options of the connections.
+            read_preference: Read preference options of the connections.
         """
         self._meta_api_websocket_client = meta_api_websocket_client
         self._application = application
+        self._responseCache = response_cache
+        self._readPreference = read_preference
         self._connections = {}
         self._connectionLocks = {}
 
@@ -44,7 +50,7 @@ class ConnectionRegistry(ConnectionRegistryModel):
             connection_lock = asyncio.Future()
             self._connectionLocks[account.id] = {'promise': connection_lock}
             connection = MetaApiConnection(self._meta_api_websocket_client, account, history_storage, self,
-                                           history_start_time)
+                                           history_start_time, self._responseCache, self._readPreference)
             try:
                 await connection.initialize()
                 await connection.subscribe()
@@ -18,7 +18,7 @@ class MockClient(MetaApiWebsocketClient):
     def add_synchronization_listener(self, account_id: str, listener):
         pass
 
-    def add_reconnect_listener(self, listener: ReconnectListener):
+    def add_reconnect_listener(self, listener: ReconnectListener, account_id: str = None):
         pass
 
 
@@ -1,5 +1,5 @@
 from .memoryHistoryStorageModel import MemoryHistoryStorageModel
-import json
+from ..clients import jsonCodec
 import os
 import asyncio
 from .models import format_date, convert_iso_time_to_date
@@ -14,7 +14,7 @@ def stringify(obj: dict or List) -> str:
     Returns:
         Stringified and compressed object.
     """
-    return json.dumps(obj).replace('": ', '":').replace('}, {', '},{').replace(', "', ',"')
+    return jsonCodec.dumps(obj)
 
 
 class HistoryFileManager:
@@ -90,7 +90,7 @@ class HistoryFileManager:
         }
         try:
             if os.path.isfile(f'.metaapi/{self._accountId}-{self._application}-config.bin'):
-                config = json.loads(open(f'.metaapi/{self._accountId}-{self._application}-config.bin').read())
+                config = jsonCodec.loads(open(f'.metaapi/{self._accountId}-{self._application}-config.bin').read())
                 history['lastDealTimeByInstanceIndex'] = config['lastDealTimeByInstanceIndex']
                 history['lastHistoryOrderTimeByInstanceIndex'] = config['lastHistoryOrderTimeByInstanceIndex']
         except Exception as err:
@@ -100,7 +100,7 @@ class HistoryFileManager:
 
         try:
             if os.path.isfile(f'.metaapi/{self._accountId}-{self._application}-deals.bin'):
-                deals = json.loads(open(f'.metaapi/{self._accountId}-{self._application}-deals.bin').read())
+                deals = jsonCodec.loads(open(f'.metaapi/{self._accountId}-{self._application}-deals.bin').read())
                 self._dealsSize = list(map(self.get_item_size, deals))
                 for deal in deals:
                     convert_iso_time_to_date(deal)
@@ -112,8 +112,8 @@ class HistoryFileManager:
 
         try:
             if os.path.isfile(f'.metaapi/{self._accountId}-{self._application}-historyOrders.bin'):
-                history_orders = json.loads(open(f'.metaapi/{self._accountId}-{self._application}-historyOrders.bin')
-                                            .read())
+                history_orders = jsonCodec.loads(
+                    open(f'.metaapi/{self._accountId}-{self._application}-historyOrders.bin').read())
                 self._historyOrdersSize = list(map(self.get_item_size, history_orders))
                 for history_order in history_orders:
                     convert_iso_time_to_date(history_order)
@@ -0,0 +1,116 @@
+from .models import date, is_time_field
+from typing import Dict, Iterable
+
+
+class LazyDateDict(dict):
+    """Dictionary which keeps ISO time strings of a packet and parses them into dates on first access. Reading values
+    in any way, including iteration over items, copying and comparison, returns dates, so the dictionary can be used
+    wherever a packet with converted times is expected."""
+
+    def __init__(self, values: Dict, time_fields: Iterable[str]):
+        """Inits the class.
+
+        Args:
+            values: Packet fields.
+            time_fields: Names of the fields which hold time strings.
+        """
+        super().__init__(values)
+        self._timeFields = set(time_fields)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key in self._timeFields:
+            self._timeFields.discard(key)
+            value = date(value)
+            super().__setitem__(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._timeFields.discard(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._timeFields.discard(key)
+        super().__delitem__(key)
+
+    def __iter__(self):
+        # dict() and dict unpacking copy raw values of dict subclasses unless __iter__ is overridden
+        return super().__iter__()
+
+    def __eq__(self, other):
+        self._parse_all()
+        if isinstance(other, LazyDateDict):
+            other._parse_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        self._parse_all()
+        return super().__repr__()
+
+    def __reduce__(self):
+        self._parse_all()
+        return dict, (dict(super().items()),)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *args):
+        if key in self:
+            value = self[key]
+            super().pop(key)
+            return value
+        return super().pop(key, *args)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        super().setdefault(key, default)
+        return default
+
+    def items(self):
+        self._parse_all()
+        return super().items()
+
+    def values(self):
+        self._parse_all()
+        return super().values()
+
+    def copy(self) -> Dict:
+        self._parse_all()
+        return dict(super().items())
+
+    def _parse_all(self):
+        for key in list(self._timeFields):
+            self[key]
+
+
+def convert_iso_time_to_lazy_date(packet: Dict) -> Dict:
+    """Replaces dictionaries of a packet which contain ISO time strings with dictionaries which parse the strings
+    into dates on first access. Follows the same rules as convert_iso_time_to_date.
+
+    Args:
+        packet: Packet to convert.
+
+    Returns:
+        Converted packet. The packet itself is returned if it does not contain time strings directly.
+    """
+    time_fields = None
+    for field, value in packet.items():
+        if isinstance(value, str):
+            if is_time_field(field):
+                time_fields = time_fields or []
+                time_fields.append(field)
+        elif isinstance(value, dict):
+            if field == 'timestamps':
+                timestamps_fields = [key for key in value if isinstance(value[key], (str, int, float))]
+                packet[field] = LazyDateDict(value, timestamps_fields) if timestamps_fields else value
+            else:
+                packet[field] = convert_iso_time_to_lazy_date(value)
+        elif isinstance(value, list):
+            for i in range(len(value)):
+                if isinstance(value[i], dict):
+                    value[i] = convert_iso_time_to_lazy_date(value[i])
+    return LazyDateDict(packet, time_fields) if time_fields else packet
@@ -0,0 +1,51 @@
+from .lazyDateDict import LazyDateDict, convert_iso_time_to_lazy_date
+from .models import date, convert_iso_time_to_date
+import copy
+import json
+
+packet_json = json.dumps({
+    'type': 'prices', 'accountId': 'accountId', 'sequenceTimestamp': 1603124267178,
+    'prices': [{'symbol': 'EURUSD', 'time': '2020-04-15T02:45:06.521Z', 'brokerTime': '2020-04-15 05:45:06.521',
+                'timestamps': {'eventGenerated': '2020-04-15T02:45:06.500Z'}}],
+    'update': {'updateTime': '2020-04-15T02:45:06.521Z'},
+    'timestamps': {'serverProcessingStarted': '2020-04-15T02:45:06.510Z'}
+})
+
+
+class TestLazyDateDict:
+    def test_parse_on_access(self):
+        """Should parse time strings on first access."""
+        price = LazyDateDict({'symbol': 'EURUSD', 'time': '2020-04-15T02:45:06.521Z'}, ['time'])
+        assert dict.__getitem__(price, 'time') == '2020-04-15T02:45:06.521Z'
+        assert price['time'] == date('2020-04-15T02:45:06.521Z')
+        assert price['time'] is price['time']
+        assert price.get('time') == date('2020-04-15T02:45:06.521Z')
+        assert price.get('brokerTime') is None
+
+    def test_return_dates_from_copies(self):
+        """Should return dates when the dictionary is copied or compared."""
+        for make_copy in [dict, lambda d: {**d}, lambda d: d.copy(), copy.deepcopy, lambda d: dict(d.items())]:
+            price = LazyDateDict({'symbol': 'EURUSD', 'time': '2020-04-15T02:45:06.521Z'}, ['time'])
+            assert make_copy(price) == {'symbol': 'EURUSD', 'time': date('2020-04-15T02:45:06.521Z')}
+        price = LazyDateDict({'symbol': 'EURUSD', 'time': '2020-04-15T02:45:06.521Z'}, ['time'])
+        assert {'symbol': 'EURUSD', 'time': date('2020-04-15T02:45:06.521Z')} == price
+        assert list(price.values()) == ['EURUSD', date('2020-04-15T02:45:06.521Z')]
+        price = LazyDateDict({'symbol': 'EURUSD', 'time': '2020-04-15T02:45:06.521Z'}, ['time'])
+        assert price.pop('time') == date('2020-04-15T02:45:06.521Z')
+
+    def test_keep_assigned_values(self):
+        """Should not parse values assigned after creation."""
+        price = LazyDateDict({'time': '2020-04-15T02:45:06.521Z'}, ['time'])
+        price['time'] = 'time'
+        assert price['time'] == 'time'
+
+    def test_convert_packet(self):
+        """Should produce the same packet as the eager conversion."""
+        packet = convert_iso_time_to_lazy_date(json.loads(packet_json))
+        assert isinstance(packet['prices'][0], LazyDateDict)
+        assert isinstance(packet['prices'][0]['timestamps'], LazyDateDict)
+        assert isinstance(packet['timestamps'], LazyDateDict)
+        assert not isinstance(packet, LazyDateDict)
+        expected = json.loads(packet_json)
+        convert_iso_time_to_date(expected)
+        assert packet == expected
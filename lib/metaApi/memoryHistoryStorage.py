@@ -1,5 +1,5 @@
 from .models import MetatraderDeal, MetatraderOrder
-from typing import List
+from typing import List, Dict, Tuple
 from .memoryHistoryStorageModel import MemoryHistoryStorageModel
 from .historyFileManager import HistoryFileManager
 from datetime import datetime
@@ -129,39 +129,24 @@ class MemoryHistoryStorage(MemoryHistoryStorageModel):
         Returns:
             A coroutine which resolves when the asynchronous event is processed.
         """
-        insert_index = 0
-        replacement_index = -1
+        await self.on_history_orders_added(instance_index, [history_order])
 
-        def get_done_time(order):
-            if 'doneTime' in order:
-                return order['doneTime'].timestamp() if (isinstance(order['doneTime'], datetime)) \
-                    else date(order['doneTime']).timestamp()
-            else:
-                return 0
+    async def on_history_orders_added(self, instance_index: int, history_orders: List[MetatraderOrder]):
+        """Invoked when new MetaTrader history orders are added.
 
-        new_history_order_time = get_done_time(history_order)
-        if str(instance_index) not in self._lastHistoryOrderTimeByInstanceIndex or \
-                self._lastHistoryOrderTimeByInstanceIndex[str(instance_index)] < new_history_order_time:
-            self._lastHistoryOrderTimeByInstanceIndex[str(instance_index)] = new_history_order_time
-
-        for i in range(len(self._historyOrders)):
-            index = len(self._historyOrders) - 1 - i
-            order = self._historyOrders[index]
-            order_time = get_done_time(order)
-            if (order_time < new_history_order_time) or \
-               (order_time == new_history_order_time and order['id'] <= history_order['id']):
-                if (order_time == new_history_order_time and order['id'] == history_order['id'] and
-                   order['type'] == history_order['type']):
-                    replacement_index = index
-                else:
-                    insert_index = index + 1
-                break
-        if replacement_index != -1:
-            self._historyOrders[replacement_index] = history_order
-            self._fileManager.set_start_new_order_index(replacement_index)
-        else:
-            self._historyOrders.insert(insert_index, history_order)
-            self._fileManager.set_start_new_order_index(insert_index)
+        Args:
+            instance_index: Index of an account instance connected.
+            history_orders: New MetaTrader history orders.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        if len(history_orders):
+            start_index, new_history_order_time = self._insert_items(self._historyOrders, history_orders, 'doneTime')
+            if str(instance_index) not in self._lastHistoryOrderTimeByInstanceIndex or \
+                    self._lastHistoryOrderTimeByInstanceIndex[str(instance_index)] < new_history_order_time:
+                self._lastHistoryOrderTimeByInstanceIndex[str(instance_index)] = new_history_order_time
+            self._fileManager.set_start_new_order_index(start_index)
 
     async def on_deal_added(self, instance_index: int, new_deal: MetatraderDeal):
         """Invoked when a new MetaTrader history deal is added.
@@ -173,38 +158,24 @@ class MemoryHistoryStorage(MemoryHistoryStorageModel):
         Returns:
             A coroutine which resolves when the asynchronous event is processed.
         """
-        insert_index = 0
-        replacement_index = -1
+        await self.on_deals_added(instance_index, [new_deal])
 
-        def get_time(deal):
-            if 'time' in deal:
-                return deal['time'].timestamp() if (isinstance(deal['time'], datetime)) \
-                    else date(deal['time']).timestamp()
-            else:
-                return 0
+    async def on_deals_added(self, instance_index: int, deals: List[MetatraderDeal]):
+        """Invoked when new MetaTrader history deals are added.
 
-        new_deal_time = get_time(new_deal)
-        if str(instance_index) not in self._lastDealTimeByInstanceIndex or \
-                self._lastDealTimeByInstanceIndex[str(instance_index)] < new_deal_time:
-            self._lastDealTimeByInstanceIndex[str(instance_index)] = new_deal_time
-        for i in range(len(self._deals)):
-            index = len(self._deals) - 1 - i
-            deal = self._deals[index]
-            deal_time = get_time(deal)
-            if (deal_time < new_deal_time) or \
-                    (deal_time == new_deal_time and deal['id'] <= new_deal['id']):
-                if (deal_time == new_deal_time and deal['id'] == new_deal['id'] and
-                        deal['type'] == new_deal['type']):
-                    replacement_index = index
-                else:
-                    insert_index = index + 1
-                break
-        if replacement_index != -1:
-            self._deals[replacement_index] = new_deal
-            self._fileManager.set_start_new_deal_index(replacement_index)
-        else:
-            self._deals.insert(insert_index, new_deal)
-            self._fileManager.set_start_new_deal_index(insert_index)
+        Args:
+            instance_index: Index of an account instance connected.
+            deals: New MetaTrader history deals.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        if len(deals):
+            start_index, new_deal_time = self._insert_items(self._deals, deals, 'time')
+            if str(instance_index) not in self._lastDealTimeByInstanceIndex or \
+                    self._lastDealTimeByInstanceIndex[str(instance_index)] < new_deal_time:
+                self._lastDealTimeByInstanceIndex[str(instance_index)] = new_deal_time
+            self._fileManager.set_start_new_deal_index(start_index)
 
     async def on_deal_synchronization_finished(self, instance_index: int, synchronization_id: str):
         """Invoked when a synchronization of history deals on a MetaTrader account have finished.
@@ -218,3 +189,46 @@ class MemoryHistoryStorage(MemoryHistoryStorageModel):
         """
         self._dealSynchronizationFinished[str(instance_index)] = True
         await self.update_disk_storage()
+
+    def _insert_items(self, items: List[Dict], new_items: List[Dict], time_field: str) -> Tuple[int, float]:
+        def get_time(item):
+            if time_field in item:
+                return item[time_field].timestamp() if (isinstance(item[time_field], datetime)) \
+                    else date(item[time_field]).timestamp()
+            else:
+                return 0
+
+        timed_items = list(map(lambda item: (get_time(item), item), new_items))
+        if len(timed_items) > 1:
+            timed_items.sort(key=lambda e: (e[0], e[1]['id']))
+        # the sorted batch is merged in one pass into the part of the list which follows the last item preceding the
+        # first new item, so that items arriving in chronological order touch only the end of the list
+        merge_index = len(items)
+        tail_times = []
+        while merge_index > 0:
+            merge_index -= 1
+            item_time = get_time(items[merge_index])
+            tail_times.append(item_time)
+            if (item_time, items[merge_index]['id']) <= (timed_items[0][0], timed_items[0][1]['id']):
+                break
+        tail_times.reverse()
+        merged = []
+        merged_times = []
+        start_index = len(items)
+        tail_index = 0
+        for new_item_time, new_item in timed_items:
+            while tail_index < len(tail_times) and \
+                    (tail_times[tail_index], items[merge_index + tail_index]['id']) <= (new_item_time, new_item['id']):
+                merged.append(items[merge_index + tail_index])
+                merged_times.append(tail_times[tail_index])
+                tail_index += 1
+            if merged and merged_times[-1] == new_item_time and merged[-1]['id'] == new_item['id'] and \
+                    merged[-1]['type'] == new_item['type']:
+                merged[-1] = new_item
+            else:
+                merged.append(new_item)
+                merged_times.append(new_item_time)
+            start_index = min(start_index, merge_index + len(merged) - 1)
+        merged += items[merge_index + tail_index:]
+        items[merge_index:] = merged
+        return start_index, max(map(lambda e: e[0], timed_items))
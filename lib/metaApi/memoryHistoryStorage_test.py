@@ -130,6 +130,63 @@ class TestMemoryHistoryStorage:
             {'id': '6', 'doneTime': date('2020-10-01T00:00:00.000Z'), 'type': 'ORDER_TYPE_BUY'}
                                           ]
 
+    @pytest.mark.asyncio
+    async def test_add_deals_in_bulk(self):
+        """Should add deals in bulk."""
+
+        storage._fileManager.set_start_new_deal_index = MagicMock()
+        await storage.on_deal_added(1, {'id': '1', 'time': date('2020-01-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_SELL'})
+        await storage.on_deal_added(1, {'id': '5', 'time': date('2020-06-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY'})
+        await storage.on_deals_added(1, [
+            {'id': '3', 'time': date('2020-09-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY'},
+            {'id': '4', 'time': date('2020-02-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_SELL'},
+            {'id': '5', 'time': date('2020-06-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY', 'profit': 1},
+            {'id': '2', 'type': 'DEAL_TYPE_SELL'}
+        ])
+        assert storage.deals == [
+            {'id': '2', 'type': 'DEAL_TYPE_SELL'},
+            {'id': '1', 'time': date('2020-01-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_SELL'},
+            {'id': '4', 'time': date('2020-02-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_SELL'},
+            {'id': '5', 'time': date('2020-06-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY', 'profit': 1},
+            {'id': '3', 'time': date('2020-09-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY'}
+        ]
+        storage._fileManager.set_start_new_deal_index.assert_called_with(0)
+        assert await storage.last_deal_time(1) == date('2020-09-01T00:00:00.000Z')
+
+    @pytest.mark.asyncio
+    async def test_merge_deals_into_stored_deals(self):
+        """Should merge a batch of deals into stored deals."""
+
+        storage._fileManager.set_start_new_deal_index = MagicMock()
+        for i in [1, 3, 5, 7]:
+            await storage.on_deal_added(1, {'id': str(i), 'time': date(f'2020-0{i}-01T00:00:00.000Z'),
+                                            'type': 'DEAL_TYPE_SELL'})
+        storage._fileManager.set_start_new_deal_index.reset_mock()
+        await storage.on_deals_added(1, [
+            {'id': '8', 'time': date('2020-08-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY'},
+            {'id': '4', 'time': date('2020-04-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY'},
+            {'id': '5', 'time': date('2020-05-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_SELL', 'profit': 1},
+            {'id': '6', 'time': date('2020-06-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_BUY'}
+        ])
+        assert list(map(lambda deal: deal['id'], storage.deals)) == ['1', '3', '4', '5', '6', '7', '8']
+        assert storage.deals[3] == {'id': '5', 'time': date('2020-05-01T00:00:00.000Z'), 'type': 'DEAL_TYPE_SELL',
+                                    'profit': 1}
+        storage._fileManager.set_start_new_deal_index.assert_called_once_with(2)
+
+    @pytest.mark.asyncio
+    async def test_add_history_orders_in_bulk(self):
+        """Should add history orders in bulk."""
+
+        await storage.on_history_orders_added(1, [
+            {'id': '2', 'doneTime': date('2020-02-01T00:00:00.000Z'), 'type': 'ORDER_TYPE_SELL'},
+            {'id': '1', 'doneTime': date('2020-01-01T00:00:00.000Z'), 'type': 'ORDER_TYPE_BUY'}
+        ])
+        assert storage.history_orders == [
+            {'id': '1', 'doneTime': date('2020-01-01T00:00:00.000Z'), 'type': 'ORDER_TYPE_BUY'},
+            {'id': '2', 'doneTime': date('2020-02-01T00:00:00.000Z'), 'type': 'ORDER_TYPE_SELL'}
+        ]
+        assert await storage.last_history_order_time(1) == date('2020-02-01T00:00:00.000Z')
+
     @pytest.mark.asyncio
     async def test_return_saved_order_sync_status(self):
         """Should return saved order synchronization status."""
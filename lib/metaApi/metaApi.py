@@ -1,12 +1,18 @@
 from ..clients.httpClient import HttpClient
 from ..clients.metaApi.metaApiWebsocket_client import MetaApiWebsocketClient
+from ..clients.metaApi.metaApiWebsocketPool_client import MetaApiWebsocketPoolClient
 from ..metaApi.provisioningProfileApi import ProvisioningProfileApi
 from ..clients.metaApi.provisioningProfile_client import ProvisioningProfileClient
 from ..metaApi.metatraderAccountApi import MetatraderAccountApi
 from ..clients.metaApi.metatraderAccount_client import MetatraderAccountClient
 from ..clients.metaApi.packetLogger import PacketLoggerOpts
+from ..clients.metaApi.packetQueue import PacketQueueOpts
+from ..clients.metaApi.packetOrderer import AdaptivePacketOrderingOpts
+from ..clients.metaApi.subscribeScheduler import SubscribeSchedulerOpts
 from ..clients.errorHandler import ValidationException
 from ..metaApi.connectionRegistry import ConnectionRegistry
+from .responseCache import ResponseCacheOpts
+from .metaApiConnection import ReadPreferenceOpts, read_preference_modes
 from .metatraderDemoAccountApi import MetatraderDemoAccountApi
 from ..clients.metaApi.metatraderDemoAccount_client import MetatraderDemoAccountClient
 from .latencyMonitor import LatencyMonitor
@@ -28,8 +34,23 @@ class MetaApiOpts(TypedDict):
     """Timeout for connecting to server in seconds."""
     packetOrderingTimeout: Optional[float]
     """Packet ordering timeout in seconds."""
+    adaptivePacketOrdering: Optional[AdaptivePacketOrderingOpts]
+    """Adaptive packet ordering timeout options. The timeout is fixed by default."""
     packetLogger: Optional[PacketLoggerOpts]
     """Packet logger options."""
+    synchronizationQueue: Optional[PacketQueueOpts]
+    """Per-account synchronization packet queue options."""
+    subscribeScheduler: Optional[SubscribeSchedulerOpts]
+    """Subscribe request rate limit options."""
+    websocketPoolSize: Optional[int]
+    """Amount of sockets accounts are spread across. Default is 1."""
+    responseCache: Optional[ResponseCacheOpts]
+    """Response cache options of MetaApi connections. The cache is disabled by default."""
+    readPreference: Optional[ReadPreferenceOpts]
+    """Read preference options of MetaApi connections. By default all reads are sent to the server."""
+    lazyTimeParsing: Optional[bool]
+    """An option to keep time strings of synchronization packets and parse them into dates on first access. Saves
+    time on packets which time fields are not read by listeners. Default is False."""
     enableLatencyMonitor: Optional[bool]
     """An option to enable latency tracking."""
     enableLatencyTracking: Optional[bool]
@@ -52,17 +73,34 @@ class MetaApi:
         request_timeout = opts['requestTimeout'] if 'requestTimeout' in opts else 60
         connect_timeout = opts['connectTimeout'] if 'connectTimeout' in opts else 60
         packet_ordering_timeout = opts['packetOrderingTimeout'] if 'packetOrderingTimeout' in opts else 60
+        adaptive_packet_ordering = opts['adaptivePacketOrdering'] if 'adaptivePacketOrdering' in opts else {}
         packet_logger = opts['packetLogger'] if 'packetLogger' in opts else {}
+        synchronization_queue = opts['synchronizationQueue'] if 'synchronizationQueue' in opts else {}
+        subscribe_scheduler = opts['subscribeScheduler'] if 'subscribeScheduler' in opts else {}
+        websocket_pool_size = opts['websocketPoolSize'] if 'websocketPoolSize' in opts else 1
+        lazy_time_parsing = opts['lazyTimeParsing'] if 'lazyTimeParsing' in opts else False
+        response_cache = opts['responseCache'] if 'responseCache' in opts else None
+        read_preference = opts['readPreference'] if 'readPreference' in opts else None
         if not re.search(r"[a-zA-Z0-9_]+", application):
             raise ValidationException('Application name must be non-empty string consisting ' +
                                       'from letters, digits and _ only')
+        if read_preference and 'mode' in read_preference and read_preference['mode'] not in read_preference_modes:
+            raise ValidationException('Read preference mode must be one of ' + ', '.join(read_preference_modes))
         http_client = HttpClient(request_timeout)
-        self._metaApiWebsocketClient = MetaApiWebsocketClient(
-            token, {'application': application, 'domain': domain, 'requestTimeout': request_timeout,
-                    'connectTimeout': connect_timeout, 'packetLogger': packet_logger,
-                    'packetOrderingTimeout': packet_ordering_timeout})
+        websocket_client_opts = {'application': application, 'domain': domain, 'requestTimeout': request_timeout,
+                                 'connectTimeout': connect_timeout, 'packetLogger': packet_logger,
+                                 'packetOrderingTimeout': packet_ordering_timeout,
+                                 'adaptivePacketOrdering': adaptive_packet_ordering,
+                                 'synchronizationQueue': synchronization_queue,
+                                 'lazyTimeParsing': lazy_time_parsing, 'subscribeScheduler': subscribe_scheduler}
+        if websocket_pool_size > 1:
+            self._metaApiWebsocketClient = MetaApiWebsocketPoolClient(token, websocket_client_opts,
+                                                                      websocket_pool_size)
+        else:
+            self._metaApiWebsocketClient = MetaApiWebsocketClient(token, websocket_client_opts)
         self._provisioningProfileApi = ProvisioningProfileApi(ProvisioningProfileClient(http_client, token, domain))
-        self._connectionRegistry = ConnectionRegistry(self._metaApiWebsocketClient, application)
+        self._connectionRegistry = ConnectionRegistry(self._metaApiWebsocketClient, application, response_cache,
+                                                      read_preference)
         self._metatraderAccountApi = MetatraderAccountApi(MetatraderAccountClient(http_client, token, domain),
                                                           self._metaApiWebsocketClient, self._connectionRegistry)
         self._metatraderDemoAccountApi = MetatraderDemoAccountApi(MetatraderDemoAccountClient(http_client, token,
@@ -7,14 +7,16 @@ from .memoryHistoryStorage import MemoryHistoryStorage
 from .metatraderAccountModel import MetatraderAccountModel
 from .connectionRegistryModel import ConnectionRegistryModel
 from .historyStorage import HistoryStorage
+from .responseCache import ResponseCache, ResponseCacheOpts, ResponseCacheStats
 from ..clients.timeoutException import TimeoutException
 from .models import random_id, MetatraderSymbolSpecification, MetatraderAccountInformation, \
     MetatraderPosition, MetatraderOrder, MetatraderHistoryOrders, MetatraderDeals, MetatraderTradeResponse, \
     MetatraderSymbolPrice, MarketTradeOptions, PendingTradeOptions
 from datetime import datetime, timedelta
-from typing import Coroutine, List, Optional, Dict
+from typing import Callable, Coroutine, List, Optional, Dict
 from typing_extensions import TypedDict
 from functools import reduce
+from copy import deepcopy
 import pytz
 import asyncio
 
@@ -45,12 +47,30 @@ class SynchronizationOptions(TypedDict):
     """Interval between account reloads while waiting for a change, default is 1s."""
 
 
+read_preference_modes = ['local', 'local_if_synchronized', 'remote']
+
+
+class ReadPreferenceOpts(TypedDict):
+    """Read preference options."""
+
+    mode: Optional[str]
+    """Where account information, positions, orders and symbol prices are read from. One of local (the local copy of
+    terminal state), local_if_synchronized (the local copy if the connection is synchronized and the copy is fresh,
+    the server otherwise) or remote (the server). In local modes account information and symbol prices which are
+    not in the local copy yet are read from the server. Values read from the local copy are copies. Default is
+    remote."""
+    maxStalenessInSeconds: Optional[float]
+    """Maximum age of the latest price of the local copy of terminal state (or of the price read for symbol prices)
+    for the copy to be read in local_if_synchronized mode. None disables the check. Default is 60."""
+
+
 class MetaApiConnection(SynchronizationListener, ReconnectListener):
     """Exposes MetaApi MetaTrader API connection to consumers."""
 
     def __init__(self, websocket_client: MetaApiWebsocketClient, account: MetatraderAccountModel,
                  history_storage: HistoryStorage or None, connection_registry: ConnectionRegistryModel,
-                 history_start_time: datetime = None):
+                 history_start_time: datetime = None, response_cache: ResponseCacheOpts = None,
+                 read_preference: ReadPreferenceOpts = None):
         """Inits MetaApi MetaTrader Api connection.
 
         Args:
@@ -59,6 +79,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
             history_storage: Local terminal history storage. By default an instance of MemoryHistoryStorage
             will be used.
             history_start_time: History start sync time.
+            response_cache: Response cache options.
+            read_preference: Read preference options.
         """
         super().__init__()
         self._websocketClient = websocket_client
@@ -73,7 +95,16 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         self._websocketClient.add_synchronization_listener(account.id, self._terminalState)
         self._websocketClient.add_synchronization_listener(account.id, self._historyStorage)
         self._websocketClient.add_synchronization_listener(account.id, self._healthMonitor)
-        self._websocketClient.add_reconnect_listener(self)
+        if response_cache and 'enabled' in response_cache and response_cache['enabled']:
+            self._responseCache = ResponseCache(response_cache)
+            self._websocketClient.add_synchronization_listener(account.id, self._responseCache)
+        else:
+            self._responseCache = None
+        self._websocketClient.add_reconnect_listener(self, account.id)
+        read_preference = read_preference or {}
+        self._readPreference = read_preference['mode'] if 'mode' in read_preference else 'remote'
+        self._maxStalenessInSeconds = read_preference['maxStalenessInSeconds'] if 'maxStalenessInSeconds' in \
+            read_preference else 60
         self._subscriptions = {}
         self._stateByInstanceIndex = {}
         self._synchronized = False
@@ -86,7 +117,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with account information.
         """
-        return self._websocketClient.get_account_information(self._account.id)
+        return self._read(lambda: self._terminalState.account_information,
+                          lambda: self._websocketClient.get_account_information(self._account.id))
 
     def get_positions(self) -> 'Coroutine[asyncio.Future[List[MetatraderPosition]]]':
         """Returns positions (see
@@ -95,7 +127,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with array of open positions.
         """
-        return self._websocketClient.get_positions(self._account.id)
+        return self._read(lambda: self._terminalState.positions,
+                          lambda: self._websocketClient.get_positions(self._account.id))
 
     def get_position(self, position_id: str) -> 'Coroutine[asyncio.Future[MetatraderPosition]]':
         """Returns specific position (see
@@ -116,7 +149,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with open MetaTrader orders.
         """
-        return self._websocketClient.get_orders(self._account.id)
+        return self._read(lambda: self._terminalState.orders,
+                          lambda: self._websocketClient.get_orders(self._account.id))
 
     def get_order(self, order_id: str) -> 'Coroutine[asyncio.Future[MetatraderOrder]]':
         """Returns specific open order (see
@@ -140,7 +174,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with request results containing history orders found.
         """
-        return self._websocketClient.get_history_orders_by_ticket(self._account.id, ticket)
+        return self._cached_request('get_history_orders_by_ticket', (ticket,),
+                                    self._websocketClient.get_history_orders_by_ticket)
 
     def get_history_orders_by_position(self, position_id: str) -> 'Coroutine[MetatraderHistoryOrders]':
         """Returns the history of completed orders for a specific position id (see
@@ -152,7 +187,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with request results containing history orders found.
         """
-        return self._websocketClient.get_history_orders_by_position(self._account.id, position_id)
+        return self._cached_request('get_history_orders_by_position', (position_id,),
+                                    self._websocketClient.get_history_orders_by_position)
 
     def get_history_orders_by_time_range(self, start_time: datetime, end_time: datetime, offset: int = 0,
                                          limit: int = 1000) -> 'Coroutine[MetatraderHistoryOrders]':
@@ -168,8 +204,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with request results containing history orders found.
         """
-        return self._websocketClient.get_history_orders_by_time_range(self._account.id, start_time, end_time,
-                                                                      offset, limit)
+        return self._cached_request('get_history_orders_by_time_range', (start_time, end_time, offset, limit),
+                                    self._websocketClient.get_history_orders_by_time_range)
 
     def get_deals_by_ticket(self, ticket: str) -> 'Coroutine[MetatraderDeals]':
         """Returns history deals with a specific ticket number (see
@@ -181,7 +217,7 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with request results containing deals found.
         """
-        return self._websocketClient.get_deals_by_ticket(self._account.id, ticket)
+        return self._cached_request('get_deals_by_ticket', (ticket,), self._websocketClient.get_deals_by_ticket)
 
     def get_deals_by_position(self, position_id) -> 'Coroutine[MetatraderDeals]':
         """Returns history deals for a specific position id (see
@@ -193,7 +229,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with request results containing deals found.
         """
-        return self._websocketClient.get_deals_by_position(self._account.id, position_id)
+        return self._cached_request('get_deals_by_position', (position_id,),
+                                    self._websocketClient.get_deals_by_position)
 
     def get_deals_by_time_range(self, start_time: datetime, end_time: datetime, offset: int = 0,
                                 limit: int = 1000) -> 'Coroutine[MetatraderDeals]':
@@ -209,7 +246,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine resolving with request results containing deals found.
         """
-        return self._websocketClient.get_deals_by_time_range(self._account.id, start_time, end_time, offset, limit)
+        return self._cached_request('get_deals_by_time_range', (start_time, end_time, offset, limit),
+                                    self._websocketClient.get_deals_by_time_range)
 
     def remove_history(self, application: str = None) -> Coroutine:
         """Clears the order and transaction history of a specified account so that it can be synchronized from scratch
@@ -672,7 +710,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine which resolves when specification MetatraderSymbolSpecification is retrieved.
         """
-        return self._websocketClient.get_symbol_specification(self._account.id, symbol)
+        return self._cached_request('get_symbol_specification', (symbol,),
+                                    self._websocketClient.get_symbol_specification)
 
     def get_symbol_price(self, symbol) -> 'Coroutine[asyncio.Future[MetatraderSymbolPrice]]':
         """Retrieves specification for a symbol (see
@@ -684,7 +723,9 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         Returns:
             A coroutine which resolves when price MetatraderSymbolPrice is retrieved.
         """
-        return self._websocketClient.get_symbol_price(self._account.id, symbol)
+        return self._read(lambda: self._terminalState.price(symbol),
+                          lambda: self._websocketClient.get_symbol_price(self._account.id, symbol),
+                          lambda price: price['time'] if 'time' in price else None)
 
     def save_uptime(self, uptime: Dict):
         """Sends client uptime stats to the server.
@@ -715,13 +756,15 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         """
         return self._historyStorage
 
-    def add_synchronization_listener(self, listener):
+    def add_synchronization_listener(self, listener, conflate_prices: bool = False):
         """Adds synchronization listener.
 
         Args:
             listener: Synchronization listener to add.
+            conflate_prices: Whether to deliver only the latest price of each symbol to the listener if it can not
+            keep up with price updates. Default is False.
         """
-        self._websocketClient.add_synchronization_listener(self._account.id, listener)
+        self._websocketClient.add_synchronization_listener(self._account.id, listener, conflate_prices)
 
     def remove_synchronization_listener(self, listener):
         """Removes synchronization listener for specific account.
@@ -879,6 +922,8 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
             self._websocketClient.remove_synchronization_listener(self._account.id, self._terminalState)
             self._websocketClient.remove_synchronization_listener(self._account.id, self._historyStorage)
             self._websocketClient.remove_synchronization_listener(self._account.id, self._healthMonitor)
+            if self._responseCache is not None:
+                self._websocketClient.remove_synchronization_listener(self._account.id, self._responseCache)
             self._connection_registry.remove(self._account.id)
             self._healthMonitor.stop()
             self._closed = True
@@ -910,6 +955,24 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
         """
         return self._healthMonitor
 
+    @property
+    def response_cache_stats(self) -> Optional[ResponseCacheStats]:
+        """Returns response cache statistics.
+
+        Returns:
+            Response cache statistics or None if the response cache is not enabled.
+        """
+        return self._responseCache.stats if self._responseCache is not None else None
+
+    def invalidate_response_cache(self, method_name: str = None):
+        """Removes cached responses.
+
+        Args:
+            method_name: Method name to remove cached responses of, or None to remove all cached responses.
+        """
+        if self._responseCache is not None:
+            self._responseCache.invalidate(method_name)
+
     async def _ensure_synchronized(self, instance_index: int, key):
         state = self._get_state(instance_index)
         if state:
@@ -931,6 +994,33 @@ class MetaApiConnection(SynchronizationListener, ReconnectListener):
                     state['synchronizationRetryIntervalInSeconds'] = \
                         min(state['synchronizationRetryIntervalInSeconds'] * 2, 300)
 
+    def _read(self, read_local: Callable, read_remote: Callable[[], Coroutine],
+              get_update_time: Callable = None) -> Coroutine:
+        if self._readPreference == 'remote':
+            return read_remote()
+        return self._read_preferring_local(read_local, read_remote, get_update_time)
+
+    async def _read_preferring_local(self, read_local: Callable, read_remote: Callable[[], Coroutine],
+                                     get_update_time: Callable = None):
+        # values read from the local copy of terminal state are copied, so that callers can not modify the copy and
+        # returned values do not change on synchronization updates
+        value = read_local()
+        if value is None:
+            return await read_remote()
+        if self._readPreference == 'local':
+            return deepcopy(value)
+        if self._terminalState.connected_to_broker and await self.is_synchronized(None):
+            update_time = get_update_time(value) if get_update_time else self._terminalState.last_update_time
+            if self._maxStalenessInSeconds is None or (update_time is not None and (
+                    datetime.now(pytz.utc) - update_time).total_seconds() <= self._maxStalenessInSeconds):
+                return deepcopy(value)
+        return await read_remote()
+
+    def _cached_request(self, method_name: str, args: tuple, request) -> Coroutine:
+        if self._responseCache is None:
+            return request(self._account.id, *args)
+        return self._responseCache.get(method_name, args, lambda: request(self._account.id, *args))
+
     def _get_state(self, instance_index: int) -> MetaApiConnectionDict:
         if str(instance_index) not in self._stateByInstanceIndex:
             self._stateByInstanceIndex[str(instance_index)] = {
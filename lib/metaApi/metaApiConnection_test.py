@@ -5,6 +5,7 @@ from ..clients.metaApi.reconnectListener import ReconnectListener
 from ..clients.metaApi.synchronizationListener import SynchronizationListener
 from .metatraderAccount import MetatraderAccount
 from datetime import datetime, timedelta
+import pytz
 from mock import MagicMock, AsyncMock, patch
 from .models import date
 from typing import Coroutine
@@ -67,10 +68,10 @@ class MockClient(MetaApiWebsocketClient):
     def subscribe_to_market_data(self, account_id: str, instance_index: int, symbol: str) -> Coroutine:
         pass
 
-    def add_synchronization_listener(self, account_id: str, listener):
+    def add_synchronization_listener(self, account_id: str, listener, conflate_prices: bool = False):
         pass
 
-    def add_reconnect_listener(self, listener: ReconnectListener):
+    def add_reconnect_listener(self, listener: ReconnectListener, account_id: str = None):
         pass
 
     def remove_synchronization_listener(self, account_id: str, listener: SynchronizationListener):
@@ -704,6 +705,66 @@ class TestMetaApiConnection:
         assert actual == specification
         client.get_symbol_specification.assert_called_with('accountId', 'AUDNZD')
 
+    @pytest.mark.asyncio
+    async def test_cache_symbol_specification(self):
+        """Should serve symbol specification from the response cache."""
+        specification = {'symbol': 'AUDNZD', 'tickSize': 0.00001}
+        client.get_symbol_specification = AsyncMock(return_value=specification)
+        cached_api = MetaApiConnection(client, account, MagicMock(), MagicMock(), None, {'enabled': True})
+        assert await cached_api.get_symbol_specification('AUDNZD') == specification
+        assert await cached_api.get_symbol_specification('AUDNZD') == specification
+        client.get_symbol_specification.assert_called_once_with('accountId', 'AUDNZD')
+        assert cached_api.response_cache_stats['hits'] == 1
+        cached_api.invalidate_response_cache()
+        await cached_api.get_symbol_specification('AUDNZD')
+        assert client.get_symbol_specification.call_count == 2
+        assert api.response_cache_stats is None
+
+    @pytest.mark.asyncio
+    async def test_read_from_synchronized_terminal_state(self):
+        """Should read positions and prices from synchronized terminal state."""
+        client.get_positions = AsyncMock(return_value=[])
+        client.get_symbol_price = AsyncMock(return_value={'symbol': 'EURUSD', 'bid': 1})
+        local_api = MetaApiConnection(client, account, MagicMock(), MagicMock(), None, None,
+                                      {'mode': 'local_if_synchronized', 'maxStalenessInSeconds': 10})
+        local_api.is_synchronized = AsyncMock(return_value=True)
+        terminal_state = local_api.terminal_state
+        await terminal_state.on_connected(0, 1)
+        await terminal_state.on_broker_connection_status_changed(0, True)
+        await terminal_state.on_positions_replaced(0, [{'id': '1', 'symbol': 'EURUSD'}])
+        price = {'symbol': 'EURUSD', 'bid': 1.1, 'ask': 1.2, 'time': datetime.now(pytz.utc)}
+        await terminal_state.on_symbol_prices_updated(0, [price])
+        assert await local_api.get_positions() == [{'id': '1', 'symbol': 'EURUSD'}]
+        assert await local_api.get_symbol_price('EURUSD') == price
+        assert (await local_api.get_symbol_price('GBPUSD'))['bid'] == 1
+        client.get_positions.assert_not_called()
+        client.get_symbol_price.assert_called_once_with('accountId', 'GBPUSD')
+        price['time'] = datetime.now(pytz.utc) - timedelta(seconds=20)
+        assert (await local_api.get_symbol_price('EURUSD'))['bid'] == 1
+        local_api.is_synchronized = AsyncMock(return_value=False)
+        assert await local_api.get_positions() == []
+        client.get_positions.assert_called_once_with('accountId')
+        await terminal_state.on_disconnected(0)
+
+    @pytest.mark.asyncio
+    async def test_read_copies_from_terminal_state_in_local_mode(self):
+        """Should read copies from terminal state and fall back to server if values are missing in local mode."""
+        client.get_account_information = AsyncMock(return_value={'balance': 100})
+        local_api = MetaApiConnection(client, account, MagicMock(), MagicMock(), None, None, {'mode': 'local'})
+        terminal_state = local_api.terminal_state
+        assert await local_api.get_account_information() == {'balance': 100}
+        client.get_account_information.assert_called_once_with('accountId')
+        await terminal_state.on_account_information_updated(0, {'balance': 200})
+        await terminal_state.on_positions_replaced(0, [{'id': '1', 'symbol': 'EURUSD'}])
+        positions = await local_api.get_positions()
+        positions[0]['symbol'] = 'GBPUSD'
+        positions.append({'id': '2'})
+        account_information = await local_api.get_account_information()
+        account_information['balance'] = 300
+        assert terminal_state.positions == [{'id': '1', 'symbol': 'EURUSD'}]
+        assert terminal_state.account_information == {'balance': 200}
+        assert client.get_account_information.call_count == 1
+
     @pytest.mark.asyncio
     async def test_retrieve_symbol_price(self):
         """Should retrieve symbol price."""
@@ -745,7 +806,9 @@ class TestMetaApiConnection:
         api = MetaApiConnection(client, account, MagicMock(), MagicMock())
         listener = {}
         api.add_synchronization_listener(listener)
-        client.add_synchronization_listener.assert_called_with('accountId', listener)
+        client.add_synchronization_listener.assert_called_with('accountId', listener, False)
+        api.add_synchronization_listener(listener, True)
+        client.add_synchronization_listener.assert_called_with('accountId', listener, True)
 
     @pytest.mark.asyncio
     async def test_remove_sync_listeners(self):
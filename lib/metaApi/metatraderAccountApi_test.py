@@ -43,7 +43,7 @@ class MockWebsocketClient(MetaApiWebsocketClient):
     def add_synchronization_listener(self, account_id: str, listener):
         pass
 
-    def add_reconnect_listener(self, listener: ReconnectListener):
+    def add_reconnect_listener(self, listener: ReconnectListener, account_id: str = None):
         pass
 
     def subscribe(self, account_id: str):
@@ -8,10 +8,19 @@ import pytz
 import re
 
 
+_iso_date_pattern = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d{3}(\d{3})?)?(Z|[+-]\d\d:\d\d)')
+_time_field_pattern = re.compile('time|Time')
+_broker_time_field_pattern = re.compile('brokerTime|BrokerTime')
+_time_fields = {}
+
+
 def date(date_time: str or float or int) -> datetime:
     """Parses a date string into a datetime object."""
     if isinstance(date_time, float) or isinstance(date_time, int):
         return datetime.fromtimestamp(max(date_time, 100000)).astimezone(pytz.utc)
+    elif _iso_date_pattern.fullmatch(date_time):
+        # the format used by the server is parsed by the standard library, which is several times faster than iso8601
+        return datetime.fromisoformat(date_time[:-1] + '+00:00' if date_time[-1] == 'Z' else date_time)
     else:
         return iso8601.parse_date(date_time)
 
@@ -26,27 +35,32 @@ def random_id(length: int = 32) -> str:
     return ''.join(random.choice(string.ascii_lowercase) for i in range(length))
 
 
+def is_time_field(field: str) -> bool:
+    """Checks whether a packet field holds an ISO time string to be converted to a date."""
+    if field not in _time_fields:
+        _time_fields[field] = bool(_time_field_pattern.search(field)) and \
+            not _broker_time_field_pattern.search(field)
+    return _time_fields[field]
+
+
 def convert_iso_time_to_date(packet):
-    for field in packet:
-        value = packet[field]
-        if isinstance(value, str) and re.search('time|Time', field) and not \
-                re.search('brokerTime|BrokerTime', field):
-            packet[field] = date(value)
-        if isinstance(value, list):
-            for item in value:
-                convert_iso_time_to_date(item)
-        if isinstance(value, dict):
+    """Converts ISO time strings of a packet to dates in place. Fields are considered to hold time if their name
+    contains time but not broker time, all values of timestamps fields are converted as well."""
+    for field, value in packet.items():
+        if isinstance(value, str):
+            if is_time_field(field):
+                packet[field] = date(value)
+        elif isinstance(value, dict):
             convert_iso_time_to_date(value)
-    if packet and 'timestamps' in packet:
-        for field in packet['timestamps']:
-            packet['timestamps'][field] = date(packet['timestamps'][field])
-    if packet and 'type' in packet and packet['type'] == 'prices':
-        if 'prices' in packet:
-            for price in packet['prices']:
-                if 'timestamps' in price:
-                    for field in price['timestamps']:
-                        if isinstance(price['timestamps'][field], str):
-                            price['timestamps'][field] = date(price['timestamps'][field])
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    convert_iso_time_to_date(item)
+    if 'timestamps' in packet:
+        timestamps = packet['timestamps']
+        for field, value in timestamps.items():
+            if not isinstance(value, datetime):
+                timestamps[field] = date(value)
 
 
 class MetatraderAccountInformation(TypedDict):
@@ -0,0 +1,37 @@
+from .models import date, convert_iso_time_to_date
+from datetime import datetime, timezone, timedelta
+import iso8601
+
+
+class TestModels:
+    def test_parse_dates(self):
+        """Should parse ISO dates."""
+        assert date('2020-04-15T02:45:06.521Z') == datetime(2020, 4, 15, 2, 45, 6, 521000, timezone.utc)
+        assert date('2020-04-15T02:45:06Z') == datetime(2020, 4, 15, 2, 45, 6, tzinfo=timezone.utc)
+        assert date('2020-04-15T02:45:06.521123+03:00') == \
+            datetime(2020, 4, 15, 2, 45, 6, 521123, timezone(timedelta(hours=3)))
+        for value in ['2020-04-15T02:45:06.5Z', '2020-04-15T02:45:06.5213Z', '2020-04-15', '20200415T024506Z',
+                      '2020-04-15T02:45:06.521Z\n']:
+            assert date(value) == iso8601.parse_date(value)
+            assert date(value).tzinfo is not None
+
+    def test_convert_time_fields(self):
+        """Should convert time fields of a packet to dates."""
+        packet = {
+            'type': 'prices', 'accountId': 'accountId', 'sequenceTimestamp': 1603124267178,
+            'prices': [{'symbol': 'EURUSD', 'time': '2020-04-15T02:45:06.521Z', 'brokerTime': '2020-04-15 05:45:06.521',
+                        'timestamps': {'eventGenerated': '2020-04-15T02:45:06.500Z'}}],
+            'removedPositionIds': ['1', '2'],
+            'update': {'updateTime': '2020-04-15T02:45:06.521Z', 'lastUpdateTimes': [1, 2]},
+            'timestamps': {'serverProcessingStarted': '2020-04-15T02:45:06.510Z'}
+        }
+        convert_iso_time_to_date(packet)
+        assert packet == {
+            'type': 'prices', 'accountId': 'accountId', 'sequenceTimestamp': 1603124267178,
+            'prices': [{'symbol': 'EURUSD', 'time': date('2020-04-15T02:45:06.521Z'),
+                        'brokerTime': '2020-04-15 05:45:06.521',
+                        'timestamps': {'eventGenerated': date('2020-04-15T02:45:06.500Z')}}],
+            'removedPositionIds': ['1', '2'],
+            'update': {'updateTime': date('2020-04-15T02:45:06.521Z'), 'lastUpdateTimes': [1, 2]},
+            'timestamps': {'serverProcessingStarted': date('2020-04-15T02:45:06.510Z')}
+        }
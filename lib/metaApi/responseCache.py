@@ -0,0 +1,168 @@
+from ..clients.metaApi.synchronizationListener import SynchronizationListener
+from .models import MetatraderDeal, MetatraderOrder, MetatraderSymbolSpecification
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+from typing_extensions import TypedDict
+import asyncio
+
+_default_ttls = {
+    'get_symbol_specification': 300,
+    'get_history_orders_by_ticket': 60,
+    'get_history_orders_by_position': 60,
+    'get_history_orders_by_time_range': 60,
+    'get_deals_by_ticket': 60,
+    'get_deals_by_position': 60,
+    'get_deals_by_time_range': 60
+}
+
+
+class ResponseCacheOpts(TypedDict):
+    """Response cache options."""
+
+    enabled: Optional[bool]
+    """An option to cache responses of symbol specification and history requests of MetaApi connections. Default is
+    False."""
+    maxSize: Optional[int]
+    """Maximum amount of cached responses per connection, the least recently used responses are evicted first.
+    Default is 1000."""
+    ttlInSeconds: Optional[Dict[str, float]]
+    """Time to live of cached responses by MetaApiConnection method name. Default is 300 for get_symbol_specification
+    and 60 for history order and deal methods. Responses of a method with zero time to live are not cached."""
+
+
+class ResponseCacheStats(TypedDict):
+    """Response cache statistics."""
+
+    hits: int
+    """Amount of requests served from the cache."""
+    misses: int
+    """Amount of requests sent to the server because a response was not cached or expired."""
+    evictions: int
+    """Amount of responses evicted because the cache was full."""
+    invalidations: int
+    """Amount of responses removed because of synchronization events."""
+    size: int
+    """Amount of cached responses."""
+
+
+class ResponseCache(SynchronizationListener):
+    """Caches responses of read requests of a MetaApi connection, removing the responses affected by synchronization
+    events."""
+
+    def __init__(self, opts: ResponseCacheOpts = None):
+        """Inits the class.
+
+        Args:
+            opts: Response cache options.
+        """
+        super().__init__()
+        opts = opts or {}
+        self._maxSize = opts['maxSize'] if 'maxSize' in opts else 1000
+        self._ttls = dict(_default_ttls)
+        self._ttls.update(opts['ttlInSeconds'] if 'ttlInSeconds' in opts else {})
+        self._entries = OrderedDict()
+        self._invalidationCounter = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def stats(self) -> ResponseCacheStats:
+        """Returns response cache statistics.
+
+        Returns:
+            Response cache statistics.
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'invalidations': self._invalidations,
+            'size': len(self._entries)
+        }
+
+    async def get(self, method_name: str, args: tuple, request: Callable[[], Coroutine]) -> Any:
+        """Returns a cached response or sends a request and caches its response. The cache stores a copy of the
+        response and returns a copy on every hit, so callers can modify the returned value.
+
+        Args:
+            method_name: MetaApiConnection method name.
+            args: Method arguments.
+            request: Function which sends the request.
+
+        Returns:
+            A coroutine resolving with the response.
+        """
+        ttl = self._ttls[method_name] if method_name in self._ttls else 0
+        if not ttl:
+            return await request()
+        key = (method_name,) + args
+        now = asyncio.get_event_loop().time()
+        if key in self._entries:
+            expires_at, response = self._entries[key]
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return deepcopy(response)
+            del self._entries[key]
+        self._misses += 1
+        invalidation_counter = self._invalidationCounter
+        response = await request()
+        # a response received after an invalidation might already be outdated, so it is not cached
+        if invalidation_counter == self._invalidationCounter:
+            self._entries[key] = (now + ttl, deepcopy(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxSize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return response
+
+    def invalidate(self, method_name: str = None, predicate: Callable[[tuple], bool] = None):
+        """Removes cached responses.
+
+        Args:
+            method_name: MetaApiConnection method name to remove responses of, or None to remove responses of all
+            methods.
+            predicate: Function which accepts method arguments and returns whether the response should be removed, or
+            None to remove all responses of the method.
+        """
+        self._invalidationCounter += 1
+        for key in list(self._entries.keys()):
+            if (method_name is None or key[0] == method_name) and (predicate is None or predicate(key[1:])):
+                del self._entries[key]
+                self._invalidations += 1
+
+    async def on_symbol_specifications_updated(self, instance_index: int,
+                                               specifications: List[MetatraderSymbolSpecification]):
+        symbols = set(map(lambda specification: specification['symbol'], specifications))
+        self.invalidate('get_symbol_specification', lambda args: args[0] in symbols)
+
+    async def on_history_orders_added(self, instance_index: int, history_orders: List[MetatraderOrder]):
+        ids = set(map(lambda order: order['id'], history_orders))
+        position_ids = set(order['positionId'] for order in history_orders if 'positionId' in order)
+        times = [order['doneTime'] if 'doneTime' in order else None for order in history_orders]
+        self.invalidate('get_history_orders_by_ticket', lambda args: args[0] in ids)
+        self.invalidate('get_history_orders_by_position', lambda args: args[0] in position_ids)
+        self.invalidate('get_history_orders_by_time_range', lambda args: self._in_time_range(args, times))
+
+    async def on_deals_added(self, instance_index: int, deals: List[MetatraderDeal]):
+        tickets = set(deal['id'] for deal in deals)
+        tickets.update(deal['orderId'] for deal in deals if 'orderId' in deal)
+        position_ids = set(deal['positionId'] for deal in deals if 'positionId' in deal)
+        times = [deal['time'] if 'time' in deal else None for deal in deals]
+        self.invalidate('get_deals_by_ticket', lambda args: args[0] in tickets)
+        self.invalidate('get_deals_by_position', lambda args: args[0] in position_ids)
+        self.invalidate('get_deals_by_time_range', lambda args: self._in_time_range(args, times))
+
+    def _in_time_range(self, args: tuple, times: list) -> bool:
+        start_time, end_time = args[0], args[1]
+        for time in times:
+            try:
+                if time is None or start_time <= time < end_time:
+                    return True
+            except TypeError:
+                # times without a timezone can not be compared with server times, so the response is removed
+                return True
+        return False
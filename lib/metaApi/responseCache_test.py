@@ -0,0 +1,113 @@
+from .responseCache import ResponseCache
+from .models import date
+from mock import AsyncMock
+import pytest
+import asyncio
+
+request = AsyncMock()
+
+
+@pytest.fixture(autouse=True)
+async def run_around_tests():
+    global request
+    request = AsyncMock(return_value={'deals': [], 'synchronizing': False})
+    yield
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_cache_responses(self):
+        """Should serve repeated requests from the cache."""
+        cache = ResponseCache()
+        for i in range(3):
+            assert await cache.get('get_deals_by_ticket', ('1',), request) == {'deals': [], 'synchronizing': False}
+        await cache.get('get_deals_by_ticket', ('2',), request)
+        assert request.call_count == 2
+        assert cache.stats == {'hits': 2, 'misses': 2, 'evictions': 0, 'invalidations': 0, 'size': 2}
+
+    @pytest.mark.asyncio
+    async def test_expire_responses(self):
+        """Should send a request again when the cached response expires."""
+        cache = ResponseCache({'ttlInSeconds': {'get_deals_by_ticket': 0.05, 'get_deals_by_position': 0}})
+        await cache.get('get_deals_by_ticket', ('1',), request)
+        await cache.get('get_deals_by_ticket', ('1',), request)
+        await asyncio.sleep(0.1)
+        await cache.get('get_deals_by_ticket', ('1',), request)
+        assert request.call_count == 2
+        await cache.get('get_deals_by_position', ('1',), request)
+        await cache.get('get_deals_by_position', ('1',), request)
+        await cache.get('get_positions', (), request)
+        await cache.get('get_positions', (), request)
+        assert request.call_count == 6
+        assert cache.stats['size'] == 1
+
+    @pytest.mark.asyncio
+    async def test_evict_least_recently_used_responses(self):
+        """Should evict the least recently used responses."""
+        cache = ResponseCache({'maxSize': 2})
+        await cache.get('get_deals_by_ticket', ('1',), request)
+        await cache.get('get_deals_by_ticket', ('2',), request)
+        await cache.get('get_deals_by_ticket', ('1',), request)
+        await cache.get('get_deals_by_ticket', ('3',), request)
+        await cache.get('get_deals_by_ticket', ('1',), request)
+        await cache.get('get_deals_by_ticket', ('2',), request)
+        assert request.call_count == 4
+        assert cache.stats == {'hits': 2, 'misses': 4, 'evictions': 2, 'invalidations': 0, 'size': 2}
+
+    @pytest.mark.asyncio
+    async def test_invalidate_specifications(self):
+        """Should remove symbol specifications updated by the server."""
+        cache = ResponseCache()
+        await cache.get('get_symbol_specification', ('EURUSD',), request)
+        await cache.get('get_symbol_specification', ('GBPUSD',), request)
+        await cache.on_symbol_specifications_updated(0, [{'symbol': 'EURUSD'}])
+        await cache.get('get_symbol_specification', ('EURUSD',), request)
+        await cache.get('get_symbol_specification', ('GBPUSD',), request)
+        assert request.call_count == 3
+        assert cache.stats['invalidations'] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_deals(self):
+        """Should remove deal responses affected by a new deal."""
+        cache = ResponseCache()
+        closed_period = (date('2020-04-01T00:00:00.000Z'), date('2020-04-15T00:00:00.000Z'), 0, 1000)
+        open_period = (date('2020-04-15T00:00:00.000Z'), date('2020-05-01T00:00:00.000Z'), 0, 1000)
+        await cache.get('get_deals_by_time_range', closed_period, request)
+        await cache.get('get_deals_by_time_range', open_period, request)
+        await cache.get('get_deals_by_position', ('1',), request)
+        await cache.get('get_deals_by_position', ('2',), request)
+        await cache.get('get_deals_by_ticket', ('3',), request)
+        await cache.on_deals_added(0, [{'id': '3', 'positionId': '1', 'time': date('2020-04-15T02:45:06.521Z')}])
+        assert cache.stats['invalidations'] == 3
+        await cache.get('get_deals_by_time_range', closed_period, request)
+        await cache.get('get_deals_by_position', ('2',), request)
+        assert request.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_not_cache_responses_received_after_invalidation(self):
+        """Should not cache a response received after an invalidation."""
+        cache = ResponseCache()
+
+        async def slow_request():
+            await asyncio.sleep(0.05)
+            return {'historyOrders': [], 'synchronizing': False}
+
+        task = asyncio.create_task(cache.get('get_history_orders_by_position', ('1',), slow_request))
+        await asyncio.sleep(0.01)
+        await cache.on_history_orders_added(0, [{'id': '2', 'positionId': '1'}])
+        await task
+        assert cache.stats['size'] == 0
+
+    @pytest.mark.asyncio
+    async def test_not_share_cached_responses(self):
+        """Should not let callers modify cached responses."""
+        cache = ResponseCache()
+        request.return_value = {'deals': [{'id': '1'}], 'synchronizing': False}
+        response = await cache.get('get_deals_by_ticket', ('1',), request)
+        response['deals'][0]['id'] = '2'
+        response = await cache.get('get_deals_by_ticket', ('1',), request)
+        assert response == {'deals': [{'id': '1'}], 'synchronizing': False}
+        response['deals'].append({'id': '3'})
+        assert await cache.get('get_deals_by_ticket', ('1',), request) == {'deals': [{'id': '1'}],
+                                                                           'synchronizing': False}
+        assert request.call_count == 1
@@ -2,18 +2,23 @@ from ..clients.metaApi.synchronizationListener import SynchronizationListener
 from .models import MetatraderAccountInformation, MetatraderPosition, MetatraderOrder, \
     MetatraderSymbolSpecification, MetatraderSymbolPrice
 import functools
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from typing_extensions import TypedDict
 import asyncio
 from datetime import datetime
+import pytz
 
 
 class TerminalStateDict(TypedDict):
     connected: bool
     connectedToBroker: bool
     accountInformation: Optional[dict]
-    positions: List[dict]
-    orders: List[dict]
+    positions: Dict[str, dict]
+    orders: Dict[str, dict]
+    positionsBySymbol: Dict[str, Set[str]]
+    ordersBySymbol: Dict[str, Set[str]]
+    positionsSymbolsById: Dict[str, str]
+    ordersSymbolsById: Dict[str, str]
     specifications: List[dict]
     specificationsBySymbol: dict
     pricesBySymbol: dict
@@ -21,6 +26,9 @@ class TerminalStateDict(TypedDict):
     removedPositions: dict
     ordersInitialized: bool
     positionsInitialized: bool
+    pricesInitialized: bool
+    unrealizedProfit: float
+    equityUpdateCount: int
     lastUpdateTime: float
 
 
@@ -31,6 +39,7 @@ class TerminalState(SynchronizationListener):
         """Inits the instance of terminal state class"""
         super().__init__()
         self._stateByInstanceIndex = {}
+        self._equityRecalculationInterval = 1000
 
     @property
     def connected(self) -> bool:
@@ -50,6 +59,16 @@ class TerminalState(SynchronizationListener):
         """
         return True in list(map(lambda instance: instance['connectedToBroker'], self._stateByInstanceIndex.values()))
 
+    @property
+    def last_update_time(self) -> Optional[datetime]:
+        """Returns server time of the latest price received by the local copy of terminal state.
+
+        Returns:
+            Server time of the latest price or None if prices were not received yet.
+        """
+        last_update_time = self._get_best_state()['lastUpdateTime']
+        return datetime.fromtimestamp(last_update_time, pytz.utc) if last_update_time else None
+
     @property
     def account_information(self) -> MetatraderAccountInformation:
         """Returns a local copy of account information.
@@ -66,7 +85,7 @@ class TerminalState(SynchronizationListener):
         Returns:
             A local copy of MetaTrader positions opened.
         """
-        return self._get_best_state()['positions']
+        return list(self._get_best_state()['positions'].values())
 
     @property
     def orders(self) -> List[MetatraderOrder]:
@@ -75,7 +94,7 @@ class TerminalState(SynchronizationListener):
         Returns:
             A local copy of MetaTrader orders opened.
         """
-        return self._get_best_state()['orders']
+        return list(self._get_best_state()['orders'].values())
 
     @property
     def specifications(self) -> List[MetatraderSymbolSpecification]:
@@ -168,8 +187,12 @@ class TerminalState(SynchronizationListener):
         """
         state = self._get_state(instance_index)
         state['accountInformation'] = None
-        state['positions'] = []
-        state['orders'] = []
+        state['positions'] = {}
+        state['orders'] = {}
+        state['positionsBySymbol'] = {}
+        state['ordersBySymbol'] = {}
+        state['positionsSymbolsById'] = {}
+        state['ordersSymbolsById'] = {}
         state['specifications'] = []
         state['specificationsBySymbol'] = {}
         state['pricesBySymbol'] = {}
@@ -177,6 +200,9 @@ class TerminalState(SynchronizationListener):
         state['removedPositions'] = {}
         state['ordersInitialized'] = False
         state['positionsInitialized'] = False
+        state['pricesInitialized'] = False
+        state['unrealizedProfit'] = 0
+        state['equityUpdateCount'] = 0
 
     async def on_account_information_updated(self, instance_index: int,
                                              account_information: MetatraderAccountInformation):
@@ -202,7 +228,7 @@ class TerminalState(SynchronizationListener):
             A coroutine which resolves when the asynchronous event is processed.
         """
         state = self._get_state(instance_index)
-        state['positions'] = positions
+        self._replace_items(state, 'positions', positions)
         state['removedPositions'] = {}
         state['positionsInitialized'] = True
 
@@ -217,14 +243,20 @@ class TerminalState(SynchronizationListener):
             A coroutine which resolves when the asynchronous event is processed.
         """
         state = self._get_state(instance_index)
-        is_exists = False
-        for i in range(len(state['positions'])):
-            if state['positions'][i]['id'] == position['id']:
-                state['positions'][i] = position
-                is_exists = True
-                break
-        if (not is_exists) and (position['id'] not in state['removedPositions']):
-            state['positions'].append(position)
+        self._update_items(state, 'positions', [position], state['removedPositions'])
+
+    async def on_positions_updated(self, instance_index: int, positions: List[MetatraderPosition]):
+        """Invoked when MetaTrader positions are updated.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            positions: Updated MetaTrader positions.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        state = self._get_state(instance_index)
+        self._update_items(state, 'positions', positions, state['removedPositions'])
 
     async def on_position_removed(self, instance_index: int, position_id: str):
         """Invoked when MetaTrader position is removed.
@@ -237,15 +269,14 @@ class TerminalState(SynchronizationListener):
             A coroutine which resolves when the asynchronous event is processed.
         """
         state = self._get_state(instance_index)
-        position = next((p for p in state['positions'] if p['id'] == position_id), None)
-        if position is None:
-            for key in state['removedPositions']:
+        if position_id not in state['positions']:
+            for key in list(state['removedPositions'].keys()):
                 e = state['removedPositions'][key]
                 if e + 5 * 60 < datetime.now().timestamp():
                     del state['removedPositions'][key]
             state['removedPositions'][position_id] = datetime.now().timestamp()
         else:
-            state['positions'] = list(filter(lambda p: p['id'] != position_id, state['positions']))
+            self._remove_item(state, 'positions', position_id)
 
     async def on_orders_replaced(self, instance_index: int, orders: List[MetatraderOrder]):
         """Invoked when the orders are replaced as a result of initial terminal state synchronization.
@@ -258,7 +289,7 @@ class TerminalState(SynchronizationListener):
             A coroutine which resolves when the asynchronous event is processed.
         """
         state = self._get_state(instance_index)
-        state['orders'] = orders
+        self._replace_items(state, 'orders', orders)
         state['completedOrders'] = {}
         state['ordersInitialized'] = True
 
@@ -273,14 +304,20 @@ class TerminalState(SynchronizationListener):
             A coroutine which resolves when the asynchronous event is processed.
         """
         state = self._get_state(instance_index)
-        is_exists = False
-        for i in range(len(state['orders'])):
-            if state['orders'][i]['id'] == order['id']:
-                state['orders'][i] = order
-                is_exists = True
-                break
-        if (not is_exists) and (order['id'] not in state['completedOrders']):
-            state['orders'].append(order)
+        self._update_items(state, 'orders', [order], state['completedOrders'])
+
+    async def on_orders_updated(self, instance_index: int, orders: List[MetatraderOrder]):
+        """Invoked when MetaTrader orders are updated.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            orders: Updated MetaTrader orders.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        state = self._get_state(instance_index)
+        self._update_items(state, 'orders', orders, state['completedOrders'])
 
     async def on_order_completed(self, instance_index: int, order_id: str):
         """Invoked when MetaTrader order is completed (executed or canceled).
@@ -293,15 +330,14 @@ class TerminalState(SynchronizationListener):
             A coroutine which resolves when the asynchronous event is processed.
         """
         state = self._get_state(instance_index)
-        order = next((p for p in state['orders'] if p['id'] == order_id), None)
-        if order is None:
-            for key in state['completedOrders']:
+        if order_id not in state['orders']:
+            for key in list(state['completedOrders'].keys()):
                 e = state['completedOrders'][key]
                 if e + 5 * 60 < datetime.now().timestamp():
                     del state['completedOrders'][key]
             state['completedOrders'][order_id] = datetime.now().timestamp()
         else:
-            state['orders'] = list(filter(lambda o: o['id'] != order_id, state['orders']))
+            self._remove_item(state, 'orders', order_id)
 
     async def on_symbol_specification_updated(self, instance_index: int, specification: MetatraderSymbolSpecification):
         """Invoked when a symbol specification was updated
@@ -322,6 +358,29 @@ class TerminalState(SynchronizationListener):
             state['specifications'].append(specification)
         state['specificationsBySymbol'][specification['symbol']] = specification
 
+    async def on_symbol_specifications_updated(self, instance_index: int,
+                                               specifications: List[MetatraderSymbolSpecification]):
+        """Invoked when symbol specifications were updated.
+
+        Args:
+            instance_index: Index of an account instance connected.
+            specifications: Updated MetaTrader symbol specifications.
+
+        Returns:
+            A coroutine which resolves when the asynchronous event is processed.
+        """
+        state = self._get_state(instance_index)
+        index_by_symbol = {}
+        for i in range(len(state['specifications'])):
+            index_by_symbol[state['specifications'][i]['symbol']] = i
+        for specification in specifications:
+            if specification['symbol'] in index_by_symbol:
+                state['specifications'][index_by_symbol[specification['symbol']]] = specification
+            else:
+                index_by_symbol[specification['symbol']] = len(state['specifications'])
+                state['specifications'].append(specification)
+            state['specificationsBySymbol'][specification['symbol']] = specification
+
     async def on_symbol_prices_updated(self, instance_index: int, prices: List[MetatraderSymbolPrice],
                                        equity: float = None, margin: float = None, free_margin: float = None,
                                        margin_level: float = None):
@@ -344,31 +403,49 @@ class TerminalState(SynchronizationListener):
         if prices:
             for price in prices:
                 state['pricesBySymbol'][price['symbol']] = price
-                positions = list(filter(lambda p: p['symbol'] == price['symbol'], state['positions']))
-                other_positions = list(filter(lambda p: p['symbol'] != price['symbol'], state['positions']))
-                orders = list(filter(lambda o: o['symbol'] == price['symbol'], state['orders']))
-                prices_initialized = True
-                for position in other_positions:
-                    if position['symbol'] in state['pricesBySymbol']:
-                        p = state['pricesBySymbol'][position['symbol']]
-                        if 'unrealizedProfit' not in position:
-                            self._update_position_profits(position, p)
-                    else:
-                        prices_initialized = False
-                for position in positions:
-                    self._update_position_profits(position, price)
-                for order in orders:
+                position_ids = state['positionsBySymbol'][price['symbol']] if \
+                    price['symbol'] in state['positionsBySymbol'] else []
+                order_ids = state['ordersBySymbol'][price['symbol']] if \
+                    price['symbol'] in state['ordersBySymbol'] else []
+                for position_id in position_ids:
+                    self._update_position_profits(state, state['positions'][position_id], price)
+                for order_id in order_ids:
+                    order = state['orders'][order_id]
                     order['currentPrice'] = price['ask'] if (order['type'] == 'ORDER_TYPE_BUY' or
                                                              order['type'] == 'ORDER_TYPE_BUY_LIMIT' or
                                                              order['type'] == 'ORDER_TYPE_BUY_STOP' or
                                                              order['type'] == 'ORDER_TYPE_BUY_STOP_LIMIT') else \
                         price['bid']
+            if not state['pricesInitialized']:
+                # positions of other symbols are checked only until prices of all position symbols are received and
+                # their profits are calculated, or after positions were updated. The unrealized profit total is
+                # recalculated at the same time
+                state['pricesInitialized'] = True
+                unrealized_profit = 0
+                for position in state['positions'].values():
+                    if position['symbol'] in state['pricesBySymbol']:
+                        if 'unrealizedProfit' not in position:
+                            self._update_position_profits(state, position,
+                                                          state['pricesBySymbol'][position['symbol']])
+                    else:
+                        state['pricesInitialized'] = False
+                    if 'unrealizedProfit' in position:
+                        unrealized_profit += position['unrealizedProfit']
+                state['unrealizedProfit'] = unrealized_profit
+                state['equityUpdateCount'] = 0
+            prices_initialized = state['pricesInitialized']
         if state['accountInformation']:
             if state['positionsInitialized'] and prices_initialized:
-                state['accountInformation']['equity'] = \
-                    state['accountInformation']['balance'] + functools.reduce(
+                # the unrealized profit total is maintained incrementally and is recalculated periodically to correct
+                # accumulated floating point errors
+                state['equityUpdateCount'] += 1
+                if state['equityUpdateCount'] >= self._equityRecalculationInterval:
+                    state['equityUpdateCount'] = 0
+                    state['unrealizedProfit'] = functools.reduce(
                         lambda a, b: a + (b['unrealizedProfit'] if 'unrealizedProfit' in b else 0),
-                        state['positions'], 0)
+                        state['positions'].values(), 0)
+                state['accountInformation']['equity'] = \
+                    state['accountInformation']['balance'] + state['unrealizedProfit']
             else:
                 state['accountInformation']['equity'] = equity if equity else (
                     state['accountInformation']['equity'] if 'equity' in state['accountInformation'] else None)
@@ -379,9 +456,63 @@ class TerminalState(SynchronizationListener):
             state['accountInformation']['marginLevel'] = margin_level if free_margin else (
                 state['accountInformation']['marginLevel'] if 'marginLevel' in state['accountInformation'] else None)
 
-    def _update_position_profits(self, position: Dict, price: Dict):
+    def _update_items(self, state: TerminalStateDict, key: str, updated_items: List[Dict], removed_ids: Dict):
+        # positions and orders are kept in insertion-ordered dicts by id and their ids are indexed by symbol, so that
+        # they are updated and removed in constant time and a price update only touches the items of its symbol. The
+        # symbol index is changed only when an item is added or its symbol changes, since this loop runs for every
+        # item of update packets. Symbols are compared with a separate dict of symbols by id instead of the replaced
+        # items, which are not read here
+        items = state[key]
+        items_by_symbol = state[key + 'BySymbol']
+        symbols = state[key + 'SymbolsById']
+        for item in updated_items:
+            item_id = item['id']
+            symbol = item['symbol'] if 'symbol' in item else None
+            if item_id in symbols:
+                if symbols[item_id] != symbol:
+                    self._remove_from_symbol_index(items_by_symbol, symbols[item_id], item_id)
+                    self._add_to_symbol_index(items_by_symbol, symbol, item_id)
+                    symbols[item_id] = symbol
+            elif item_id in removed_ids:
+                continue
+            else:
+                self._add_to_symbol_index(items_by_symbol, symbol, item_id)
+                symbols[item_id] = symbol
+            items[item_id] = item
+        if key == 'positions' and len(updated_items):
+            # the unrealized profit total is recalculated by the next price update instead of being adjusted for each
+            # updated position here
+            state['pricesInitialized'] = False
+
+    def _replace_items(self, state: TerminalStateDict, key: str, items: List[Dict]):
+        state[key] = {}
+        state[key + 'BySymbol'] = {}
+        state[key + 'SymbolsById'] = {}
+        if key == 'positions':
+            state['unrealizedProfit'] = 0
+        self._update_items(state, key, items, {})
+
+    def _remove_item(self, state: TerminalStateDict, key: str, item_id: str):
+        item = state[key].pop(item_id)
+        if key == 'positions' and 'unrealizedProfit' in item:
+            state['unrealizedProfit'] -= item['unrealizedProfit']
+        self._remove_from_symbol_index(state[key + 'BySymbol'], state[key + 'SymbolsById'].pop(item_id), item_id)
+
+    def _add_to_symbol_index(self, items_by_symbol: Dict[str, Set[str]], symbol: str, item_id: str):
+        if symbol in items_by_symbol:
+            items_by_symbol[symbol].add(item_id)
+        else:
+            items_by_symbol[symbol] = {item_id}
+
+    def _remove_from_symbol_index(self, items_by_symbol: Dict[str, Set[str]], symbol: str, item_id: str):
+        items_by_symbol[symbol].remove(item_id)
+        if not len(items_by_symbol[symbol]):
+            del items_by_symbol[symbol]
+
+    def _update_position_profits(self, state: TerminalStateDict, position: Dict, price: Dict):
         specification = self.specification(position['symbol'])
         if specification:
+            previous_unrealized_profit = position['unrealizedProfit'] if 'unrealizedProfit' in position else 0
             if 'unrealizedProfit' not in position or 'realizedProfit' not in position:
                 position['unrealizedProfit'] = (1 if (position['type'] == 'POSITION_TYPE_BUY') else -1) * \
                                                (position['currentPrice'] - position['openPrice']) * \
@@ -396,6 +527,7 @@ class TerminalState(SynchronizationListener):
                                 (new_position_price - position['openPrice']) * current_tick_value * \
                 position['volume'] / specification['tickSize']
             position['unrealizedProfit'] = unrealized_profit
+            state['unrealizedProfit'] += unrealized_profit - previous_unrealized_profit
             position['profit'] = position['unrealizedProfit'] + position['realizedProfit']
             position['currentPrice'] = new_position_price
             position['currentTickValue'] = current_tick_value
@@ -410,8 +542,12 @@ class TerminalState(SynchronizationListener):
             'connected': False,
             'connectedToBroker': False,
             'accountInformation': None,
-            'positions': [],
-            'orders': [],
+            'positions': {},
+            'orders': {},
+            'positionsBySymbol': {},
+            'ordersBySymbol': {},
+            'positionsSymbolsById': {},
+            'ordersSymbolsById': {},
             'specifications': [],
             'specificationsBySymbol': {},
             'pricesBySymbol': {},
@@ -419,6 +555,9 @@ class TerminalState(SynchronizationListener):
             'removedPositions': {},
             'ordersInitialized': False,
             'positionsInitialized': False,
+            'pricesInitialized': False,
+            'unrealizedProfit': 0,
+            'equityUpdateCount': 0,
             'lastUpdateTime': 0
         }
 
@@ -2,6 +2,7 @@ from .terminalState import TerminalState
 import pytest
 import asyncio
 from datetime import datetime
+from mock import patch
 state = TerminalState()
 
 
@@ -80,6 +81,45 @@ class TestTerminalState:
         assert len(state.orders) == 1
         assert state.orders == [{'id': '1', 'openPrice': 11}]
 
+    @pytest.mark.asyncio
+    async def test_keep_positions_and_orders_in_insertion_order(self):
+        """Should keep positions and orders in insertion order when they are updated and removed."""
+        await state.on_positions_replaced(1, [{'id': '1'}, {'id': '2'}, {'id': '3'}])
+        await state.on_orders_replaced(1, [{'id': '4'}, {'id': '5'}])
+        await state.on_position_updated(1, {'id': '2', 'profit': 10})
+        await state.on_position_removed(1, '1')
+        await state.on_position_updated(1, {'id': '1'})
+        await state.on_position_removed(1, '6')
+        await state.on_position_updated(1, {'id': '6'})
+        await state.on_order_completed(1, '4')
+        await state.on_order_updated(1, {'id': '7'})
+        await state.on_order_completed(1, '8')
+        await state.on_orders_updated(1, [{'id': '5', 'volume': 1}, {'id': '8'}, {'id': '9'}])
+        assert state.positions == [{'id': '2', 'profit': 10}, {'id': '3'}, {'id': '1'}]
+        assert state.orders == [{'id': '5', 'volume': 1}, {'id': '7'}, {'id': '9'}]
+
+    @pytest.mark.asyncio
+    async def test_update_positions_and_orders_in_bulk(self):
+        """Should update positions and orders in bulk."""
+        await state.on_position_updated(1, {'id': '1', 'profit': 10})
+        await state.on_position_removed(1, '3')
+        await state.on_positions_updated(1, [{'id': '2'}, {'id': '1', 'profit': 11}, {'id': '3'},
+                                             {'id': '2', 'profit': 5}])
+        assert state.positions == [{'id': '1', 'profit': 11}, {'id': '2', 'profit': 5}]
+        await state.on_order_updated(1, {'id': '1', 'openPrice': 10})
+        await state.on_order_completed(1, '3')
+        await state.on_orders_updated(1, [{'id': '2'}, {'id': '1', 'openPrice': 11}, {'id': '3'}])
+        assert state.orders == [{'id': '1', 'openPrice': 11}, {'id': '2'}]
+
+    @pytest.mark.asyncio
+    async def test_update_specifications_in_bulk(self):
+        """Should update specifications in bulk."""
+        await state.on_symbol_specification_updated(1, {'symbol': 'EURUSD', 'tickSize': 0.00001})
+        await state.on_symbol_specifications_updated(1, [{'symbol': 'GBPUSD'},
+                                                         {'symbol': 'EURUSD', 'tickSize': 0.0001}])
+        assert state.specifications == [{'symbol': 'EURUSD', 'tickSize': 0.0001}, {'symbol': 'GBPUSD'}]
+        assert state.specification('GBPUSD') == {'symbol': 'GBPUSD'}
+
     @pytest.mark.asyncio
     async def test_return_specifications(self):
         """Should return specifications."""
@@ -152,6 +192,97 @@ class TestTerminalState:
         assert list(map(lambda p: p['currentPrice'], state.positions)) == [10, 10]
         assert state.account_information['equity'] == 1200
 
+    @pytest.mark.asyncio
+    async def test_update_only_positions_and_orders_of_price_symbol(self):
+        """Should update only positions and orders of price symbol after prices are initialized."""
+        await state.on_account_information_updated(1, {'equity': 1000, 'balance': 800})
+        await state.on_symbol_specification_updated(1, {'symbol': 'EURUSD', 'tickSize': 0.01})
+        await state.on_symbol_specification_updated(1, {'symbol': 'AUDUSD', 'tickSize': 0.01})
+        await state.on_positions_replaced(1, [{
+            'id': '1', 'symbol': 'EURUSD', 'type': 'POSITION_TYPE_BUY', 'currentPrice': 9, 'currentTickValue': 0.5,
+            'openPrice': 8, 'profit': 100, 'volume': 2
+        }])
+        await state.on_orders_replaced(1, [{'id': '1', 'symbol': 'EURUSD', 'type': 'ORDER_TYPE_BUY_LIMIT'},
+                                           {'id': '2', 'symbol': 'AUDUSD', 'type': 'ORDER_TYPE_SELL_LIMIT'}])
+
+        def price(symbol, bid):
+            return {'time': datetime.now(), 'symbol': symbol, 'profitTickValue': 0.5, 'lossTickValue': 0.5,
+                    'bid': bid, 'ask': bid + 1}
+        await state.on_symbol_prices_updated(1, [price('EURUSD', 10)])
+        assert state.account_information['equity'] == 1000
+        await state.on_position_updated(1, {
+            'id': '2', 'symbol': 'AUDUSD', 'type': 'POSITION_TYPE_BUY', 'currentPrice': 9, 'currentTickValue': 0.5,
+            'openPrice': 8, 'profit': 100, 'volume': 2
+        })
+        await state.on_symbol_prices_updated(1, [price('AUDUSD', 10)])
+        assert list(map(lambda p: p['profit'], state.positions)) == [200, 200]
+        assert state.account_information['equity'] == 1200
+        with patch.object(state, '_update_position_profits', wraps=state._update_position_profits) as update:
+            await state.on_symbol_prices_updated(1, [price('EURUSD', 11)])
+            assert update.call_count == 1
+        assert list(map(lambda p: p['profit'], state.positions)) == [300, 200]
+        assert list(map(lambda o: o['currentPrice'], state.orders)) == [12, 10]
+        assert state.account_information['equity'] == 1300
+        await state.on_position_updated(1, {
+            'id': '2', 'symbol': 'EURUSD', 'type': 'POSITION_TYPE_BUY', 'currentPrice': 10, 'currentTickValue': 0.5,
+            'openPrice': 8, 'profit': 200, 'unrealizedProfit': 200, 'realizedProfit': 0, 'volume': 2
+        })
+        await state.on_position_removed(1, '1')
+        await state.on_symbol_prices_updated(1, [price('AUDUSD', 11)])
+        assert list(map(lambda p: p['profit'], state.positions)) == [200]
+        await state.on_symbol_prices_updated(1, [price('EURUSD', 12)])
+        assert list(map(lambda p: p['profit'], state.positions)) == [400]
+        assert state.account_information['equity'] == 1200
+
+    @pytest.mark.asyncio
+    async def test_maintain_unrealized_profit_incrementally(self):
+        """Should maintain equity incrementally when positions and prices are updated."""
+        await state.on_account_information_updated(1, {'equity': 1000, 'balance': 800})
+        await state.on_symbol_specification_updated(1, {'symbol': 'EURUSD', 'tickSize': 0.01})
+        await state.on_symbol_specification_updated(1, {'symbol': 'AUDUSD', 'tickSize': 0.01})
+
+        def position(id, symbol, unrealized_profit):
+            return {'id': id, 'symbol': symbol, 'type': 'POSITION_TYPE_BUY', 'currentPrice': 9, 'openPrice': 8,
+                    'currentTickValue': 0.5, 'volume': 2, 'profit': unrealized_profit,
+                    'unrealizedProfit': unrealized_profit, 'realizedProfit': 0}
+
+        def price(symbol, bid):
+            return {'time': datetime.now(), 'symbol': symbol, 'profitTickValue': 0.5, 'lossTickValue': 0.5,
+                    'bid': bid, 'ask': bid + 1}
+        await state.on_positions_replaced(1, [position('1', 'EURUSD', 100), position('2', 'AUDUSD', 100)])
+        await state.on_symbol_prices_updated(1, [price('EURUSD', 10), price('AUDUSD', 10)])
+        assert state.account_information['equity'] == 1200
+        await state.on_position_updated(1, position('3', 'EURUSD', 50))
+        await state.on_positions_updated(1, [position('2', 'AUDUSD', 150)])
+        await state.on_position_removed(1, '1')
+        await state.on_symbol_prices_updated(1, [price('AUDUSD', 11)])
+        assert list(map(lambda p: p['unrealizedProfit'], state.positions)) == [300, 50]
+        assert state.account_information['equity'] == 1150
+        await state.on_symbol_prices_updated(1, [price('EURUSD', 11)])
+        assert state.account_information['equity'] == 1400
+        await state.on_positions_replaced(1, [position('4', 'EURUSD', 10)])
+        await state.on_symbol_prices_updated(1, [price('AUDUSD', 11)])
+        assert state.account_information['equity'] == 810
+
+    @pytest.mark.asyncio
+    async def test_recalculate_unrealized_profit_periodically(self):
+        """Should recalculate unrealized profit periodically to correct drift."""
+        await state.on_account_information_updated(1, {'equity': 1000, 'balance': 800})
+        await state.on_symbol_specification_updated(1, {'symbol': 'EURUSD', 'tickSize': 0.01})
+        await state.on_positions_replaced(1, [{
+            'id': '1', 'symbol': 'EURUSD', 'type': 'POSITION_TYPE_BUY', 'currentPrice': 9, 'openPrice': 8,
+            'currentTickValue': 0.5, 'volume': 2, 'profit': 100, 'unrealizedProfit': 100, 'realizedProfit': 0
+        }])
+        state._equityRecalculationInterval = 3
+        price = {'time': datetime.now(), 'symbol': 'USDJPY', 'profitTickValue': 0.5, 'lossTickValue': 0.5,
+                 'bid': 10, 'ask': 11}
+        await state.on_symbol_prices_updated(1, [dict(price, symbol='EURUSD')])
+        state._get_state(1)['unrealizedProfit'] += 0.001
+        await state.on_symbol_prices_updated(1, [price])
+        assert state.account_information['equity'] == 1000.001
+        await state.on_symbol_prices_updated(1, [price])
+        assert state.account_information['equity'] == 1000
+
     @pytest.mark.asyncio
     async def test_update_margin_fields(self):
         """Should update margin fields on price update."""
@@ -14,7 +14,7 @@ tests_require = [
 
 setuptools.setup(
     name="metaapi_cloud_sdk",
-    version="12.1.1",
+    version="12.2.0",
     author="Agilium Labs LLC",
     author_email="agiliumtrade@agiliumtrade.ai",
     description="SDK for MetaApi, a professional cloud forex API which includes MetaTrader REST API "
@@ -31,6 +31,7 @@ setuptools.setup(
     packages=['metaapi_cloud_sdk'],
     install_requires=install_requires,
     tests_require=tests_require,
+    extras_require={'orjson': ['orjson']},
     license='SEE LICENSE IN LICENSE',
     classifiers=[
         "Programming Language :: Python :: 3",